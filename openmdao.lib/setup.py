@@ -100,6 +100,7 @@ Component, Driver, and Variable plugins for OpenMDAO
       openmdao.lib.casehandlers.listcase.ListCaseRecorder = openmdao.lib.casehandlers.listcase:ListCaseRecorder
       openmdao.lib.casehandlers.dbcase.DBCaseRecorder = openmdao.lib.casehandlers.dbcase:DBCaseRecorder
       openmdao.lib.casehandlers.csvcase.CSVCaseRecorder = openmdao.lib.casehandlers.csvcase:CSVCaseRecorder
+      openmdao.lib.casehandlers.columncase.ColumnCaseRecorder = openmdao.lib.casehandlers.columncase:ColumnCaseRecorder
       openmdao.lib.casehandlers.caseset.CaseArray = openmdao.lib.casehandlers.caseset:CaseArray
       openmdao.lib.casehandlers.caseset.CaseSet = openmdao.lib.casehandlers.caseset:CaseSet
 
@@ -107,6 +108,7 @@ Component, Driver, and Variable plugins for OpenMDAO
       openmdao.lib.casehandlers.listcase.ListCaseIterator = openmdao.lib.casehandlers.listcase:ListCaseIterator
       openmdao.lib.casehandlers.dbcase.DBCaseIterator = openmdao.lib.casehandlers.dbcase:DBCaseIterator
       openmdao.lib.casehandlers.csvcase.CSVCaseIterator = openmdao.lib.casehandlers.csvcase:CSVCaseIterator
+      openmdao.lib.casehandlers.columncase.ColumnCaseIterator = openmdao.lib.casehandlers.columncase:ColumnCaseIterator
       openmdao.lib.casehandlers.caseset.CaseArray = openmdao.lib.casehandlers.caseset:CaseArray
       openmdao.lib.casehandlers.caseset.CaseSet = openmdao.lib.casehandlers.caseset:CaseSet
       
@@ -8,6 +8,9 @@ iterators, and case filters in the standard library.
 
 from openmdao.lib.casehandlers.caseset import CaseArray, CaseSet, caseiter_to_caseset
 
+from openmdao.lib.casehandlers.asynccase import AsyncCaseRecorder
+from openmdao.lib.casehandlers.columncase import ColumnCaseIterator, \
+                                                 ColumnCaseRecorder
 from openmdao.lib.casehandlers.csvcase import CSVCaseIterator, CSVCaseRecorder
 from openmdao.lib.casehandlers.dbcase import DBCaseIterator, DBCaseRecorder, \
                                              case_db_to_dict
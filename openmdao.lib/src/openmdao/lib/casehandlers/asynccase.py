@@ -0,0 +1,188 @@
+"""A CaseRecorder that passes cases to another CaseRecorder running in a
+separate thread, so that a slow recorder doesn't hold up the driver.
+"""
+
+import Queue
+import sys
+import threading
+import time
+
+# pylint: disable-msg=E0611,F0401
+from openmdao.main.interfaces import implements, ICaseRecorder
+
+
+class AsyncCaseRecorder(object):
+    """Records Cases by handing them off through a bounded queue to a
+    writer thread which passes them on to `recorder`, another
+    :class:`ICaseRecorder`. All calls to `recorder` are made from the
+    writer thread. To use it, wrap any entry in a Driver's *recorders* list,
+    for example::
+
+        driver.recorders = [AsyncCaseRecorder(DBCaseRecorder('cases.db'))]
+
+    recorder: ICaseRecorder
+        The recorder that actually records the cases.
+
+    maxsize: int (optional) [1000]
+        Maximum number of cases waiting to be recorded.
+
+    overflow: str (optional) ['block']
+        What to do with a new case when the queue is full. 'block' waits for
+        room in the queue, 'drop' discards the case (it's counted in
+        :attr:`stats`), and 'error' raises a RuntimeError.
+
+    :meth:`flush` and :meth:`close` wait until all queued cases have been
+    recorded. An error raised by `recorder` in the writer thread is
+    raised again by the next call to :meth:`record`, :meth:`flush`,
+    :meth:`close`, or :meth:`get_iterator`.
+    """
+
+    implements(ICaseRecorder)
+
+    def __init__(self, recorder, maxsize=1000, overflow='block'):
+        if overflow not in ('block', 'drop', 'error'):
+            raise ValueError("overflow must be 'block', 'drop', or 'error'")
+        self.recorder = recorder
+        self.overflow = overflow
+        self._queue = Queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._error = None
+        self._recorded = 0
+        self._dropped = 0
+        self._max_depth = 0
+        self._record_time = 0.
+        self._wait_time = 0.
+        self._thread = threading.Thread(target=self._service_loop,
+                                        name='AsyncCaseRecorder')
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def stats(self):
+        """Dictionary of recording statistics:
+
+        - *recorded*: number of cases passed on to `recorder`
+        - *dropped*: number of cases discarded because the queue was full
+        - *queue_depth*: number of cases currently waiting
+        - *max_queue_depth*: largest number of cases that have been waiting
+        - *record_time*: seconds spent in `recorder.record`
+        - *wait_time*: seconds spent waiting for room in the queue
+        - *throughput*: cases recorded per second of *record_time*
+        """
+        with self._lock:
+            stats = dict(recorded=self._recorded, dropped=self._dropped,
+                         queue_depth=self._queue.qsize(),
+                         max_queue_depth=self._max_depth,
+                         record_time=self._record_time,
+                         wait_time=self._wait_time)
+        if stats['record_time'] > 0.:
+            stats['throughput'] = stats['recorded'] / stats['record_time']
+        else:
+            stats['throughput'] = 0.
+        return stats
+
+    def _service_loop(self):
+        """Record queued cases and run any queued requests until told to
+        stop.
+        """
+        while True:
+            case, request, reply = self._queue.get()
+            try:
+                if request is None:
+                    if self._error is None:
+                        start = time.time()
+                        try:
+                            self.recorder.record(case)
+                        except Exception:
+                            self._error = sys.exc_info()
+                        with self._lock:
+                            self._record_time += time.time() - start
+                            self._recorded += 1
+                else:
+                    try:
+                        reply.put((request(), None))
+                    except Exception:
+                        reply.put((None, sys.exc_info()))
+                    if request == self._stop:
+                        return
+            finally:
+                self._queue.task_done()
+
+    def _stop(self):
+        """Placeholder request that causes the writer thread to exit."""
+        return None
+
+    def _check_error(self):
+        """Raise any exception from the writer thread in this thread."""
+        if self._error is not None:
+            exc_info, self._error = self._error, None
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+    def _call(self, request):
+        """Run `request` in the writer thread after all currently queued
+        cases have been recorded, and return its result.
+        """
+        if not self._thread.is_alive():
+            raise RuntimeError('Attempt to use closed recorder')
+        reply = Queue.Queue()
+        self._queue.put((None, request, reply))
+        result, exc_info = reply.get()
+        self._check_error()
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+        return result
+
+    def record(self, case):
+        """Queue the given Case to be recorded."""
+        if not self._thread.is_alive():
+            raise RuntimeError('Attempt to record on closed recorder')
+        self._check_error()
+
+        try:
+            self._queue.put_nowait((case, None, None))
+        except Queue.Full:
+            if self.overflow == 'drop':
+                with self._lock:
+                    self._dropped += 1
+                return
+            elif self.overflow == 'error':
+                raise RuntimeError('AsyncCaseRecorder queue is full')
+            start = time.time()
+            self._queue.put((case, None, None))
+            with self._lock:
+                self._wait_time += time.time() - start
+        depth = self._queue.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+
+    def flush(self):
+        """Wait until all queued cases have been recorded, then flush
+        `recorder` if it supports it.
+        """
+        self._call(self._flush_recorder)
+
+    def _flush_recorder(self):
+        """Flush `recorder` if it can be flushed."""
+        flush = getattr(self.recorder, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def close(self):
+        """Record all queued cases, close `recorder`, and stop the writer
+        thread.
+        """
+        if self._thread.is_alive():
+            try:
+                self._call(self.recorder.close)
+            finally:
+                self._call(self._stop)
+                self._thread.join()
+
+    def get_iterator(self):
+        """Wait until all queued cases have been recorded, then return
+        `recorder`'s iterator. Once closed, `recorder` is asked directly.
+        """
+        if not self._thread.is_alive():
+            self._check_error()
+            return self.recorder.get_iterator()
+        return self._call(self.recorder.get_iterator)
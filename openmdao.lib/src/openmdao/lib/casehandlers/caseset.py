@@ -1,10 +1,92 @@
 
+import numpy
+
 from openmdao.main.case import Case
 from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
 
+# Types of value which are stored natively, so long as all values share
+# the same storage type, which gives them back unchanged (a numpy.float64
+# comes back as a float). Anything else (bools, longs, strings, arrays,
+# mixed ints and floats, ...) is stored in an object array.
+_NATIVE_TYPES = {
+    float: numpy.dtype(numpy.float64),
+    numpy.float64: numpy.dtype(numpy.float64),
+    int: numpy.dtype(numpy.int_),
+}
+
+
+def _as_vector(values):
+    """Return `values` as a 1-D array. If all values are floats, or all are
+    ints, they're kept in a numeric array, otherwise in an object array.
+    """
+    dtypes = set([_NATIVE_TYPES.get(type(val)) for val in values])
+    if len(dtypes) == 1 and None not in dtypes:
+        return numpy.array(values, dtype=dtypes.pop())
+    vec = numpy.empty(len(values), dtype=object)
+    for i, val in enumerate(values):
+        vec[i] = val
+    return vec
+
+
+def _common_dtype(*dtypes):
+    """Return the storage dtype which can hold data of all `dtypes` without
+    changing the type of any value.
+    """
+    if len(set(dtypes)) == 1:
+        return dtypes[0]
+    return numpy.dtype(object)
+
+
+def _hashable(value):
+    """Return `value`, or if it's unhashable (an array or list, for
+    instance) a hashable equivalent. Equal values give equal results.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        if isinstance(value, numpy.ndarray):
+            return (numpy.ndarray, value.shape, _hashable(value.tolist()))
+        if isinstance(value, (list, tuple)):
+            return (type(value), tuple([_hashable(val) for val in value]))
+        if isinstance(value, dict):
+            return (dict, tuple(sorted([(key, _hashable(val))
+                                        for key, val in value.items()])))
+        return (id(value),)  # Only equal to itself.
+    return value
+
+
+def _object_key(row):
+    """Return a hashable key for the object array `row`."""
+    return tuple([_hashable(val) for val in row])
+
+
+def _normalize(rows):
+    """Return `rows` such that equal rows have equal bytes (-0.0 becomes 0.0).
+    """
+    if rows.dtype.kind == 'f':
+        return rows + 0.0
+    return rows
+
+
+def _row_keys(rows):
+    """Return a string array with one key per row of the numeric 2-D array
+    `rows`. Keys are the raw bytes of the row, so equal rows have equal keys.
+    """
+    rows = numpy.ascontiguousarray(_normalize(rows))
+    width = rows.dtype.itemsize * rows.shape[1]
+    if not width:
+        return numpy.zeros(len(rows), dtype='S1')
+    return rows.view('S%d' % width).ravel()
+
+
 class CaseArray(object):
     """A CaseRecorder/CaseIterator containing Cases having the same set of
     input/output strings but different data. Cases are not necessarily unique.
+
+    Values are held in a 2-D array with one row per case and one column per
+    name. The array is numeric if all values are floats, or all are ints,
+    otherwise it holds objects, so values come back with the type they were
+    recorded with.
     """
     
     implements(ICaseIterator, ICaseRecorder)
@@ -35,7 +117,9 @@ class CaseArray(object):
             self._names = []
         else:
             self._names = names[:]
-        self._values = []
+        self._split_idx = 0
+        self._data = None  # Storage, may have more rows than are in use.
+        self._len = 0
         if isinstance(obj, dict):
             self._add_dict_cases(obj)
         elif isinstance(obj, Case):
@@ -47,8 +131,8 @@ class CaseArray(object):
     
     def copy(self):
         ca = CaseArray(parent_uuid=self._parent_uuid, names=self._names)
-        ca._values = self._values[:]
         ca._split_idx = self._split_idx
+        ca._set_rows(self._rows().copy())
         return ca
         
     def remove(self, case):
@@ -57,7 +141,10 @@ class CaseArray(object):
             values = self._get_case_data(case)
         except KeyError:
             raise KeyError("Case to be removed is not a member of this CaseArray")
-        self._values.remove(values)
+        idx = self._find(values)
+        if idx < 0:
+            raise ValueError("Case to be removed is not a member of this CaseArray")
+        self._delete(idx)
 
     def _add_dict_cases(self, dct):
         length = -1
@@ -68,7 +155,7 @@ class CaseArray(object):
         else:
             self._names = dct.keys()
         self._split_idx = len(self._names) # treat all names as inputs
-        biglist = []
+        columns = []
         for key in self._names:
             val = dct[key]
             if not isinstance(key, basestring):
@@ -78,13 +165,14 @@ class CaseArray(object):
             if length != len(val):
                 raise ValueError("number of values at key '%s' (%d) differs " % (key,len(val)) +
                                  "from number of other values (%d) in CaseSet" % length)
-            biglist.append(val)
-        self._values = []
+            columns.append(_as_vector(val))
+        self.clear()
         if length > 0:
-            idxs = range(len(self._names))
-            for i in range(length):
-                lst = [biglist[j][i] for j in idxs]
-                self._add_values(lst)
+            dtype = _common_dtype(*[col.dtype for col in columns])
+            rows = numpy.empty((length, len(columns)), dtype=dtype)
+            for j, col in enumerate(columns):
+                rows[:, j] = col
+            self._add_rows(rows)
 
     def _record_first_case(self, case):
         """Called the first time we record a Case"""
@@ -106,11 +194,12 @@ class CaseArray(object):
             tmp.extend(case.values(iotype='out'))
 
         self._names = names
+        self.clear()
         self._add_values(tmp)
         
     def record(self, case):
         """Record the given Case."""
-        if not self._values:
+        if not self._len:
             self._record_first_case(case)
         else:
             self._add_values(self._get_case_data(case))
@@ -123,7 +212,7 @@ class CaseArray(object):
         return self._next_case()
 
     def _next_case(self):
-        for i in range(len(self._values)):
+        for i in range(self._len):
             yield self.__getitem__(i)
     
     def __getitem__(self, key):
@@ -133,16 +222,29 @@ class CaseArray(object):
         case.
         """
         if isinstance(key, basestring): # return all of the values for the given name
-            try: 
-                idx = self._names.index(key)
-            except ValueError as err: 
-                raise KeyError("CaseSet has no input or outputs named %s"%key )
-            return [lst[idx] for lst in self._values]
+            return self._rows()[:, self._name_index(key)].tolist()
         else:  # key is the case numbe
-            return self._case_from_values(self._values[key])
+            return self._case_from_values(self._rows()[key].tolist())
         
-    
-            
+    def get_array(self, names=None):
+        """Returns a 2-D array of recorded values, with one row per case and
+        one column per name.
+
+        names: list of str (optional)
+            Names/expressions of the columns to return. If None, all columns
+            are returned in the order of the contained Cases' inputs then
+            outputs.
+        """
+        if names is None:
+            return self._rows().copy()
+        return self._rows()[:, [self._name_index(name) for name in names]]
+
+    def _name_index(self, name):
+        try: 
+            return self._names.index(name)
+        except ValueError as err: 
+            raise KeyError("CaseSet has no input or outputs named %s" % name)
+
     def _case_from_values(self, values):
         return Case(inputs=[(n,v) for n,v in zip(self._names[0:self._split_idx],
                                                  values[0:self._split_idx])],
@@ -159,11 +261,106 @@ class CaseArray(object):
         except KeyError, err:
             raise KeyError("input or output is missing from case: %s" % str(err))
         
+    def _rows(self):
+        """Return the rows currently in use (a view, not a copy)."""
+        if self._data is None:
+            return numpy.zeros((0, len(self._names)))
+        return self._data[:self._len]
+
+    def _set_rows(self, rows):
+        """Replace our contents with the 2-D array `rows`."""
+        self._data = _normalize(rows)
+        self._len = len(rows)
+
+    def _cast(self, values):
+        """Return `values` as a row of our storage type, or None if that
+        would change any of them.
+        """
+        row = _as_vector(values)
+        if self._data is None or len(row) != self._data.shape[1]:
+            return None
+        dtype = self._data.dtype
+        if row.dtype == dtype:
+            return row
+        if dtype.kind == 'O':
+            return row.astype(object)
+        try:
+            cast = row.astype(dtype)
+        except (TypeError, ValueError):
+            return None
+        if (cast != row).any():
+            return None
+        return cast
+
+    def _find(self, values):
+        """Return the index of the first row equal to `values`, or -1."""
+        row = self._cast(values)
+        if row is not None:
+            rows = self._rows()
+            if rows.dtype.kind == 'O':
+                row = _object_key(row)
+                for i in range(self._len):
+                    if _object_key(rows[i]) == row:
+                        return i
+            else:
+                matches = numpy.flatnonzero((rows == row).all(axis=1))
+                if len(matches):
+                    return matches[0]
+        return -1
+
     def _add_values(self, vals):
-        self._values.append(vals)
+        self._add_rows(_as_vector(vals).reshape(1, -1))
+
+    def _conform(self, rows):
+        """Return the 2-D array `rows` cast to our storage type, promoting
+        our storage first if necessary.
+        """
+        if self._data is None:
+            return rows
+        dtype = _common_dtype(self._data.dtype, rows.dtype)
+        if dtype != self._data.dtype:
+            self._data = self._data.astype(dtype)
+            self._retyped()
+        if dtype != rows.dtype:
+            rows = rows.astype(dtype)
+        return rows
+
+    def _add_rows(self, rows):
+        """Append the 2-D array `rows`."""
+        rows = self._conform(rows)
+        data = self._data
+        if data is None:
+            data = numpy.empty((max(16, len(rows)), rows.shape[1]),
+                               dtype=rows.dtype)
+        else:
+            needed = self._len + len(rows)
+            if needed > len(data):
+                grown = numpy.empty((max(needed, 2*len(data)), data.shape[1]),
+                                    dtype=data.dtype)
+                grown[:self._len] = data[:self._len]
+                data = grown
+        data[self._len:self._len+len(rows)] = _normalize(rows)
+        self._data = data
+        self._len += len(rows)
+
+    def _retyped(self):
+        """Called when the storage type changes."""
+        pass
+
+    def _delete(self, idx):
+        """Delete row `idx`, which may be negative, returning its values."""
+        if idx < 0:
+            idx += self._len
+        if idx < 0 or idx >= self._len:
+            raise IndexError("case index out of range")
+        data = self._data
+        values = data[idx].tolist()
+        data[idx:self._len-1] = data[idx+1:self._len].copy()
+        self._len -= 1
+        return values
 
     def __len__(self):
-        return len(self._values)
+        return self._len
     
     def __contains__(self, case):
         if not isinstance(case, Case):
@@ -172,25 +369,33 @@ class CaseArray(object):
             values = self._get_case_data(case)
         except KeyError:
             return False
-        for val in self._values:
-            if val == values:
-                return True
-        return False
+        return self._find(values) >= 0
     
     def clear(self):
         """Remove all case values from this container, but leave list of
         variables intact.
         """
-        self._values = []
+        self._data = None
+        self._len = 0
 
     def update(self, *case_containers):
         """Add Cases from other CaseSets or CaseArrays to this one."""
         for cset in case_containers:
+            if isinstance(cset, CaseArray) and len(cset) and \
+               (self._len or not self._names):
+                if not self._len:
+                    self._names = cset._names[:]
+                    self._split_idx = cset._split_idx
+                    self.clear()
+                if self._names == cset._names and \
+                   self._split_idx == cset._split_idx:
+                    self._add_rows(cset._rows())  # Copy rows in bulk.
+                    continue
             for case in cset:
                 self.record(case)
                 
     def pop(self, idx=-1):
-        return self._case_from_values(self._values.pop(idx))
+        return self._case_from_values(self._delete(idx))
                 
     def _check_compatability(self, case_container):
         if self._names != case_container._names:
@@ -202,6 +407,11 @@ class CaseArray(object):
 class CaseSet(CaseArray):
     """A CaseRecorder/CaseIterator containing Cases having the same set of
     input/output strings but different data.  All Cases in the set are unique.
+
+    Membership is checked against a hash index of the rows, keyed by the
+    raw bytes of numeric rows or by tuples of (hashable equivalents of) the
+    values in object rows. Set operations combine the indexes and then
+    select rows with a mask.
     """
     
     def __init__(self, obj=None, parent_uuid=None, names=None):
@@ -225,132 +435,207 @@ class CaseSet(CaseArray):
             only want this container to keep track of some subset of the contents
             of Cases that are recorded in it.
         """
-        self._tupset = set()
+        self._index = set()
         super(CaseSet, self).__init__(obj, parent_uuid, names)
 
     def copy(self):
         cs = CaseSet(parent_uuid=self._parent_uuid, names=self._names)
-        cs._values = self._values[:]
-        cs._tupset = self._tupset.copy()
         cs._split_idx = self._split_idx
+        cs._set_rows(self._rows().copy())
+        if self._index is not None:
+            cs._index = self._index.copy()
         return cs
-        
-    def _add_values(self, vals):
-        tup = tuple(vals)
-        if tup not in self._tupset:
-            self._tupset.add(tup)
-            self._values.append(tup)
+
+    def _keys(self, rows):
+        """Return a list of index keys for `rows`."""
+        if rows.dtype.kind == 'O':
+            return [_object_key(row) for row in rows]
+        return _row_keys(rows).tolist()
+
+    def _get_index(self):
+        """Return the index of our rows, rebuilding it if necessary."""
+        if self._index is None:
+            self._index = set(self._keys(self._rows()))
+        return self._index
+
+    def _set_rows(self, rows, index=None):
+        super(CaseSet, self)._set_rows(rows)
+        self._index = index
+
+    def _retyped(self):
+        self._index = None
+
+    def _add_rows(self, rows):
+        rows = self._conform(rows)
+        if not self._len and rows.dtype.kind != 'O':
+            # Nothing to check against, so just drop duplicates by sorting
+            # and leave the index to be rebuilt when needed.
+            keep = numpy.unique(_row_keys(rows), return_index=True)[1]
+            if len(keep) < len(rows):
+                rows = rows[numpy.sort(keep)]
+            super(CaseSet, self)._add_rows(rows)
+            self._index = None
+        else:
+            index = self._get_index()
+            keep = []
+            for i, key in enumerate(self._keys(rows)):
+                if key not in index:
+                    index.add(key)
+                    keep.append(i)
+            if len(keep) < len(rows):
+                rows = rows[keep]
+            super(CaseSet, self)._add_rows(rows)
 
     def __contains__(self, case):
         if not isinstance(case, Case):
             return False
         try:
-            values = tuple(self._get_case_data(case))
+            values = self._get_case_data(case)
         except KeyError:
             return False
-        return values in self._tupset
+        row = self._cast(values)
+        if row is None:
+            return False
+        return self._keys(row.reshape(1, -1))[0] in self._get_index()
     
-    def _make_case_set(self, tupset):
+    def _make_case_set(self, rows, index):
         cs = CaseSet(parent_uuid=self._parent_uuid)
         cs._names = self._names[:]
-        cs._values = list(tupset)
-        cs._tupset = tupset
         cs._split_idx = self._split_idx
+        cs._set_rows(rows, index)
         return cs
-    
+
+    def _align(self, case_sets):
+        """Check compatability and return a list of ``(rows, keys, index)``
+        for self and each of `case_sets`, with the rows of each converted to
+        a common storage type.
+        """
+        for cset in case_sets:
+            self._check_compatability(cset)
+        csets = [self] + list(case_sets)
+        dtypes = [cset._data.dtype for cset in csets if len(cset)]
+        dtype = _common_dtype(*dtypes) if dtypes else numpy.dtype(float)
+        aligned = []
+        for cset in csets:
+            rows = cset._rows()
+            if not len(cset):
+                rows = numpy.zeros((0, len(self._names)), dtype=dtype)
+                aligned.append((rows, [], set()))
+            elif rows.dtype == dtype:
+                aligned.append((rows, None, cset._get_index()))
+            else:
+                rows = rows.astype(dtype)
+                keys = self._keys(rows)
+                aligned.append((rows, keys, set(keys)))
+        return aligned
+
+    def _select(self, rows, keys, index):
+        """Return the rows of `rows` (with index `keys`) present in `index`.
+        """
+        if keys is None:
+            keys = self._keys(rows)
+        return rows[numpy.array(map(index.__contains__, keys), dtype=bool)]
+
     def isdisjoint(self, case_set):
         """Return True if this CaseSet has no Cases in common with the
         given CaseSet.
         """
-        self._check_compatability(case_set)
-        return self._tupset.isdisjoint(case_set._tupset)
+        mine, theirs = self._align([case_set])
+        return mine[2].isdisjoint(theirs[2])
     
     def issubset(self, case_set):
         """Return True if every Case in this one is in the given CaseSet."""
-        self._check_compatability(case_set)
-        return self._tupset.issubset(case_set._tupset)
+        mine, theirs = self._align([case_set])
+        return mine[2].issubset(theirs[2])
     
     def issuperset(self, case_set):
         """Return True if every Case in the given CaseSet is in this one."""
-        self._check_compatability(case_set)
-        return self._tupset.issuperset(case_set._tupset)
+        mine, theirs = self._align([case_set])
+        return mine[2].issuperset(theirs[2])
     
     def union(self, *case_sets):
         """Return a new CaseSet with Cases from this one
         and all others.
         """
-        tupsets = []
-        for cset in case_sets:
-            self._check_compatability(cset)
-            tupsets.append(cset._tupset)
-        return self._make_case_set(self._tupset.union(*tupsets))
+        aligned = self._align(case_sets)
+        rows, keys, index = aligned[0]
+        rows = [rows]
+        index = index.copy()
+        for cset_rows, keys, cset_index in aligned[1:]:
+            added = cset_index - index
+            rows.append(self._select(cset_rows, keys, added))
+            index |= added
+        return self._make_case_set(numpy.concatenate(rows), index)
     
     def intersection(self, *case_sets):
         """Return a new CaseSet with Cases that are common to this
         and all others.
         """
-        tupsets = []
-        for cset in case_sets:
-            self._check_compatability(cset)
-            tupsets.append(cset._tupset)
-        return self._make_case_set(self._tupset.intersection(*tupsets))
+        aligned = self._align(case_sets)
+        rows, keys, index = aligned[0]
+        index = index.intersection(*[tup[2] for tup in aligned[1:]])
+        return self._make_case_set(self._select(rows, keys, index), index)
     
     def difference(self, *case_sets):
         """Return a new CaseSet with Cases in this that are not in the
         others.
         """
-        tupsets = []
-        for cset in case_sets:
-            self._check_compatability(cset)
-            tupsets.append(cset._tupset)
-        return self._make_case_set(self._tupset.difference(*tupsets))
+        aligned = self._align(case_sets)
+        rows, keys, index = aligned[0]
+        index = index.difference(*[tup[2] for tup in aligned[1:]])
+        return self._make_case_set(self._select(rows, keys, index), index)
     
     def symmetric_difference(self, case_set):
         """Return a new CaseSet with Cases in either this one or the other but
         not both.
         """
-        self._check_compatability(case_set)
-        return self._make_case_set(self._tupset.symmetric_difference(case_set._tupset))
+        mine, theirs = self._align([case_set])
+        index = mine[2].symmetric_difference(theirs[2])
+        rows = numpy.concatenate([self._select(mine[0], mine[1], index),
+                                  self._select(theirs[0], theirs[1], index)])
+        return self._make_case_set(rows, index)
     
     def clear(self):
         """Remove all case values from this CaseSet, but leave list of
         variables intact.
         """
         super(CaseSet, self).clear()
-        self._tupset = set()
+        self._index = set()
 
     def pop(self, idx=-1):
-        vals = self._values.pop(idx)
-        self._tupset.remove(vals)
-        return self._case_from_values(vals)
+        values = self._delete(idx)
+        self._index = None
+        return self._case_from_values(values)
                 
     def remove(self, case):
         try:
-            values = tuple(self._get_case_data(case))
+            values = self._get_case_data(case)
         except KeyError:
             raise KeyError("Case to be removed is not a member of this CaseSet")
-        self._tupset.remove(values)
-        self._values.remove(values)
+        row = self._cast(values)
+        key = None if row is None else self._keys(row.reshape(1, -1))[0]
+        if key is None or key not in self._get_index():
+            raise KeyError("Case to be removed is not a member of this CaseSet")
+        self._index.remove(key)
+        self._delete(self._find(values))
 
     def __eq__(self, caseset):
         self._check_compatability(caseset)
-        return self._tupset == caseset._tupset
+        return len(self) == len(caseset) and self.issubset(caseset)
     
     def __lt__(self, caseset):
         self._check_compatability(caseset)
-        return self._tupset < caseset._tupset
+        return len(self) < len(caseset) and self.issubset(caseset)
         
     def __le__(self, caseset):
-        self._check_compatability(caseset)
-        return self._tupset <= caseset._tupset
+        return self.issubset(caseset)
         
     def __gt__(self, caseset):
         self._check_compatability(caseset)
-        return self._tupset > caseset._tupset
+        return len(self) > len(caseset) and self.issuperset(caseset)
         
     def __ge__(self, caseset):
-        self._check_compatability(caseset)
-        return self._tupset >= caseset._tupset
+        return self.issuperset(caseset)
         
     def __or__(self, caseset): return self.union(caseset)
     
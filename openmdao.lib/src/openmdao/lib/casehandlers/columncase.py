@@ -0,0 +1,458 @@
+"""A CaseRecorder and CaseIterator that store the cases in a directory of
+binary column files, one per variable.
+
+Numeric and array-valued variables are stored in memory-mapped NumPy
+arrays, so any case can be read in constant time and the values of a
+variable across all cases can be had without copying them.  Values of any
+other type are pickled.
+"""
+
+import os
+import sys
+from cPickle import dump, load, dumps, loads, HIGHEST_PROTOCOL
+
+import numpy
+
+# pylint: disable-msg=E0611,F0401
+from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
+from openmdao.main.case import Case
+
+_META_FILE = 'cases.meta'
+_CASE_COLUMN = '/CASE'  # column holding each case's label, uuid, etc.
+
+
+def _get_dtype(value):
+    """Return (dtype, shape) of the column that can hold the given value
+    or (None, None) if it must be pickled.
+    """
+    if isinstance(value, numpy.ndarray):
+        if value.dtype.kind in 'biufc':
+            return (value.dtype, value.shape)
+    elif isinstance(value, (bool, numpy.bool_)):
+        return (numpy.dtype(bool), ())
+    elif isinstance(value, (int, long, numpy.integer)):
+        return (numpy.dtype(numpy.int64), ())
+    elif isinstance(value, (float, numpy.floating)):
+        return (numpy.dtype(numpy.float64), ())
+    return (None, None)
+
+
+class _Column(object):
+    """The stored values of a single variable. The values of a numeric
+    column are kept in a file of fixed size records, while the values of an
+    object column are pickled into a separate file and the file holds their
+    offsets.  A mask file records which cases actually have a value.
+    """
+
+    def __init__(self, dirname, ident, name, sense, dtype, shape):
+        self.dirname = dirname
+        self.ident = ident
+        self.name = name
+        self.sense = sense
+        self.is_object = dtype is None
+        if self.is_object:
+            self.dtype = numpy.dtype(numpy.int64)
+            self.shape = (2,)
+        else:
+            self.dtype = numpy.dtype(dtype)
+            self.shape = tuple(shape)
+        self._data = None
+        self._mask = None
+        self._pickles = None
+        self._reader = None
+        self._capacity = 0
+
+    @property
+    def filenames(self):
+        """Names of all files used by this column."""
+        names = [self._path('.dat'), self._path('.mask')]
+        if self.is_object:
+            names.append(self._path('.pkl'))
+        return names
+
+    @property
+    def info(self):
+        """Tuple describing this column, as saved in the metadata file."""
+        if self.is_object:
+            return (self.ident, self.name, self.sense, None, None)
+        return (self.ident, self.name, self.sense, self.dtype.str, self.shape)
+
+    def _path(self, ext):
+        return os.path.join(self.dirname, self.ident+ext)
+
+    def _map(self, capacity, mode='r+'):
+        """(Re)map our files for writing, large enough for `capacity` rows."""
+        self.close()
+        self._data = numpy.memmap(self._path('.dat'), dtype=self.dtype,
+                                  mode=mode, shape=(capacity,)+self.shape)
+        self._mask = numpy.memmap(self._path('.mask'), dtype=bool,
+                                  mode=mode, shape=(capacity,))
+        if self.is_object:
+            self._pickles = open(self._path('.pkl'), mode[0]=='w' and 'wb' or 'ab')
+        self._capacity = capacity
+
+    def create(self, capacity):
+        """Create new, empty files for this column."""
+        self._map(capacity, 'w+')
+
+    def open(self, ncases):
+        """Open our existing files for writing after `ncases` cases,
+        discarding anything written after them.
+        """
+        for ext, rowsize in (('.dat', self.dtype.itemsize*numpy.prod(self.shape)),
+                             ('.mask', 1)):
+            with open(self._path(ext), 'r+b') as f:
+                f.truncate(int(ncases*rowsize))
+        self._map(max(ncases, 1))
+
+    def fits(self, value):
+        """Return True if `value` can be stored in this column as is."""
+        if self.is_object:
+            return True
+        dtype, shape = _get_dtype(value)
+        return dtype is not None and shape == self.shape and \
+               numpy.can_cast(dtype, self.dtype)
+
+    def reserve(self, nrows, chunk_size):
+        """Make sure our files have room for at least `nrows` rows."""
+        if nrows > self._capacity:
+            self._map(((nrows-1)//chunk_size + 1) * chunk_size)
+
+    def set(self, index, value, chunk_size):
+        """Store `value` as the value for case `index`."""
+        self.reserve(index+1, chunk_size)
+        if self.is_object:
+            start = self._pickles.tell()
+            self._pickles.write(dumps(value, HIGHEST_PROTOCOL))
+            value = (start, self._pickles.tell())
+        self._data[index] = value
+        self._mask[index] = True
+
+    def flush(self):
+        """Make sure everything we've written is on disk."""
+        if self._data is not None:
+            self._data.flush()
+            self._mask.flush()
+        if self._pickles is not None:
+            self._pickles.flush()
+
+    def close(self):
+        """Flush and release our files."""
+        self.flush()
+        self._data = self._mask = None
+        if self._pickles is not None:
+            self._pickles.close()
+            self._pickles = None
+        self._capacity = 0
+
+    def get_column(self, ncases):
+        """Return an array of our raw values for the first `ncases` cases,
+        mapped directly from our file.
+        """
+        if ncases == 0:  # can't map an empty array
+            return numpy.zeros((0,)+self.shape, self.dtype)
+        return numpy.memmap(self._path('.dat'), dtype=self.dtype, mode='r',
+                            shape=(ncases,)+self.shape)
+
+    def get_mask(self, ncases):
+        """Return an array that's True for each of the first `ncases`
+        cases that have a value for this column.
+        """
+        if ncases == 0:
+            return numpy.zeros(0, bool)
+        return numpy.memmap(self._path('.mask'), dtype=bool, mode='r',
+                            shape=(ncases,))
+
+    def get_objects(self, offsets, mask):
+        """Return a list of the unpickled values for the given `offsets`,
+        with None wherever `mask` is False.
+        """
+        if self._reader is None:
+            self._reader = open(self._path('.pkl'), 'rb')
+        inp = self._reader
+        values = []
+        for (start, end), present in zip(offsets, mask):
+            if present:
+                inp.seek(start)
+                values.append(loads(inp.read(end-start)))
+            else:
+                values.append(None)
+        return values
+
+    def get_value(self, data, index):
+        """Return our value for case `index` from `data`, the array returned
+        by :meth:`get_column`.
+        """
+        if self.is_object:
+            return self.get_objects(data[index:index+1], [True])[0]
+        if self.shape:
+            return numpy.array(data[index])
+        return data[index].item()
+
+
+def _read_meta(dirname):
+    """Return the (ncases, columns) found in the metadata file in `dirname`."""
+    with open(os.path.join(dirname, _META_FILE), 'rb') as inp:
+        meta = load(inp)
+    columns = [_Column(dirname, ident, name, sense, dtype, shape)
+               for ident, name, sense, dtype, shape in meta['columns']]
+    return (meta['ncases'], columns)
+
+
+class ColumnCaseIterator(object):
+    """Pulls Cases from a directory written by a :class:`ColumnCaseRecorder`.
+    Cases can be accessed by index, and all of the values of a variable
+    can be retrieved at once with :meth:`get_column`.
+    """
+
+    implements(ICaseIterator)
+
+    def __init__(self, dirname='cases'):
+        self.dirname = dirname
+
+    @property
+    def dirname(self):
+        """The name of the directory containing the cases."""
+        return self._dirname
+
+    @dirname.setter
+    def dirname(self, value):
+        """Set the directory and read its metadata."""
+        self._dirname = value
+        self._ncases, columns = _read_meta(value)
+        self._columns = dict([(col.name, col) for col in columns])
+        self._case_column = self._columns.pop(_CASE_COLUMN)
+        self._names = [col.name for col in columns
+                                if col.name != _CASE_COLUMN]
+        self._data = {}
+
+    def __len__(self):
+        return self._ncases
+
+    def __iter__(self):
+        return self._next_case()
+
+    def __getitem__(self, index):
+        """Return the Case at the given index."""
+        if index < 0:
+            index += self._ncases
+        if index < 0 or index >= self._ncases:
+            raise IndexError('case index %d out of range' % index)
+        return self._get_case(index)
+
+    def _next_case(self):
+        """ Generator which returns Cases one at a time. """
+        for i in range(self._ncases):
+            yield self._get_case(i)
+
+    def _get_data(self, col):
+        """Return the (data, mask) arrays for the given column."""
+        try:
+            return self._data[col.name]
+        except KeyError:
+            data = (col.get_column(self._ncases), col.get_mask(self._ncases))
+            self._data[col.name] = data
+            return data
+
+    def _get_case(self, index):
+        """Build the Case at the given index."""
+        inputs = []
+        outputs = []
+        for name in self._names:
+            col = self._columns[name]
+            data, mask = self._get_data(col)
+            if mask[index]:
+                if col.sense == 'i':
+                    inputs.append((name, col.get_value(data, index)))
+                else:
+                    outputs.append((name, col.get_value(data, index)))
+        data, mask = self._get_data(self._case_column)
+        label, case_uuid, parent_uuid, msg, retries, max_retries = \
+            self._case_column.get_value(data, index)
+        return Case(inputs=inputs, outputs=outputs, label=label,
+                    case_uuid=case_uuid, parent_uuid=parent_uuid, msg=msg,
+                    retries=retries, max_retries=max_retries)
+
+    def var_names(self, iotype=None):
+        """Return a list of the names of the recorded variables.
+
+        iotype: str or None
+            If 'in', only inputs are returned.
+            If 'out', only outputs are returned.
+            If None (the default), inputs and outputs are returned.
+        """
+        if iotype is None:
+            return self._names[:]
+        sense = iotype[0]
+        return [name for name in self._names
+                     if self._columns[name].sense == sense]
+
+    def get_column(self, name):
+        """Return the values of the named variable across all cases. For a
+        numeric or array variable this is an array mapped directly from its
+        file, with a value of zero wherever a case has no value for the
+        variable (see :meth:`get_mask`). For other variables it's a list,
+        with None as the missing value.
+        """
+        try:
+            col = self._columns[name]
+        except KeyError:
+            raise KeyError("'%s' not found" % name)
+        data, mask = self._get_data(col)
+        if col.is_object:
+            return col.get_objects(data, mask)
+        return data
+
+    def get_mask(self, name):
+        """Return an array that's True for each case that has a value for
+        the named variable.
+        """
+        try:
+            col = self._columns[name]
+        except KeyError:
+            raise KeyError("'%s' not found" % name)
+        return self._get_data(col)[1]
+
+
+class ColumnCaseRecorder(object):
+    """Records Cases to a directory of binary column files, one per variable.
+    Space in the files is allocated `chunk_size` cases at a time. If a
+    variable later gets a value that won't fit in its column, the column is
+    converted to one that will hold it. Integer and boolean values keep
+    their type unless that happens: an integer column which is given a float
+    becomes a float column, so its earlier values are read back as floats.
+
+    Columns are ordered by the case in which their variable first appears,
+    and within a case by name, inputs before outputs.
+
+    Recorded cases are guaranteed to be visible to a
+    :class:`ColumnCaseIterator` after :meth:`flush`, :meth:`close` or
+    :meth:`get_iterator` is called.  A Driver flushes its recorders when it
+    finishes running.
+    """
+
+    implements(ICaseRecorder)
+
+    def __init__(self, dirname='cases', append=False, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self._columns = {}
+        self._order = []  # column names in the order they were added
+        self._ncases = 0
+        self._closed = False
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        self._dirname = dirname
+
+        exists = os.path.exists(os.path.join(dirname, _META_FILE))
+        if append and exists:
+            self._ncases, columns = _read_meta(dirname)
+            for col in columns:
+                col.open(self._ncases)
+                self._columns[col.name] = col
+                self._order.append(col.name)
+        else:
+            if exists:  # start over
+                for col in _read_meta(dirname)[1]:
+                    for fname in col.filenames:
+                        if os.path.exists(fname):
+                            os.remove(fname)
+            self._add_column(_CASE_COLUMN, 'm', None, None)
+            self.flush()
+
+    @property
+    def dirname(self):
+        """The name of the directory containing the cases."""
+        return self._dirname
+
+    def _add_column(self, name, sense, dtype, shape):
+        """Create a new column."""
+        col = _Column(self._dirname, 'c%d' % len(self._order), name, sense,
+                      dtype, shape)
+        col.create(self._ncases + self.chunk_size)
+        self._columns[name] = col
+        self._order.append(name)
+        return col
+
+    def _convert_column(self, col, value):
+        """Replace `col` with a new column that can hold `value` as well
+        as all of its current values.
+        """
+        ncases = self._ncases
+        col.close()
+        data = numpy.array(col.get_column(ncases))
+        mask = numpy.array(col.get_mask(ncases))
+        for fname in col.filenames:
+            os.remove(fname)
+
+        dtype, shape = _get_dtype(value)
+        if dtype is not None and shape == col.shape:
+            newcol = _Column(self._dirname, col.ident, col.name, col.sense,
+                             numpy.promote_types(col.dtype, dtype), shape)
+        else:
+            newcol = _Column(self._dirname, col.ident, col.name, col.sense,
+                             None, None)
+        newcol.create(ncases + self.chunk_size)
+        for i in numpy.flatnonzero(mask):
+            if col.shape:
+                newcol.set(i, data[i], self.chunk_size)
+            else:
+                newcol.set(i, data[i].item(), self.chunk_size)
+        self._columns[col.name] = newcol
+        return newcol
+
+    def record(self, case):
+        """Record the given Case."""
+        if self._closed:
+            raise RuntimeError('Attempt to record on closed recorder')
+
+        index = self._ncases
+        for sense, iotype in (('i', 'in'), ('o', 'out')):
+            for name, value in sorted(case.items(iotype=iotype),
+                                      key=lambda item: item[0]):
+                col = self._columns.get(name)
+                if col is None:
+                    dtype, shape = _get_dtype(value)
+                    col = self._add_column(name, sense, dtype, shape)
+                elif not col.fits(value):
+                    col = self._convert_column(col, value)
+                col.set(index, value, self.chunk_size)
+
+        self._columns[_CASE_COLUMN].set(index,
+                                        (case.label, case.uuid,
+                                         case.parent_uuid, case.msg,
+                                         case.retries, case.max_retries),
+                                        self.chunk_size)
+        self._ncases += 1
+        if self._ncases % self.chunk_size == 0:
+            self.flush()
+
+    def flush(self):
+        """Write all recorded Cases to disk."""
+        if self._closed:
+            return
+        for col in self._columns.values():
+            col.reserve(self._ncases, self.chunk_size)
+            col.flush()
+        meta = {'ncases': self._ncases,
+                'columns': [self._columns[name].info for name in self._order]}
+        # write a new file and move it into place so a reader never sees
+        # a partial one
+        path = os.path.join(self._dirname, _META_FILE)
+        with open(path+'.tmp', 'wb') as out:
+            dump(meta, out, HIGHEST_PROTOCOL)
+        if sys.platform == 'win32' and os.path.exists(path):
+            os.remove(path)
+        os.rename(path+'.tmp', path)
+
+    def close(self):
+        """Write all recorded Cases and close our files."""
+        if not self._closed:
+            self.flush()
+            for col in self._columns.values():
+                col.close()
+            self._closed = True
+
+    def get_iterator(self):
+        """Return a ColumnCaseIterator that points to our current directory."""
+        self.flush()
+        return ColumnCaseIterator(self._dirname)
@@ -3,15 +3,62 @@
 
 import csv
 import cStringIO, StringIO
+import itertools
+import time
+
+import numpy
 
 # pylint: disable-msg=E0611,F0401
 from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
 from openmdao.main.case import Case
 
+class _Layout(object):
+    """Where each field of a row is, determined once from the header (or the
+    user-supplied headers)."""
+
+    def __init__(self):
+        self.has_header = False
+        self.label_field = None
+        self.input_fields = []   # [(index, name), ...]
+        self.output_fields = []  # [(index, name), ...]
+        self.meta_field = None   # Index of 'retries', followed by the rest.
+
+    def columns(self):
+        """Return list of (index, name) for all known columns."""
+        cols = []
+        if self.label_field is not None:
+            cols.append((self.label_field, 'label'))
+        cols.extend(self.input_fields)
+        cols.extend(self.output_fields)
+        if self.meta_field is not None:
+            for i, name in enumerate(_META_NAMES):
+                cols.append((self.meta_field + i, name))
+        return cols
+
+
+_META_NAMES = ('retries', 'max_retries', 'parent_uuid', 'msg')
+
+
+def _to_array(values):
+    """Return `values` as a float array if all are numbers, a string array
+    if all are strings, otherwise an object array."""
+    kinds = set(map(type, values))
+    if kinds == set([float]):
+        return numpy.array(values, dtype=numpy.float64)
+    if kinds and kinds <= set([str, unicode]):
+        return numpy.array(values)
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
 class CSVCaseIterator(object):
     """An iterator that returns :class:`Case` objects from a passed-in iterator
     of cases. This can be useful for runtime-generated cases from an
     optimizer, etc.
+
+    For large files, :meth:`get_columns` and :meth:`iter_chunks` return the
+    data as NumPy column arrays without creating a :class:`Case` per row.
     
     Current limitations:
         Quote character in the input CSV file should be ' or ". Other
@@ -25,9 +72,10 @@ class CSVCaseIterator(object):
     
     def __init__(self, filename='cases.csv', headers=None):
         
-        self.data = []
         self.headers = headers
         self.label_field = None
+        self._dialect = None
+        self._layout = None
         
         #Open Input file
         self.filename = filename
@@ -43,100 +91,165 @@ class CSVCaseIterator(object):
         """Set the CSV file name."""
         
         self._filename = name
+        self._layout = None
         
         with open(self.filename, 'r') as infile:
             # Sniff out the dialect
-            #infile.seek(1)
-            dialect = csv.Sniffer().sniff(infile.readline())
-            infile.seek(0)
-            reader = csv.reader(infile, dialect, quoting=csv.QUOTE_NONNUMERIC)
-            
-            self.data = []
-            for row in reader:
-                self.data.append(row)
+            self._dialect = csv.Sniffer().sniff(infile.readline())
            
-            if self.headers is None:
-                self.need_fieldnames = True
-            else:
-                self.need_fieldnames = False
-                if 'label' in self.headers.values():
-                    for key, value in self.headers.iteritems():
-                        if value == 'label':
-                            self.label_field = key
-                            del self.headers[key]
-                            break
+        if self.headers is None:
+            self.need_fieldnames = True
+        else:
+            self.need_fieldnames = False
+            if 'label' in self.headers.values():
+                for key, value in self.headers.iteritems():
+                    if value == 'label':
+                        self.label_field = key
+                        del self.headers[key]
+                        break
             
     def __iter__(self):
         return self._next_case()
 
+    def _reader(self, infile):
+        """Return a csv reader for `infile`, positioned after any header."""
+        reader = csv.reader(infile, self._dialect,
+                            quoting=csv.QUOTE_NONNUMERIC)
+        if self._layout is None:
+            self._layout = self._parse_layout(reader)
+        elif self._layout.has_header:
+            next(reader, None)
+        return reader
+
+    def _parse_layout(self, reader):
+        """Determine field layout, reading the header row if necessary."""
+        layout = _Layout()
+        layout.label_field = self.label_field
+
+        if self.need_fieldnames:
+            layout.has_header = True
+            row = next(reader, [])
+
+            # OpenMDAO-style CSV file
+            if len(row) > 1 and row[1] == '/INPUTS':
+                input_fields, output_fields = self._parse_fieldnames(row)
+                layout.label_field = 0
+                layout.meta_field = row.index('/METADATA') + 1
+                
+            # Read headers from file
+            else:
+                input_fields = {}
+                output_fields = {}
+                for i, field in enumerate(row):
+                    if field == 'label':
+                        layout.label_field = i
+                    else:
+                        input_fields[i] = field
+        else:
+            input_fields = self.headers
+            output_fields = {}
+
+        layout.input_fields = sorted(input_fields.items())
+        layout.output_fields = sorted(output_fields.items())
+        return layout
+
     def _next_case(self):
         """ Generator which returns Cases one at a time. """
         
-        # Default case label for external csv files that don't have labels.
-        label = "External Case"
-        
-        retries = max_retries = 0
-        parent_uuid = msg = ""
-        retries_field = None
-        if self.headers is None:
-            input_fields = {}
-        else:
-            input_fields = self.headers
-        output_fields = {}
+        with open(self.filename, 'r') as infile:
+            reader = self._reader(infile)
+            layout = self._layout
+
+            # Default case label for external csv files that don't have labels.
+            label = "External Case"
         
-        for row in self.data:
-            
-            # Get fieldnames from file
-            if self.need_fieldnames:
+            retries = max_retries = 0
+            parent_uuid = msg = ""
+            label_field = layout.label_field
+            retries_field = layout.meta_field
+            input_fields = layout.input_fields
+            output_fields = layout.output_fields
 
-                # OpenMDAO-style CSV file
-                if row[1] == '/INPUTS':
-                    
-                    input_fields, output_fields = self._parse_fieldnames(row)
-                        
-                    self.label_field = 0
-                    retries_field = row.index('/METADATA') + 1
-                    max_retries_field = retries_field + 1
-                    parent_uuid_field = retries_field + 2
-                    msg_field = retries_field + 3
-                    
-                # Read headers from file
-                elif self.headers is None:
-                    for i, field in enumerate(row):
-                        if field == 'label':
-                            self.label_field = i
-                        else:
-                            input_fields[i] = field
-                    
-                self.need_fieldnames = False
-                continue
+            for row in reader:
 
-            if self.label_field is not None:
-                label = row[self.label_field]
+                if label_field is not None:
+                    label = row[label_field]
                 
-            if retries_field is not None:
-                retries = row[retries_field]
-                max_retries = row[max_retries_field]
-                parent_uuid = row[parent_uuid_field]
-                msg = row[msg_field]
+                if retries_field is not None:
+                    retries, max_retries, parent_uuid, msg = \
+                        row[retries_field:retries_field+4]
                 
-                # For some reason, default for these in a case is None
-                if not retries:
-                    retries = None
-                if not max_retries:
-                    max_retries = None
+                    # For some reason, default for these in a case is None
+                    if not retries:
+                        retries = None
+                    if not max_retries:
+                        max_retries = None
                 
-            inputs = []
-            for i, field in input_fields.iteritems():
-                inputs.append( (field, row[i]) )
-            
-            outputs = []
-            for i, field in output_fields.iteritems():
-                outputs.append( (field, row[i]) )
+                inputs = [(field, row[i]) for i, field in input_fields]
+                outputs = [(field, row[i]) for i, field in output_fields]
                 
-            yield Case(inputs=inputs, outputs=outputs, label=label, \
-                       retries=retries, max_retries=max_retries, \
-                       parent_uuid=parent_uuid, msg=msg)
+                yield Case(inputs=inputs, outputs=outputs, label=label, \
+                           retries=retries, max_retries=max_retries, \
+                           parent_uuid=parent_uuid, msg=msg)
+
+    def get_names(self):
+        """Return list of column names: 'label' (if present), inputs,
+        outputs, and metadata ('retries', 'max_retries', 'parent_uuid',
+        'msg') for files written by :class:`CSVCaseRecorder`."""
+        if self._layout is None:
+            with open(self.filename, 'r') as infile:
+                self._reader(infile)
+        return [name for i, name in self._layout.columns()]
+
+    def iter_chunks(self, chunksize=10000, names=None):
+        """Generator returning dictionaries of column arrays, keyed by name,
+        for up to `chunksize` rows at a time.
+
+        chunksize: int
+            Maximum number of rows per chunk.
+
+        names: list of strings (optional)
+            Names of columns to return. If None, all columns are returned.
+        """
+        with open(self.filename, 'r') as infile:
+            reader = self._reader(infile)
+            columns = self._layout.columns()
+            if names is not None:
+                indices = dict((name, i) for i, name in columns)
+                try:
+                    columns = [(indices[name], name) for name in names]
+                except KeyError as exc:
+                    raise KeyError('%s not found in %s' % (exc, self.filename))
+
+            while True:
+                rows = list(itertools.islice(reader, chunksize))
+                if not rows:
+                    break
+                data = zip(*rows)
+                yield dict((name, _to_array(data[i])) for i, name in columns)
+
+    def get_columns(self, names=None, chunksize=100000):
+        """Return dictionary of column arrays, keyed by name, for all rows.
+        Numeric columns are float arrays, string columns are string arrays,
+        and columns of mixed type are object arrays.
+
+        names: list of strings (optional)
+            Names of columns to return. If None, all columns are returned.
+        """
+        chunks = list(self.iter_chunks(chunksize, names))
+        if names is None:
+            names = self.get_names()
+        if not chunks:
+            return dict((name, numpy.zeros(0)) for name in names)
+        if len(chunks) == 1:
+            return chunks[0]
+        columns = {}
+        for name in names:
+            arrays = [chunk[name] for chunk in chunks]
+            if len(set([array.dtype.kind for array in arrays])) > 1:
+                arrays = [array.astype(object) for array in arrays]
+            columns[name] = numpy.concatenate(arrays)
+        return columns
 
     def _parse_fieldnames(self, row):
         ''' Parse our input and output fieldname dictionaries
@@ -173,7 +286,7 @@ class CSVCaseRecorder(object):
     implements(ICaseRecorder)
     
     def __init__(self, filename='cases.csv', append=False, delimiter=',',
-                 quotechar = '"'):
+                 quotechar = '"', buffer_size=1000, flush_interval=1.0):
         
         self.delimiter = delimiter
         self.quotechar = quotechar
@@ -181,6 +294,13 @@ class CSVCaseRecorder(object):
         self.outfile = None
         self.csv_writer = None
         self._header_size = 0
+
+        # Rows are written when `buffer_size` rows are pending or
+        # `flush_interval` seconds have passed since the last write.
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.time()
         
         #Open output file
         self._write_headers = False
@@ -196,6 +316,8 @@ class CSVCaseRecorder(object):
     def filename(self, name):
         """Set the CSV file name."""
         
+        if self._buffer:
+            self.flush()
         self._filename = name
         
         if self.append:
@@ -265,12 +387,26 @@ class CSVCaseRecorder(object):
         if self._header_size != len(data):
             raise RuntimeError("number of data points doesn't match header size in CSV recorder")
         
-        self.csv_writer.writerow(data)
+        self._buffer.append(data)
+        if len(self._buffer) >= self.buffer_size or \
+           time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes any buffered cases to the file."""
+
+        if self._buffer:
+            self.csv_writer.writerows(self._buffer)
+            self._buffer = []
+        if self.outfile is not None:
+            self.outfile.flush()
+        self._last_flush = time.time()
 
     def close(self):
         """Closes the file."""
 
         if self.csv_writer is not None:
+            self.flush()
             if not isinstance(self.outfile,
                               (StringIO.StringIO, cStringIO.OutputType)):
                 # Closing a StringIO deletes its contents.
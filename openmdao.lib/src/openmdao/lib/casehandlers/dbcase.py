@@ -4,6 +4,7 @@ DB (Python's sqlite.)
 
 import sys
 import sqlite3
+import time
 import uuid
 from cPickle import dumps, loads, HIGHEST_PROTOCOL, UnpicklingError
 from optparse import OptionParser
@@ -114,19 +115,53 @@ class DBCaseIterator(object):
 class DBCaseRecorder(object):
     """Records Cases to a relational DB (sqlite). Values other than floats,
     ints or strings are pickled and are opaque to SQL queries.
+
+    dbfile: str (optional) [':memory:']
+        The name of the DB file, or ``:memory:`` for an in-memory database.
+
+    model_id: str (optional) ['']
+        Identifier stored with each case.
+
+    append: bool (optional) [False]
+        If True, add to existing tables rather than creating new ones.
+
+    buffered: bool (optional) [False]
+        If True, cases are held in memory and written in bulk, one
+        transaction per batch, and a file DB is switched to WAL journal
+        mode. Buffered cases are written when the batch is full, when
+        *batch_interval* has passed, when :meth:`flush` or :meth:`close`
+        is called, and when a Driver using this recorder finishes running,
+        so a crash loses at most one batch.
+
+    batch_size: int (optional) [100]
+        Maximum number of cases held before they're written in buffered
+        mode.
+
+    batch_interval: float (optional) [5.0]
+        Maximum number of seconds between writes in buffered mode.
     """
     
     implements(ICaseRecorder)
     
-    def __init__(self, dbfile=':memory:', model_id='', append=False):
+    def __init__(self, dbfile=':memory:', model_id='', append=False,
+                 buffered=False, batch_size=100, batch_interval=5.0):
         self.dbfile = dbfile  # this creates the connection
         self.model_id = model_id
+        self.buffered = buffered
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._buffer = []
+        self._last_flush = time.time()
         
         if append:
             exstr = 'if not exists'
         else:
             exstr = ''
         
+        if buffered and dbfile != ':memory:':
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+
         self._connection.execute("""
         create table %s cases(
          id INTEGER PRIMARY KEY,
@@ -159,50 +194,67 @@ class DBCaseRecorder(object):
     def dbfile(self, value):
         """Set the DB file and connect to it."""
         self._dbfile = value
-        self._connection = sqlite3.connect(value)
-        self._iter_conn = sqlite3.connect(value)
+        # we may be used from a writer thread (see AsyncCaseRecorder)
+        self._connection = sqlite3.connect(value, check_same_thread=False)
+        self._iter_conn = sqlite3.connect(value, check_same_thread=False)
     
     def record(self, case):
         """Record the given Case."""
         if self._connection is None:
             raise RuntimeError('Attempt to record on closed recorder')
 
-        cur = self._connection.cursor()
-        
-        cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
-                           values (?,?,?,?,?,?,?,DATETIME('NOW'))""", 
-                                     (None, case.uuid, case.parent_uuid, case.label,
-                                      case.msg or '', case.retries, 
-                                      self.model_id))
-        case_id = cur.lastrowid
-        # insert the inputs and outputs into the vars table.  Pickle them if they're not one of the
-        # built-in types int, float, or str.
+        # timeEnter has the same format as sqlite's DATETIME('NOW')
+        self._buffer.append((case,
+                             time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())))
+        if not self.buffered or len(self._buffer) >= self.batch_size or \
+           time.time()-self._last_flush >= self.batch_interval:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered Cases to the DB in a single transaction."""
+        self._last_flush = time.time()
+        if not self._buffer or self._connection is None:
+            return
         
-        for name,value in case.items(iotype='in'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'i', value)
-            else:
-                v = (None, name, case_id, 'i', sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
-        for name,value in case.items(iotype='out'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'o', value)
-            else:
-                v = (None, name, case_id, 'o', sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
+        cur = self._connection.cursor()
+        varrows = []
+        for case, time_enter in self._buffer:
+            cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
+                               values (?,?,?,?,?,?,?,?)""", 
+                                         (None, case.uuid, case.parent_uuid, case.label,
+                                          case.msg or '', case.retries, 
+                                          self.model_id, time_enter))
+            case_id = cur.lastrowid
+            # insert the inputs and outputs into the vars table.  Pickle them if they're not one of the
+            # built-in types int, float, or str.
+            for sense, iotype in (('i', 'in'), ('o', 'out')):
+                for name,value in case.items(iotype=iotype):
+                    if not isinstance(value, (float,int,str)):
+                        value = sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL))
+                    varrows.append((None, name, case_id, sense, value))
+        cur.executemany("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
+                        varrows)
         self._connection.commit()
+        self._buffer = []
     
     def close(self):
-        """Commit and close DB connection if not using ``:memory:``."""
-        if self._connection is not None and self._dbfile != ':memory:':
+        """Write any buffered Cases, index the variable table, then
+        commit and close DB connection if not using ``:memory:``.
+        """
+        if self._connection is not None:
+            self.flush()
+            self._connection.execute("create index if not exists "
+                                     "casevars_case_id on casevars(case_id)")
+            self._connection.execute("create index if not exists "
+                                     "casevars_name on casevars(name)")
             self._connection.commit()
-            self._connection.close()
-            self._connection = None
+            if self._dbfile != ':memory:':
+                self._connection.close()
+                self._connection = None
 
     def get_iterator(self):
         """Return a DBCaseIterator that points to our current DB."""
+        self.flush()
         return DBCaseIterator(dbfile=self._dbfile, connection=self._connection)
 
 
@@ -0,0 +1,131 @@
+"""
+Test for AsyncCaseRecorder.
+"""
+
+import threading
+import time
+import unittest
+
+from openmdao.main.api import Assembly, Case, set_as_top
+from openmdao.test.execcomp import ExecComp
+from openmdao.lib.casehandlers.api import AsyncCaseRecorder, DBCaseRecorder, \
+                                          ListCaseIterator, ListCaseRecorder
+from openmdao.lib.drivers.simplecid import SimpleCaseIterDriver
+from openmdao.util.testutil import assert_raises
+
+
+class SlowRecorder(ListCaseRecorder):
+    """Records cases slowly, noting the thread they were recorded in."""
+
+    def __init__(self, delay=0.):
+        super(SlowRecorder, self).__init__()
+        self.delay = delay
+        self.threads = set()
+        self.flushed = 0
+
+    def record(self, case):
+        time.sleep(self.delay)
+        self.threads.add(threading.current_thread())
+        if case.label == 'bad':
+            raise ValueError('bad case')
+        super(SlowRecorder, self).record(case)
+
+    def flush(self):
+        self.flushed += 1
+
+
+class AsyncCaseRecorderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.top = top = set_as_top(Assembly())
+        driver = top.add('driver', SimpleCaseIterDriver())
+        top.add('comp1', ExecComp(exprs=['z=x+y']))
+        top.add('comp2', ExecComp(exprs=['z=x+1']))
+        top.connect('comp1.z', 'comp2.x')
+        driver.workflow.add(['comp1', 'comp2'])
+
+        # now create some Cases
+        outputs = ['comp1.z', 'comp2.z']
+        cases = []
+        for i in range(10):
+            inputs = [('comp1.x', i), ('comp1.y', i*2)]
+            cases.append(Case(inputs=inputs, outputs=outputs, label='case%s'%i))
+        driver.iterator = ListCaseIterator(cases)
+
+    def test_driver(self):
+        recorder = AsyncCaseRecorder(DBCaseRecorder(), maxsize=3)
+        self.top.driver.recorders = [recorder]
+        self.top.run()
+
+        cases = list(recorder.get_iterator())
+        self.assertEqual(len(cases), 10)
+        for case in cases:
+            self.assertEqual(case['comp2.z'], case['comp1.x']*3+1)
+        stats = recorder.stats
+        self.assertEqual(stats['recorded'], 10)
+        self.assertEqual(stats['dropped'], 0)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertTrue(stats['max_queue_depth'] <= 3)
+        recorder.close()
+
+    def test_writer_thread(self):
+        slow = SlowRecorder(0.01)
+        recorder = AsyncCaseRecorder(slow)
+        start = time.time()
+        for i in range(10):
+            recorder.record(Case(label='case%s'%i))
+        self.assertTrue(time.time()-start < 0.1)
+        recorder.flush()
+        self.assertEqual([case.label for case in slow.cases],
+                         ['case%s'%i for i in range(10)])
+        self.assertEqual(slow.flushed, 1)
+        self.assertEqual(len(slow.threads), 1)
+        self.assertFalse(threading.current_thread() in slow.threads)
+        self.assertTrue(recorder.stats['record_time'] >= 0.1)
+
+        recorder.close()
+        assert_raises(self, "recorder.record(Case())", globals(), locals(),
+                      RuntimeError, 'Attempt to record on closed recorder')
+
+    def test_overflow(self):
+        slow = SlowRecorder(0.05)
+        recorder = AsyncCaseRecorder(slow, maxsize=1, overflow='drop')
+        for i in range(5):
+            recorder.record(Case(label='case%s'%i))
+        recorder.flush()
+        stats = recorder.stats
+        self.assertTrue(stats['dropped'] > 0)
+        self.assertEqual(stats['recorded'] + stats['dropped'], 5)
+        self.assertEqual(len(slow.cases), stats['recorded'])
+        recorder.close()
+
+        recorder = AsyncCaseRecorder(SlowRecorder(0.05), maxsize=1,
+                                     overflow='error')
+        try:
+            for i in range(5):
+                recorder.record(Case(label='case%s'%i))
+        except RuntimeError as err:
+            self.assertEqual(str(err), 'AsyncCaseRecorder queue is full')
+        else:
+            self.fail('expected RuntimeError')
+        recorder.close()
+
+        assert_raises(self, "AsyncCaseRecorder(slow, overflow='wait')",
+                      globals(), locals(), ValueError,
+                      "overflow must be 'block', 'drop', or 'error'")
+
+    def test_error(self):
+        recorder = AsyncCaseRecorder(SlowRecorder())
+        recorder.record(Case(label='bad'))
+        assert_raises(self, "recorder.flush()", globals(), locals(),
+                      ValueError, 'bad case')
+        # the error is only reported once
+        recorder.record(Case(label='good'))
+        recorder.flush()
+        self.assertEqual([case.label for case in recorder.recorder.cases],
+                         ['good'])
+        recorder.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
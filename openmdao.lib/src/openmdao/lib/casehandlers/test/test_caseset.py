@@ -1,5 +1,7 @@
 import unittest
 
+import numpy
+
 from openmdao.main.api import Case
 from openmdao.lib.casehandlers.api import CaseSet, CaseArray, ListCaseIterator, \
                                           caseiter_to_caseset
@@ -77,6 +79,65 @@ class CaseArrayTestCase(unittest.TestCase):
         self.assertFalse(self.case2 in ca)
         self.assertFalse(None in ca)
         
+    def test_get_array(self):
+        ca = CaseArray({'x': [1., 2., 3.], 'y': [4., 5., 6.]}, names=['x', 'y'])
+        self.assertEqual(ca.get_array().shape, (3, 2))
+        self.assertEqual(ca.get_array().dtype, numpy.float64)
+        self.assertEqual(ca.get_array(['y']).tolist(), [[4.], [5.], [6.]])
+        ca = CaseArray({'x': [1., 2., 3.], 'y': [4, 5, 6]}, names=['x', 'y'])
+        self.assertEqual(ca.get_array().dtype, object)
+        self.assertEqual(ca.get_array(['y']).tolist(), [[4], [5], [6]])
+        try:
+            ca.get_array(['z'])
+        except KeyError, err:
+            self.assertEqual(str(err), "'CaseSet has no input or outputs named z'")
+        else:
+            self.fail("expected KeyError")
+
+    def test_mixed_types(self):
+        ca = CaseArray()
+        ca.record(Case(inputs=[('x', 1), ('y', 2)]))
+        self.assertEqual(ca['x'], [1])
+        ca.record(Case(inputs=[('x', 1.5), ('y', 2)]))
+        self.assertEqual(ca['x'], [1, 1.5])
+        self.assertEqual(type(ca['x'][0]), int)
+        ca.record(Case(inputs=[('x', 'abc'), ('y', 2)]))
+        ca.record(Case(inputs=[('x', [1, 2]), ('y', 2)]))
+        self.assertEqual(ca['x'], [1., 1.5, 'abc', [1, 2]])
+        self.assertTrue(Case(inputs=[('x', 'abc'), ('y', 2)]) in ca)
+        self.assertFalse(Case(inputs=[('x', 'abcd'), ('y', 2)]) in ca)
+        ca.remove(Case(inputs=[('x', 1.5), ('y', 2)]))
+        self.assertEqual(ca['x'], [1., 'abc', [1, 2]])
+        self.assertEqual(ca.pop(0)['x'], 1.)
+        self.assertEqual(len(ca), 2)
+
+    def test_round_trip_types(self):
+        big = 2**60+1
+        arr = numpy.array([1., 2.])
+        rows = [(3, 1.5, True, big, arr),
+                (4, 2.5, False, big+2, arr*2),
+                (5, 3.5, True, 2, arr*3)]
+        for cls in (CaseArray, CaseSet):
+            ca = cls()
+            for n, x, flag, i, a in rows:
+                ca.record(Case(inputs=[('n', n), ('x', x), ('flag', flag),
+                                       ('i', i), ('a', a)]))
+            for row, case in zip(rows, ca):
+                n, x, flag, i, a = row
+                for name, value in (('n', n), ('x', x), ('flag', flag),
+                                    ('i', i)):
+                    self.assertEqual(case[name], value)
+                    self.assertEqual(type(case[name]), type(value))
+                self.assertEqual(case['a'].tolist(), a.tolist())
+
+            # All floats or all ints are stored natively.
+            for values, dtype in (([1., 2.], numpy.float64),
+                                  ([1, 2], numpy.int_)):
+                ca = cls({'x': values, 'y': values}, names=['x', 'y'])
+                self.assertEqual(ca.get_array().dtype, dtype)
+                for case, value in zip(ca, values):
+                    self.assertEqual(type(case['x']), type(value))
+
 
 class CaseSetTestCase(unittest.TestCase):
 
@@ -222,6 +283,37 @@ class CaseSetTestCase(unittest.TestCase):
         self.assertEqual(len(cs_intersect), 1)
         self.assertEqual(cs_intersect[0], self.case1)
         
+    def test_set_ops_large(self):
+        data = numpy.arange(3000.).reshape(1000, 3)
+        cs1 = CaseSet({'a': data[:600, 0], 'b': data[:600, 1], 
+                       'c': data[:600, 2]}, names=['a', 'b', 'c'])
+        cs2 = CaseSet({'a': data[400:, 0], 'b': data[400:, 1],
+                       'c': data[400:, 2]}, names=['a', 'b', 'c'])
+        self.assertEqual(len(cs1 | cs2), 1000)
+        self.assertEqual((cs1 | cs2)['a'], list(data[:, 0]))
+        self.assertEqual((cs1 & cs2)['a'], list(data[400:600, 0]))
+        self.assertEqual((cs1 - cs2)['a'], list(data[:400, 0]))
+        self.assertEqual(len(cs1.symmetric_difference(cs2)), 800)
+        self.assertTrue(cs1 - cs2 < cs1)
+        self.assertTrue(Case(inputs=[('a', 3.), ('b', 4.), ('c', 5.)]) in cs1)
+        self.assertFalse(Case(inputs=[('a', 3.), ('b', 4.), ('c', 5.)]) in cs2)
+
+        # Integer data matches equal floats when combined with them.
+        cs3 = CaseSet({'a': [0, 1], 'b': [1, 2], 'c': [2, 3]},
+                      names=['a', 'b', 'c'])
+        self.assertEqual(len(cs3 & cs1), 1)
+        self.assertEqual(len(cs3 | cs1), 601)
+
+    def test_dict_duplicates(self):
+        cs = CaseSet({'x': [1, 2, 2, 3, 1], 'y': [0., -0., 0., 1., 0.]},
+                     names=['x', 'y'])
+        self.assertEqual(cs['x'], [1, 2, 3])
+        cs.record(Case(inputs=[('x', 3), ('y', 1.)]))
+        self.assertEqual(len(cs), 3)
+        cs2 = CaseSet()
+        cs2.update(cs, cs)
+        self.assertTrue(cs2 == cs)
+        
     def test_caseiter_to_caseset(self):
         cases = ListCaseIterator(self.caselist[3:])
         cs = caseiter_to_caseset(cases)
@@ -232,6 +324,19 @@ class CaseSetTestCase(unittest.TestCase):
             self.assertTrue(set(case2.keys('in')).issubset(case1.keys('in')))
             self.assertTrue(set(case2.keys('out')).issubset(case1.keys('out')))
             
+    def test_array_values(self):
+        cs = CaseSet()
+        cs.record(Case(inputs=[('a', numpy.array([1., 2.])), ('b', [3])]))
+        cs.record(Case(inputs=[('a', numpy.array([1., 2.])), ('b', [3])]))
+        cs.record(Case(inputs=[('a', numpy.array([1., 3.])), ('b', [3])]))
+        self.assertEqual(len(cs), 2)
+        self.assertTrue(Case(inputs=[('a', numpy.array([1., 3.])),
+                                     ('b', [3])]) in cs)
+        self.assertFalse(Case(inputs=[('a', numpy.array([1., 4.])),
+                                      ('b', [3])]) in cs)
+        cs.remove(Case(inputs=[('a', numpy.array([1., 2.])), ('b', [3])]))
+        self.assertEqual(cs['a'][0].tolist(), [1., 3.])
+
     def test_contains(self):
         cs = CaseSet()
         cs.record(self.case1)
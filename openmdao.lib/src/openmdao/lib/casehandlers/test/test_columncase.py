@@ -0,0 +1,167 @@
+"""
+Test for ColumnCaseRecorder and ColumnCaseIterator.
+"""
+
+import logging
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+import numpy
+
+from openmdao.main.api import Assembly, Case, set_as_top
+from openmdao.test.execcomp import ExecComp
+from openmdao.lib.casehandlers.api import ColumnCaseIterator, \
+                                          ColumnCaseRecorder, \
+                                          DumpCaseRecorder, ListCaseIterator
+from openmdao.lib.drivers.simplecid import SimpleCaseIterDriver
+from openmdao.main.uncertain_distributions import NormalDistribution
+from openmdao.util.testutil import assert_raises
+
+
+class ColumnCaseRecorderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tdir = tempfile.mkdtemp()
+        self.dirname = os.path.join(self.tdir, 'cases')
+        self.top = top = set_as_top(Assembly())
+        driver = top.add('driver', SimpleCaseIterDriver())
+        top.add('comp1', ExecComp(exprs=['z=x+y']))
+        top.add('comp2', ExecComp(exprs=['z=x+1']))
+        top.connect('comp1.z', 'comp2.x')
+        driver.workflow.add(['comp1', 'comp2'])
+
+        # now create some Cases
+        outputs = ['comp1.z', 'comp2.z']
+        cases = []
+        for i in range(10):
+            inputs = [('comp1.x', i), ('comp1.y', i*2)]
+            cases.append(Case(inputs=inputs, outputs=outputs, label='case%s'%i))
+        driver.iterator = ListCaseIterator(cases)
+
+    def tearDown(self):
+        for recorder in self.top.driver.recorders:
+            recorder.close()
+        try:
+            shutil.rmtree(self.tdir)
+        except OSError:
+            logging.error("problem removing directory %s" % self.tdir)
+
+    def test_inout(self):
+        self.top.driver.recorders = [ColumnCaseRecorder(self.dirname,
+                                                        chunk_size=4)]
+        self.top.run()
+
+        # now use the recorded cases as source of Cases
+        self.top.driver.iterator = self.top.driver.recorders[0].get_iterator()
+
+        sout = StringIO.StringIO()
+        self.top.driver.recorders = [DumpCaseRecorder(sout)]
+        self.top.run()
+        expected = [
+            'Case: case8',
+            '   uuid: ad4c1b76-64fb-11e0-95a8-001e8cf75fe',
+            '   inputs:',
+            '      comp1.x: 8',
+            '      comp1.y: 16',
+            '   outputs:',
+            '      comp1.z: 24.0',
+            '      comp2.z: 25.0',
+            ]
+        lines = sout.getvalue().split('\n')
+        for index, line in enumerate(lines):
+            if line.startswith('Case: case8'):
+                for i in range(len(expected)):
+                    if expected[i].startswith('   uuid:'):
+                        self.assertTrue(lines[index+i].startswith('   uuid:'))
+                    else:
+                        self.assertEqual(lines[index+i], expected[i])
+                break
+        else:
+            self.fail("couldn't find the expected Case")
+
+    def test_columns(self):
+        recorder = ColumnCaseRecorder(self.dirname, chunk_size=4)
+        for i in range(10):
+            inputs = [('comp1.x', i), ('comp1.y', numpy.arange(3.)*i),
+                      ('comp1.s', 'str%d' % i), ('comp1.n', i)]
+            if i >= 5:
+                inputs.append(('comp1.late', i*2.))
+            if i == 7:  # converts the column to float
+                inputs[0] = ('comp1.x', 7.5)
+            outputs = [('comp2.normal', NormalDistribution(float(i), 0.5))]
+            recorder.record(Case(inputs=inputs, outputs=outputs,
+                                 label='case%s'%i))
+        iterator = recorder.get_iterator()
+
+        self.assertEqual(len(iterator), 10)
+        self.assertEqual(iterator.var_names(),
+                         ['comp1.n', 'comp1.s', 'comp1.x', 'comp1.y',
+                          'comp2.normal', 'comp1.late'])
+        self.assertEqual(iterator.var_names('out'), ['comp2.normal'])
+
+        x = iterator.get_column('comp1.x')
+        self.assertTrue(isinstance(x, numpy.memmap))
+        self.assertEqual(list(x), [0., 1., 2., 3., 4., 5., 6., 7.5, 8., 9.])
+        y = iterator.get_column('comp1.y')
+        self.assertEqual(y.shape, (10, 3))
+        self.assertEqual(list(y[:,2]), [i*2. for i in range(10)])
+        self.assertEqual(iterator.get_column('comp1.s')[3], 'str3')
+        self.assertEqual(list(iterator.get_mask('comp1.late')),
+                         [False]*5 + [True]*5)
+        self.assertEqual(list(iterator.get_column('comp1.late')[5:]),
+                         [10., 12., 14., 16., 18.])
+        assert_raises(self, "iterator.get_column('foo')", globals(), locals(),
+                      KeyError, "\"'foo' not found\"")
+
+        case = iterator[3]
+        self.assertEqual(case.label, 'case3')
+        self.assertEqual(case['comp1.n'], 3)
+        self.assertTrue(isinstance(case['comp1.n'], int))
+        # 'comp1.x' was promoted to float by case 7.
+        self.assertEqual(case['comp1.x'], 3.)
+        self.assertTrue(isinstance(case['comp1.x'], float))
+        self.assertEqual(list(case['comp1.y']), [0., 3., 6.])
+        self.assertEqual(case['comp2.normal'].mu, 3.)
+        self.assertFalse('comp1.late' in case)
+        self.assertEqual(iterator[-1]['comp1.late'], 18.)
+        assert_raises(self, 'iterator[10]', globals(), locals(), IndexError,
+                      'case index 10 out of range')
+
+        labels = [case.label for case in iterator]
+        self.assertEqual(labels, ['case%s'%i for i in range(10)])
+
+    def test_append(self):
+        recorder = ColumnCaseRecorder(self.dirname)
+        recorder.record(Case(inputs=[('x', 1.), ('y', 2.)]))
+        recorder.close()
+        recorder = ColumnCaseRecorder(self.dirname, append=True)
+        recorder.record(Case(inputs=[('x', 3.)]))
+        iterator = recorder.get_iterator()
+        self.assertEqual(len(iterator), 2)
+        self.assertEqual(list(iterator.get_column('x')), [1., 3.])
+        self.assertEqual(list(iterator.get_mask('y')), [True, False])
+        recorder.close()
+
+        # without append, we start over
+        recorder = ColumnCaseRecorder(self.dirname)
+        self.assertEqual(len(recorder.get_iterator()), 0)
+        recorder.close()
+        self.assertEqual(len(ColumnCaseIterator(self.dirname)), 0)
+
+    def test_close(self):
+        recorder = ColumnCaseRecorder(self.dirname)
+        case = Case(inputs=[('str', 'Normal String'),
+                            ('list', ['Hello', 'world'])])
+        recorder.record(case)
+        recorder.close()
+        assert_raises(self, 'recorder.record(case)', globals(), locals(),
+                      RuntimeError, 'Attempt to record on closed recorder')
+        iterator = ColumnCaseIterator(self.dirname)
+        self.assertEqual(iterator[0]['list'], ['Hello', 'world'])
+
+
+if __name__ == '__main__':
+    unittest.main()
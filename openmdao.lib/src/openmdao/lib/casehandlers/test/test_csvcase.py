@@ -5,6 +5,7 @@ import os
 import StringIO
 import unittest
 
+import numpy
 
 from openmdao.lib.casehandlers.api import CSVCaseIterator, CSVCaseRecorder, \
                                           ListCaseIterator, ListCaseRecorder, \
@@ -340,6 +341,52 @@ class CSVCaseRecorderTestCase(unittest.TestCase):
             #self.top.driver.recorders[0].close()
             #self.fail('ValueError Expected')
         
+    def test_buffering(self):
+        rec = CSVCaseRecorder(filename=self.filename, buffer_size=3,
+                              flush_interval=1000.)
+        for i in range(5):
+            rec.record(Case(inputs=[('comp1.x', float(i))], label='case%s' % i))
+        with open(self.filename, 'r') as inp:
+            self.assertEqual(len(inp.readlines()), 4)  # Header + 3 cases.
+        rec.flush()
+        with open(self.filename, 'r') as inp:
+            self.assertEqual(len(inp.readlines()), 6)
+        rec.close()
+
+    def test_columns(self):
+        self.top.driver.recorders = [CSVCaseRecorder(filename=self.filename)]
+        self.top.run()
+        it = self.top.driver.recorders[0].get_iterator()
+        names = it.get_names()
+        self.assertEqual(names[0], 'label')
+        self.assertEqual(set(names),
+                         set(['label', 'comp1.x', 'comp1.x_array[1]', 'comp1.y',
+                              'comp1.a_array[2]', 'comp1.a_string', 'comp1.z',
+                              'comp2.z', 'retries', 'max_retries',
+                              'parent_uuid', 'msg']))
+
+        columns = it.get_columns()
+        self.assertEqual(columns['comp1.z'].dtype, numpy.float64)
+        self.assertEqual(list(columns['label']),
+                         ['case%s' % i for i in range(10)])
+        self.assertTrue(all(columns['comp1.z'] ==
+                            columns['comp1.x'] + columns['comp1.y']))
+        self.assertEqual(columns['comp1.a_string'][3], "Hello',;','")
+
+        chunks = list(it.iter_chunks(4, names=['comp2.z']))
+        self.assertEqual([len(chunk['comp2.z']) for chunk in chunks],
+                         [4, 4, 2])
+        self.assertEqual(list(numpy.concatenate([chunk['comp2.z']
+                                                 for chunk in chunks])),
+                         list(columns['comp2.z']))
+
+        # Case iteration still works after bulk reads.
+        self.assertEqual(len(list(it)), 10)
+
+        assert_raises(self, "it.get_columns(['no_such_var'])",
+                      globals(), locals(), KeyError,
+                      "\"'no_such_var' not found in %s\"" % self.filename)
+
     def test_close(self):
         self.top.driver.recorders = [CSVCaseRecorder(filename=self.filename)]
         self.top.run()
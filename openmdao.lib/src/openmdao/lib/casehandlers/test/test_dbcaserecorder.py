@@ -206,6 +206,46 @@ class DBCaseRecorderTestCase(unittest.TestCase):
             except OSError:
                 logging.error("problem removing directory %s" % tmpdir)
 
+    def test_buffered(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dfile = os.path.join(tmpdir, 'junk.db')
+            recorder = DBCaseRecorder(dfile, buffered=True, batch_size=4,
+                                      batch_interval=1000.)
+            for i in range(6):
+                inputs = [('comp1.x', i), ('comp1.y', i*2.)]
+                outputs = [('comp1.z', i*1.5),
+                           ('comp2.normal', NormalDistribution(float(i),0.5))]
+                recorder.record(Case(inputs=inputs, outputs=outputs,
+                                     label='case%s'%i))
+            # only the first batch has been written so far
+            self.assertEqual(len(case_db_to_dict(dfile, ['comp1.x'])['comp1.x']), 4)
+
+            # get_iterator writes the rest
+            cases = list(recorder.get_iterator())
+            self.assertEqual([case.label for case in cases],
+                             ['case%s'%i for i in range(6)])
+            for i, case in enumerate(cases):
+                self.assertEqual(case['comp1.y'], i*2.)
+                self.assertEqual(case['comp2.normal'].mu, float(i))
+            recorder.close()
+
+            # the driver flushes its recorders when it's done
+            dfile2 = os.path.join(tmpdir, 'junk2.db')
+            recorder = DBCaseRecorder(dfile2, buffered=True, batch_size=1000,
+                                      batch_interval=1000.)
+            self.top.driver.recorders = [recorder]
+            self.top.run()
+            varinfo = case_db_to_dict(dfile2, ['comp1.x', 'comp2.z'])
+            self.assertEqual(varinfo['comp1.x'], range(10))
+            self.assertEqual(varinfo['comp2.z'], [i*3.+1. for i in range(10)])
+            recorder.close()
+        finally:
+            try:
+                shutil.rmtree(tmpdir)
+            except OSError:
+                logging.error("problem removing directory %s" % tmpdir)
+
 
 class NestedCaseTestCase(unittest.TestCase):
 
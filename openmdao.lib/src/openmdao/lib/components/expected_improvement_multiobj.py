@@ -24,6 +24,7 @@ from openmdao.main.component import Component
 from openmdao.util.decorators import stub_if_missing_deps
 
 from openmdao.lib.casehandlers.api import CaseSet
+from openmdao.lib.components.pareto_filter import NonDominatedArchive
 from openmdao.main.uncertain_distributions import NormalDistribution
 
 @stub_if_missing_deps(*_check)
@@ -55,25 +56,25 @@ class MultiObjExpectedImprovement(Component):
     def __init__(self ,*args, **kwargs):
         super(MultiObjExpectedImprovement, self).__init__(*args, **kwargs)
         self.y_star = None
+        self._front = None
         
         
     def _reset_y_star_fired(self):
         self.y_star = None
+        self._front = None
     
     def get_y_star(self):
-        criteria_count = len(self.criteria)
-        
-        flat_crit= self.criteria.ravel()
-
+        """Returns the non-dominated points of `best_cases`, sorted on the
+        first objective."""
         try:
             y_star = zip(*[self.best_cases[crit] for crit in self.criteria])
         except KeyError:
             self.raise_exception('no cases in the provided case_set had output '
                  'matching the provided criteria, %s'%self.criteria, ValueError)
         
-        #sort list on first objective
-        y_star = array(y_star)[array([i[0] for i in y_star]).argsort()]
-        return y_star
+        self._front = NonDominatedArchive(len(self.criteria))
+        self._front.update(y_star)
+        return self._front.points
         
     def _2obj_PI(self,mu,sigma):
         """Calculates the multi-objective probability of improvement
@@ -140,26 +141,11 @@ class MultiObjExpectedImprovement(Component):
             mcei = 0
         return mcei
  
-    def _dom(self,a,b):
-        """determines if a completely dominates b
-       returns True is if does
-    """
-        comp = [c1<c2 for c1,c2 in zip(a,b)]
-        if sum(comp)==len(self.criteria):
-            return True        
-        return False
-    
     def _nobj_PI(self,mu,sigma):
         cov = diag(array(sigma)**2)
         rands = random.multivariate_normal(mu,cov,self.n)
-        num = 0 #number of cases that dominate the current Pareto set
-
-        for random_sample in rands:
-            for par_point in self.y_star:
-                #par_point = [p[2] for p in par_point.outputs]
-                if self._dom(par_point,random_sample):
-                    num = num+1
-                    break
+        #number of samples strictly dominated by the current Pareto set
+        num = self._front.dominated_mask(rands, strict=True).sum()
         pi = (self.n-num)/float(self.n)
         return pi
         
@@ -171,7 +157,7 @@ class MultiObjExpectedImprovement(Component):
         mu = [objective.mu for objective in self.predicted_values]
         sig = [objective.sigma for objective in self.predicted_values]
         
-        if self.y_star == None:
+        if self.y_star is None:
             self.y_star = self.get_y_star()
 
         n_objs = len(self.criteria)
@@ -41,9 +41,8 @@ class ExternalCode(ComponentWithDerivatives):
     resources = Dict({}, iotype='in',
                      desc='Resources required to run this component.')
     poll_delay = Float(0., low=0., units='s', iotype='in',
-                       desc='Delay between polling for command completion.'
-                            ' A value of zero will use an internally computed'
-                            ' default.')
+                       desc='Not used, command completion is detected'
+                            ' without polling. Retained for compatibility.')
     timeout = Float(0., low=0., iotype='in', units='s',
                     desc='Maximum time to wait for command completion.'
                          ' A value of zero implies an infinite wait.')
@@ -1,5 +1,15 @@
 """ Pareto Filter -- finds non-dominated cases. """
 
+from bisect import bisect_left, bisect_right
+
+import logging
+
+try:
+    import numpy
+except ImportError as err:
+    logging.warn("In %s: %r" % (__file__, err))
+_check = ['numpy']
+
 # pylint: disable-msg=E0611,F0401
 from openmdao.main.datatypes.api import Slot, List, ListStr
 from openmdao.lib.casehandlers.api import CaseSet, caseiter_to_caseset
@@ -7,7 +17,155 @@ from openmdao.lib.casehandlers.api import CaseSet, caseiter_to_caseset
 from openmdao.main.component import Component
 from openmdao.main.interfaces import ICaseIterator
 from openmdao.lib.casehandlers.api import ListCaseIterator
+from openmdao.util.decorators import stub_if_missing_deps
+
+
+def _hashable(value):
+    """Return `value`, or a hashable equivalent for arrays and lists.
+    Returns None if that isn't possible.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        if isinstance(value, numpy.ndarray):
+            value = value.tolist()
+        if isinstance(value, (list, tuple)):
+            items = [_hashable(val) for val in value]
+            if None in items:
+                return None
+            return (type(value), tuple(items))
+        return None
+    return value
+
+
+def _case_key(case):
+    """Return a hashable key for the values in `case`, or None."""
+    items = []
+    for name, value in sorted(case.items()):
+        value = _hashable(value)
+        if value is None:
+            return None
+        items.append((name, value))
+    return tuple(items)
+
+
+class NonDominatedArchive(object):
+    """Incrementally updated set of mutually non-dominated points.
+    Smaller is better for every objective. A point is dominated by another
+    if it is no better in every objective and the points are not equal, so
+    duplicate points are all kept.
+
+    Points are held in lexicographic order, so anything that dominates a
+    new point lies before it and anything it dominates lies after it.
+    For one or two objectives the front is a staircase and each update is a
+    bisection plus a contiguous slice. For more objectives the two halves
+    are checked with vectorized comparisons. Either way the cost of
+    :meth:`add` depends on the size of the front, not on how many points
+    have been offered.
+    """
+
+    def __init__(self, n_obj):
+        self.n_obj = n_obj
+        self.clear()
+
+    def clear(self):
+        """Remove all points from the archive."""
+        self._keys = []
+        self._items = []
+        self._array = numpy.zeros((0, self.n_obj))
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def points(self):
+        """Array of archived points, one per row, sorted on the first
+        objective."""
+        if self.n_obj > 2:
+            return self._array
+        return numpy.array(self._keys, dtype=float).reshape(-1, self.n_obj)
+
+    @property
+    def items(self):
+        """List of the items stored with each point, in :attr:`points`
+        order."""
+        return self._items[:]
+
+    def add(self, point, item=None):
+        """Offer `point` (with associated `item`) to the archive.
+        Returns ``(accepted, evicted)`` where `evicted` is a list of the
+        items of archived points that `point` dominates. If `point` is
+        itself dominated it is not archived and nothing is evicted.
+        """
+        key = tuple([float(val) for val in point])
+        if len(key) != self.n_obj:
+            raise ValueError('expected %d objectives, got %d'
+                             % (self.n_obj, len(key)))
+        keys = self._keys
+        lo = bisect_left(keys, key)
+        hi = bisect_right(keys, key)
+
+        if self.n_obj > 2:
+            arr = numpy.array(key)
+            if lo and (self._array[:lo] <= arr).all(axis=1).any():
+                return (False, [])
+            beaten = numpy.flatnonzero((self._array[hi:] >= arr).all(axis=1))
+            evicted = [self._items[hi+i] for i in beaten]
+            if len(beaten):
+                beaten += hi
+                self._array = numpy.delete(self._array, beaten, axis=0)
+                for i in beaten[::-1]:
+                    del keys[i]
+                    del self._items[i]
+            self._array = numpy.insert(self._array, hi, arr, axis=0)
+        else:
+            # The nearest point before is the best candidate to dominate,
+            # and dominated points form a run right after any duplicates.
+            if lo and keys[lo-1][-1] <= key[-1]:
+                return (False, [])
+            end = hi
+            while end < len(keys) and keys[end][-1] >= key[-1]:
+                end += 1
+            evicted = self._items[hi:end]
+            del keys[hi:end]
+            del self._items[hi:end]
 
+        keys.insert(hi, key)
+        self._items.insert(hi, item)
+        return (True, evicted)
+
+    def update(self, points, items=None):
+        """Offer each of `points` (with corresponding `items`) in turn.
+        Returns a list of the items which were rejected or evicted.
+        """
+        if items is None:
+            items = [None] * len(points)
+        dominated = []
+        for point, item in zip(points, items):
+            accepted, evicted = self.add(point, item)
+            if accepted:
+                dominated.extend(evicted)
+            else:
+                dominated.append(item)
+        return dominated
+
+    def dominated_mask(self, samples, strict=False):
+        """Returns a boolean array flagging each row of `samples` which is
+        dominated by an archived point. If `strict`, a sample only counts
+        as dominated if it is worse in every objective.
+        """
+        samples = numpy.asarray(samples, dtype=float)
+        mask = numpy.zeros(len(samples), dtype=bool)
+        for point in self.points:
+            if strict:
+                mask |= (samples > point).all(axis=1)
+            else:
+                mask |= (samples >= point).all(axis=1) & \
+                        (samples != point).any(axis=1)
+        return mask
+
+
+@stub_if_missing_deps(*_check)
 class ParetoFilter(Component):
     """Takes a set of cases and filters out the subset of cases which are
     pareto optimal. Assumes that smaller values for model responses are
@@ -33,21 +191,28 @@ class ParetoFilter(Component):
     dominated_set = Slot(CaseSet, iotype="out",
                            desc="Resulting collection of dominated cases.",copy="shallow")
     
-    def _is_dominated(self, y1, y2):
-        """Tests to see if the point y1 is dominated by the point y2. 
-        True if y1 is dominated by y2, False otherwise.
-        """
-        if y1 == y2:
-            return False
-        for a,b in zip(y1, y2): 
-            if a<b: return False
+    def __init__(self, *args, **kwargs):
+        super(ParetoFilter, self).__init__(*args, **kwargs)
+        self._reset_archive(())
+
+    def _reset_archive(self, criteria):
+        """Forget all previously filtered cases."""
+        self._criteria = criteria
+        self._archive = NonDominatedArchive(len(criteria))
+        self._dominated = []  # [(key, case), ...]
+        self._seen = set()
 
-        return True
-    
     def execute(self):
         """Finds and removes pareto optimal points in the given case set.
         Returns a list of pareto optimal points. Smaller is better for all
         criteria.
+
+        The non-dominated front is kept between executions, so cases which
+        were filtered before are skipped and each new case is only compared
+        with the current front. If any previously filtered case is no
+        longer supplied, the criteria change, or a case has a value which
+        can't be used to recognize it later, filtering starts over.
+        Either way the results are in the order the cases were supplied.
         """
         #convert stuff to caseSets if they are not 
         case_sets = []
@@ -62,30 +227,47 @@ class ParetoFilter(Component):
             case_set = case_sets[0].union(*case_sets[1:])
         else: 
             case_set = case_sets[0]
-        criteria_count = len(self.criteria)
         
         try: 
-            # need to transpose the list of outputs
-            y_list = zip(*[case_set[crit] for crit in self.criteria]) 
+            y_list = case_set.get_array(self.criteria)
         except KeyError: 
             self.raise_exception('no cases provided had all of the outputs '
                  'matching the provided criteria, %s'%self.criteria, ValueError)
-            
-        y_temp = list(y_list)
-        
-        self.dominated_set = CaseSet()
-        self.pareto_set = CaseSet() #TODO: need a way to copy casesets
 
-        for point1, case in zip(y_list, iter(case_set)):
-            dominated = False
-            for point2 in y_temp:
-                if self._is_dominated(point1, point2):
-                    self.dominated_set.record(case)
-                    y_temp.remove(point1)
-                    dominated = True
-                    break
-            if not dominated: 
-                self.pareto_set.record(case)
+        criteria = tuple(self.criteria)
+        if criteria != self._criteria:
+            self._reset_archive(criteria)
+
+        cases = list(case_set)
+        keys = [_case_key(case) for case in cases]
+        if None in keys:
+            self._reset_archive(criteria)
+            keys = range(len(cases))
+        position = dict(zip(keys, range(len(keys))))
+
+        new = [i for i, key in enumerate(keys) if key not in self._seen]
+        if len(keys) - len(new) < len(self._seen):
+            self._reset_archive(criteria)
+            new = range(len(keys))
+
+        for i in new:
+            self._seen.add(keys[i])
+            item = (keys[i], cases[i])
+            accepted, evicted = self._archive.add(y_list[i], item)
+            if accepted:
+                self._dominated.extend(evicted)
+            else:
+                self._dominated.append(item)
+
+        # Report cases in the order they were supplied.
+        order = lambda item: position[item[0]]
+        self.pareto_set = CaseSet() #TODO: need a way to copy casesets
+        for key, case in sorted(self._archive.items, key=order):
+            self.pareto_set.record(case)
+        self._dominated.sort(key=order)
+        self.dominated_set = CaseSet()
+        for key, case in self._dominated:
+            self.dominated_set.record(case)
      
 if __name__ == "__main__": # pragma: no cover  
     
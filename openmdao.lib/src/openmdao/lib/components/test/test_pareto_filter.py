@@ -2,7 +2,10 @@
 
 import unittest
 
-from openmdao.lib.components.pareto_filter import ParetoFilter
+import numpy
+
+from openmdao.lib.components.pareto_filter import ParetoFilter, \
+                                                NonDominatedArchive
 from openmdao.lib.casehandlers.api import ListCaseIterator
 from openmdao.main.case import Case
 
@@ -63,6 +66,90 @@ class ParetoFilterTests(unittest.TestCase):
         self.assertEqual((1, 2, 2, 3, 3, 3),x_dom)
         self.assertEqual((3, 2, 3, 1, 2, 3),y_dom)
         
+    def test_incremental(self):
+        pf = ParetoFilter()
+        x = [2,2,3,3]
+        y = [2,3,1,2]
+        cases = []
+        for x_0,y_0 in zip(x,y):
+            cases.append(Case(outputs=[("x",x_0),("y",y_0)]))
+
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.criteria = ['x','y']
+        pf.execute()
+        x_p,y_p = zip(*[(case['x'],case['y']) for case in pf.pareto_set])
+        self.assertEqual((2,3),x_p)
+        self.assertEqual((2,1),y_p)
+
+        # New case dominates one of the previous front.
+        cases.append(Case(outputs=[("x",1),("y",2)]))
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.execute()
+        x_p,y_p = zip(*[(case['x'],case['y']) for case in pf.pareto_set])
+        x_dom,y_dom = zip(*[(case['x'],case['y']) for case in pf.dominated_set])
+        self.assertEqual((3,1),x_p)
+        self.assertEqual((1,2),y_p)
+        self.assertEqual((2,2,3),x_dom)
+        self.assertEqual((2,3,2),y_dom)
+
+        # Same results as a fresh filter.
+        fresh = ParetoFilter()
+        fresh.case_sets = [ListCaseIterator(cases),]
+        fresh.criteria = ['x','y']
+        fresh.execute()
+        self.assertEqual([case['x'] for case in fresh.dominated_set],
+                         list(x_dom))
+        self.assertEqual([case['x'] for case in fresh.pareto_set],
+                         list(x_p))
+
+        # Dropping cases starts over.
+        pf.case_sets = [ListCaseIterator(cases[:2]),]
+        pf.execute()
+        x_p = [case['x'] for case in pf.pareto_set]
+        x_dom = [case['x'] for case in pf.dominated_set]
+        self.assertEqual([2],x_p)
+        self.assertEqual([2],x_dom)
+
+    def test_array_inputs(self):
+        pf = ParetoFilter()
+        cases = []
+        for x_0,y_0 in [(2,2),(2,3),(3,1)]:
+            cases.append(Case(inputs=[("a",numpy.array([x_0,y_0]))],
+                              outputs=[("x",x_0),("y",y_0)]))
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.criteria = ['x','y']
+        pf.execute()
+        self.assertEqual([case['a'].tolist() for case in pf.pareto_set],
+                         [[2,2],[3,1]])
+
+        cases.append(Case(inputs=[("a",numpy.array([1,1]))],
+                          outputs=[("x",1),("y",1)]))
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.execute()
+        self.assertEqual([case['a'].tolist() for case in pf.pareto_set],
+                         [[1,1]])
+        self.assertEqual([case['a'].tolist() for case in pf.dominated_set],
+                         [[2,2],[2,3],[3,1]])
+
+    def test_archive(self):
+        archive = NonDominatedArchive(3)
+        dominated = archive.update([(1,2,3),(3,2,1),(2,2,2),(2,3,3),(0,3,3)],
+                                   ['a','b','c','d','e'])
+        self.assertEqual(['d'],dominated)
+        self.assertEqual(['e','a','c','b'],archive.items)
+
+        accepted, evicted = archive.add((1,1,1),'f')
+        self.assertTrue(accepted)
+        self.assertEqual(['a','c','b'],evicted)
+        self.assertEqual(['e','f'],archive.items)
+        self.assertEqual([[0,3,3],[1,1,1]],archive.points.tolist())
+
+        mask = archive.dominated_mask([(2,2,2),(1,1,1),(1,2,1),(0,4,4)])
+        self.assertEqual([True,False,True,True],mask.tolist())
+        mask = archive.dominated_mask([(2,2,2),(1,1,1),(1,2,1),(0,4,4)],
+                                      strict=True)
+        self.assertEqual([True,False,False,False],mask.tolist())
+
     def test_bad_case_set(self): 
         pf = ParetoFilter()
         x = [1,1,2,2,2,3,3,3,]
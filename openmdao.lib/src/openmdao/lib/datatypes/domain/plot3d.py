@@ -32,11 +32,20 @@ unformatted: bool
 logger: Logger or None
     Used to record progress.
 
+lazy: bool
+    If True, zone arrays are returned as :class:`numpy.memmap` views of the
+    file rather than being read into memory. Data is only read (and
+    byte-swapped if necessary) when accessed, so large files may be processed
+    a block or plane at a time. The file must not be overwritten while the
+    arrays are in use. Only meaningful if `binary`.
+
 Default argument values are set for a typical 3D multiblock single-precision
 Fortran unformatted file.  When writing, zones are assumed in Cartesian
 coordinates with data located at the vertices.
 """
 
+import logging
+
 import numpy
 
 from openmdao.util.log import NullLogger
@@ -49,7 +58,8 @@ from openmdao.lib.datatypes.domain.vector import Vector
 
 def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                   planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  lazy=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `q_file`.  Q variables are assigned to 'density', 'momentum', and
@@ -66,7 +76,7 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, lazy)
 
     mode = 'rb' if binary else 'r'
     with open(q_file, mode) as inp:
@@ -116,14 +126,15 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
             name = domain.zone_name(zone)
             logger.debug('reading data for %s', name)
             _read_plot3d_qscalars(zone, stream, logger)
-            _read_plot3d_qvars(zone, stream, planes, logger)
+            _read_plot3d_qvars(zone, stream, planes, logger, lazy)
 
     return domain
 
 
 def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                   blanking=False, planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  lazy=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `f_file`.  Variables are assigned to names of the form `f_N`.
@@ -138,7 +149,7 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, lazy)
 
     mode = 'rb' if binary else 'r'
     with open(f_file, mode) as inp:
@@ -189,13 +200,14 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
             name = domain.zone_name(zone)
             logger.debug('reading data for %s', name)
             _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes,
-                               logger)
+                               logger, lazy)
     return domain
 
 
 def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
                      planes=False, binary=True, big_endian=False,
-                     single_precision=True, unformatted=True, logger=None):
+                     single_precision=True, unformatted=True, logger=None,
+                     lazy=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file`.
 
@@ -203,6 +215,8 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
         Grid filename.
     """
     logger = logger or NullLogger()
+    if lazy and not binary:
+        raise ValueError('lazy reading requires binary data')
     domain = DomainObj()
 
     mode = 'rb' if binary else 'r'
@@ -220,7 +234,7 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
             name = domain.zone_name(zone)
             logger.debug('reading coordinates for %s', name)
             _read_plot3d_coords(zone, stream, shape[i], blanking, planes,
-                                logger)
+                                logger, lazy)
     return domain
 
 
@@ -311,7 +325,7 @@ def _read_plot3d_dims(stream, dim, f_file=False):
         return (imax, jmax, kmax)
 
 
-def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
+def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger, lazy):
     """ Reads coordinates (& blanking) from given Plot3D stream. """
     if blanking:
         raise NotImplementedError('blanking not supported yet')
@@ -332,18 +346,15 @@ def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
             logger.warning('unexpected coords recordlength'
                            ' %d vs. %d', reclen, expected)
 
-    zone.grid_coordinates.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    x min %g, max %g',
-                 zone.grid_coordinates.x.min(), zone.grid_coordinates.x.max())
+    zone.grid_coordinates.x = _read_array(stream, shape, lazy)
+    _log_range(logger, 'x', zone.grid_coordinates.x, lazy)
 
-    zone.grid_coordinates.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    y min %g, max %g',
-                 zone.grid_coordinates.y.min(), zone.grid_coordinates.y.max())
+    zone.grid_coordinates.y = _read_array(stream, shape, lazy)
+    _log_range(logger, 'y', zone.grid_coordinates.y, lazy)
 
     if dim > 2:
-        zone.grid_coordinates.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    z min %g, max %g',
-                     zone.grid_coordinates.z.min(), zone.grid_coordinates.z.max())
+        zone.grid_coordinates.z = _read_array(stream, shape, lazy)
+        _log_range(logger, 'z', zone.grid_coordinates.z, lazy)
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -363,7 +374,7 @@ def _read_plot3d_qscalars(zone, stream, logger):
     zone.flow_solution.time = time
 
 
-def _read_plot3d_qvars(zone, stream, planes, logger):
+def _read_plot3d_qvars(zone, stream, planes, logger, lazy):
     """ Reads 'density', 'momentum' and 'energy_stagnation_density'. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -384,27 +395,27 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
             logger.warning('unexpected Q variables recordlength'
                            ' %d vs. %d', reclen, expected)
     name = 'density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_array(stream, shape, lazy)
+    _log_range(logger, name, arr, lazy)
     zone.flow_solution.add_array(name, arr)
 
     vec = Vector()
 
-    vec.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.x min %g, max %g', vec.x.min(), vec.x.max())
+    vec.x = _read_array(stream, shape, lazy)
+    _log_range(logger, 'momentum.x', vec.x, lazy)
 
-    vec.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.y min %g, max %g', vec.y.min(), vec.y.max())
+    vec.y = _read_array(stream, shape, lazy)
+    _log_range(logger, 'momentum.y', vec.y, lazy)
 
     if dim > 2:
-        vec.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    momentum.z min %g, max %g', vec.z.min(), vec.z.max())
+        vec.z = _read_array(stream, shape, lazy)
+        _log_range(logger, 'momentum.z', vec.z, lazy)
 
     zone.flow_solution.add_vector('momentum', vec)
 
     name = 'energy_stagnation_density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_array(stream, shape, lazy)
+    _log_range(logger, name, arr, lazy)
     zone.flow_solution.add_array(name, arr)
 
     if stream.unformatted:
@@ -414,7 +425,8 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
-def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
+def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger,
+                       lazy):
     """ Reads 'function' variables. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -439,9 +451,9 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
             name = varnames[i]
         else:
             name = 'f_%d' % (i+1)
-        arr = stream.read_floats(shape, order='Fortran')
+        arr = _read_array(stream, shape, lazy)
         zone.flow_solution.add_array(name, arr)
-        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+        _log_range(logger, name, arr, lazy)
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -450,6 +462,22 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
+def _read_array(stream, shape, lazy):
+    """ Returns next array of `shape` from `stream`, mapped if `lazy`. """
+    if lazy:
+        return stream.map_floats(shape, order='Fortran')
+    return stream.read_floats(shape, order='Fortran')
+
+
+def _log_range(logger, name, arr, lazy=False):
+    """
+    Logs minimum and maximum of `arr` if debugging.
+    Skipped if `lazy`, since that would read all the data.
+    """
+    if not lazy and logger.isEnabledFor(logging.DEBUG):
+        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+
+
 def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                    big_endian=False, single_precision=True, unformatted=True,
                    logger=None):
@@ -716,17 +744,14 @@ def _write_plot3d_coords(zone, stream, planes, logger):
         reclen = stream.reclen_floats(total)
         stream.write_recordmark(reclen)
 
-    logger.debug('    x min %g, max %g',
-                 zone.grid_coordinates.x.min(), zone.grid_coordinates.x.max())
+    _log_range(logger, 'x', zone.grid_coordinates.x)
     _write_array(zone.grid_coordinates.x, zone.grid_coordinates.ghosts, stream)
 
-    logger.debug('    y min %g, max %g',
-                 zone.grid_coordinates.y.min(), zone.grid_coordinates.y.max())
+    _log_range(logger, 'y', zone.grid_coordinates.y)
     _write_array(zone.grid_coordinates.y, zone.grid_coordinates.ghosts, stream)
 
     if dim > 2:
-        logger.debug('    z min %g, max %g',
-                     zone.grid_coordinates.z.min(), zone.grid_coordinates.z.max())
+        _log_range(logger, 'z', zone.grid_coordinates.z)
         _write_array(zone.grid_coordinates.z, zone.grid_coordinates.ghosts,
                      stream)
 
@@ -772,20 +797,20 @@ def _write_plot3d_vars(zone, stream, varnames, planes, logger):
         obj = getattr(flow, name)
         if isinstance(obj, Vector):
             arr = obj.x
-            logger.debug('    %s.x min %g, max %g', name, arr.min(), arr.max())
+            _log_range(logger, '%s.x' % name, arr)
             _write_array(arr, flow.ghosts, stream)
 
             arr = obj.y
-            logger.debug('    %s.y min %g, max %g', name, arr.min(), arr.max())
+            _log_range(logger, '%s.y' % name, arr)
             _write_array(arr, flow.ghosts, stream)
 
             if dim > 2:
                 arr = obj.z
-                logger.debug('    %s.z min %g, max %g', name, arr.min(), arr.max())
+                _log_range(logger, '%s.z' % name, arr)
                 _write_array(arr, flow.ghosts, stream)
         else:
             arr = obj
-            logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+            _log_range(logger, name, arr)
             _write_array(arr, flow.ghosts, stream)
 
     if stream.unformatted:
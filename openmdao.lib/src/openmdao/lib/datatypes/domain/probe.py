@@ -3,7 +3,8 @@ Support for calculating one or more scalar averages across one or more
 regions in a domain.
 """
 
-from math import cos, sin, sqrt
+import numpy
+from numpy import cos, sin, sqrt
 
 from openmdao.lib.datatypes.domain.flow import CELL_CENTER
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
@@ -48,6 +49,10 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
         face get equal weight. This will lead to inaccuracies for highly
         irregular grids.
 
+    Geometry and weights are computed as array operations over the region.
+    Metrics providing :meth:`calculate_array` are evaluated the same way,
+    others are evaluated a cell at a time.
+
     """
     # Check validity of region specifications.
     _regions = _check_regions(domain, regions)
@@ -250,16 +255,16 @@ def _calc_weights(scheme, domain, regions):
             else:
                 zone_weights = _curve_weights_1d(scheme, domain, region)
         else:
-            zone_weights = [1.]
+            zone_weights = numpy.ones(1)
 
         zone_name = region[0]
         zone = getattr(domain, zone_name)
-        zone_weights *= zone.symmetry_instances  # Adjust for symmetry.
         if zone_name in weights:
             raise RuntimeError('Zone %r used more than once' % zone_name)
         else:
             weights[zone_name] = zone_weights
-        weight_total += sum(zone_weights)
+        # Adjust for symmetry (metric values are adjusted by the caller).
+        weight_total += zone_weights.sum() * zone.symmetry_instances
 
     return (weights, weight_total)
 
@@ -278,28 +283,6 @@ def _surface_weights_3d(scheme, domain, region):
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical:
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    if scheme == 'mass':
-        try:
-            if cylindrical:
-                mom_c1 = flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
-            else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = flow.momentum.z.item
-        except AttributeError:
-            raise AttributeError("For mass averaging zone %s is missing"
-                                 " 'momentum'." % zone_name)
     if imin == imax:
         imax += 1
         face_normal = _iface_normal
@@ -312,21 +295,40 @@ def _surface_weights_3d(scheme, domain, region):
         kmax += 1
         face_normal = _kface_normal
         face_value = _kface_cell_value if cell_center else _kface_node_value
+    shape = (imax-imin, jmax-jmin, kmax-kmin)
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                sc1, sc2, sc3 = face_normal(c1, c2, c3, i, j, k, cylindrical)
-                if scheme == 'mass':
-                    loc = (i, j, k)
-                    rvu = face_value(mom_c1, loc)
-                    rvv = face_value(mom_c2, loc)
-                    rvw = face_value(mom_c3, loc)
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+    if cylindrical:
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
+    else:
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
+
+    if scheme == 'mass':
+        try:
+            if cylindrical:
+                mom_c1 = _window(flow.momentum.z, shape)
+                mom_c2 = _window(flow.momentum.r, shape)
+                mom_c3 = _window(flow.momentum.t, shape)
+            else:
+                mom_c1 = _window(flow.momentum.x, shape)
+                mom_c2 = _window(flow.momentum.y, shape)
+                mom_c3 = _window(flow.momentum.z, shape)
+        except AttributeError:
+            raise AttributeError("For mass averaging zone %s is missing"
+                                 " 'momentum'." % zone_name)
+
+    sc1, sc2, sc3 = face_normal(c1, c2, c3, imin, jmin, kmin, cylindrical)
+    if scheme == 'mass':
+        loc = (imin, jmin, kmin)
+        rvu = face_value(mom_c1, loc)
+        rvv = face_value(mom_c2, loc)
+        rvw = face_value(mom_c3, loc)
+        return rvu*sc1 + rvv*sc2 + rvw*sc3
+    else:
+        return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
 
 def _surface_weights_2d(scheme, domain, region):
@@ -337,61 +339,59 @@ def _surface_weights_2d(scheme, domain, region):
     flow = zone.flow_solution
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
+    shape = (imax-imin, jmax-jmin)
 
     if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
 
     if scheme == 'mass':
         try:
             if cylindrical:
-                mom_c1 = None if flow.momentum.z is None else flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
+                mom_c1 = _window(flow.momentum.z, shape)
+                mom_c2 = _window(flow.momentum.r, shape)
+                mom_c3 = _window(flow.momentum.t, shape)
             else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = None if flow.momentum.z is None else flow.momentum.z.item
+                mom_c1 = _window(flow.momentum.x, shape)
+                mom_c2 = _window(flow.momentum.y, shape)
+                mom_c3 = _window(flow.momentum.z, shape)
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
                                  " 'momentum'." % zone_name)
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                sc1, sc2, sc3 = _cell_normal(c1, c2, c3, i, j, cylindrical)
-                if scheme == 'mass':
-                    ip1 = i + 1
-                    jp1 = j + 1
-                    if cell_center:
-                        # Cell value is value.
+    i, j = imin, jmin
+    sc1, sc2, sc3 = _cell_normal(c1, c2, c3, i, j, cylindrical)
+    if scheme == 'mass':
+        ip1 = i + 1
+        jp1 = j + 1
+        if cell_center:
+            # Cell value is value.
 # FIXME: built-in ghosts
-                        rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
-                        rvv = mom_c2(ip1, jp1)
-                        rvw = 0. if mom_c1 is None else mom_c3(ip1, jp1)
-                    else:
-                        # Average across vertices.
-                        if mom_c1 is None:
-                            rvu = 0.
-                        else:
-                            rvu = 0.25 * (mom_c1(i, j) + mom_c1(ip1, j) + \
-                                          mom_c1(i, jp1) + mom_c1(ip1, jp1))
-                        rvv = 0.25 * (mom_c2(i, j) + mom_c2(ip1, j) + \
-                                      mom_c2(i, jp1) + mom_c2(ip1, jp1))
-                        if mom_c3 is None:
-                            rvw = 0.
-                        else:
-                            rvw = 0.25 * (mom_c3(i, j) + mom_c3(ip1, j) + \
-                                          mom_c3(i, jp1) + mom_c3(ip1, jp1))
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+            rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
+            rvv = mom_c2(ip1, jp1)
+            rvw = 0. if mom_c3 is None else mom_c3(ip1, jp1)
+        else:
+            # Average across vertices.
+            if mom_c1 is None:
+                rvu = 0.
+            else:
+                rvu = 0.25 * (mom_c1(i, j) + mom_c1(ip1, j) + \
+                              mom_c1(i, jp1) + mom_c1(ip1, jp1))
+            rvv = 0.25 * (mom_c2(i, j) + mom_c2(ip1, j) + \
+                          mom_c2(i, jp1) + mom_c2(ip1, jp1))
+            if mom_c3 is None:
+                rvw = 0.
+            else:
+                rvw = 0.25 * (mom_c3(i, j) + mom_c3(ip1, j) + \
+                              mom_c3(i, jp1) + mom_c3(ip1, jp1))
+        return rvu*sc1 + rvv*sc2 + rvw*sc3
+    else:
+        return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
 
 def _curve_weights_3d(scheme, domain, region):
@@ -403,45 +403,28 @@ def _curve_weights_3d(scheme, domain, region):
 
     if cylindrical:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
-    along_i, along_j = False, False
     if imin != imax:
-        along_i = True
         jmax += 1
         kmax += 1
+        get_length = _iedge_length
     elif jmin != jmax:
-        along_j = True
         imax += 1
         kmax += 1
+        get_length = _jedge_length
     else:
         imax += 1
         jmax += 1
+        get_length = _kedge_length
+    shape = (imax-imin, jmax-jmin, kmax-kmin)
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                if along_i:
-                    dx = x(i+1, j, k) - x(i, j, k)
-                    dy = y(i+1, j, k) - y(i, j, k)
-                    dz = z(i+1, j, k) - z(i, j, k)
-                elif along_j:
-                    dx = x(i, j+1, k) - x(i, j, k)
-                    dy = y(i, j+1, k) - y(i, j, k)
-                    dz = z(i, j+1, k) - z(i, j, k)
-                else:
-                    dx = x(i, j, k+1) - x(i, j, k)
-                    dy = y(i, j, k+1) - y(i, j, k)
-                    dz = z(i, j, k+1) - z(i, j, k)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    x = _window(grid.x, shape)
+    y = _window(grid.y, shape)
+    z = _window(grid.z, shape)
+    return get_length(x, y, z, (imin, jmin, kmin), False)
 
 
 def _curve_weights_2d(scheme, domain, region):
@@ -453,34 +436,22 @@ def _curve_weights_2d(scheme, domain, region):
 
     if cylindrical:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = None if grid.z is None else grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
     if imin != imax:
-        along_i = True
         jmax += 1
+        get_length = _iedge_length
     else:
-        along_i = False
         imax += 1
+        get_length = _jedge_length
+    shape = (imax-imin, jmax-jmin)
 
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                if along_i:
-                    dx = x(i+1, j) - x(i, j)
-                    dy = y(i+1, j) - y(i, j)
-                    dz = 0. if z is None else z(i+1, j) - z(i, j)
-                else:
-                    dx = x(i, j+1) - x(i, j)
-                    dy = y(i, j+1) - y(i, j)
-                    dz = 0. if z is None else z(i, j+1) - z(i, j)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    x = _window(grid.x, shape)
+    y = _window(grid.y, shape)
+    z = _window(grid.z, shape)
+    return get_length(x, y, z, (imin, jmin), False)
 
 
 def _curve_weights_1d(scheme, domain, region):
@@ -492,21 +463,15 @@ def _curve_weights_1d(scheme, domain, region):
 
     if cylindrical:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = None if grid.y is None else grid.y.item
-        z = None if grid.z is None else grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
-    weights = []
-    for i in range(imin, imax):
-        dx = x(i+1) - x(i)
-        dy = 0. if y is None else y(i+1) - y(i)
-        dz = 0. if z is None else z(i+1) - z(i)
-        weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    shape = (imax-imin,)
+    x = _window(grid.x, shape)
+    y = _window(grid.y, shape)
+    z = _window(grid.z, shape)
+    return _iedge_length(x, y, z, (imin,), False)
 
 
 def _calc_metric(name, domain, region, weights, reference_state):
@@ -614,73 +579,65 @@ def _surface_3d(metric, integrate, zone, region, weights):
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    if imin == imax: 
+    if imin == imax:
         face = 'i'
         imax += 1
         get_normal = _iface_normal
     elif jmin == jmax:
         face = 'j'
-        jmax += 1 
+        jmax += 1
         get_normal = _jface_normal
     else:
         face = 'k'
         kmax += 1
         get_normal = _kface_normal
+    shape = (imax-imin, jmax-jmin, kmax-kmin)
+
+    if cylindrical:
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
+    else:
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
+
+    calculate = _block_metric(metric, shape)
+    i, j, k = imin, jmin, kmin
 
     normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
+    if integrate:
+        normal = get_normal(c1, c2, c3, i, j, k, cylindrical)
 
-                if integrate:
-                    normal = get_normal(c1, c2, c3, i, j, k, cylindrical)
-    
-                if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                    # Average across cells sharing surface.
-                    val = metric.calculate((i+1, j+1, k+1), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j+1, k), normal)
-                    val *= 0.5
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k), normal)
-                    val *= 0.25
+        # Average across cells sharing surface.
+        val = calculate((i+1, j+1, k+1), normal)
+        if face == 'i':
+            val += calculate((i, j+1, k+1), normal)
+        elif face == 'j':
+            val += calculate((i+1, j, k+1), normal)
+        else:
+            val += calculate((i+1, j+1, k), normal)
+        val *= 0.5
+    else:
+        # Average across vertices.
+        val = calculate((i, j, k), normal)
+        if face == 'i':
+            val += calculate((i, j+1, k), normal)
+            val += calculate((i, j+1, k+1), normal)
+            val += calculate((i, j, k+1), normal)
+        elif face == 'j':
+            val += calculate((i+1, j, k), normal)
+            val += calculate((i+1, j, k+1), normal)
+            val += calculate((i, j, k+1), normal)
+        else:
+            val += calculate((i+1, j, k), normal)
+            val += calculate((i+1, j+1, k), normal)
+            val += calculate((i, j+1, k), normal)
+        val *= 0.25
 
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
+    return _total(val, integrate, weights)
 
 
 def _surface_2d(metric, integrate, zone, region, weights):
@@ -690,44 +647,37 @@ def _surface_2d(metric, integrate, zone, region, weights):
     flow = zone.flow_solution
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
+    shape = (imax-imin, jmax-jmin)
 
-    if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+    if cylindrical:
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
+
+    calculate = _block_metric(metric, shape)
+    i, j = imin, jmin
 
     normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
+    if integrate:
+        normal = _cell_normal(c1, c2, c3, i, j, cylindrical)
 
-            if integrate:
-                normal = _cell_normal(c1, c2, c3, i, j, cylindrical)
-    
-            if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                # Cell value is value.
-                val = metric.calculate((i+1, j+1), normal)
-            else:
-                # Average across vertices.
-                val  = metric.calculate((i, j), normal)
-                val += metric.calculate((i, j+1), normal)
-                val += metric.calculate((i+1, j+1), normal)
-                val += metric.calculate((i+1, j), normal)
-                val *= 0.25
-
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
+        # Cell value is value.
+        val = calculate((i+1, j+1), normal)
+    else:
+        # Average across vertices.
+        val  = calculate((i, j), normal)
+        val += calculate((i, j+1), normal)
+        val += calculate((i+1, j+1), normal)
+        val += calculate((i+1, j), normal)
+        val *= 0.25
+
+    return _total(val, integrate, weights)
 
 
 def _curve_3d(metric, integrate, zone, region, weights):
@@ -738,15 +688,6 @@ def _curve_3d(metric, integrate, zone, region, weights):
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
     if imin != imax:
         edge = 'i'
         jmax += 1
@@ -762,52 +703,53 @@ def _curve_3d(metric, integrate, zone, region, weights):
         imax += 1
         jmax += 1
         get_length = _kedge_length
+    shape = (imax-imin, jmax-jmin, kmax-kmin)
 
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
+    if cylindrical:
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
+    else:
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
 
-                if integrate:
-                    length = get_length(c1, c2, c3, (i, j, k), cylindrical)
+    calculate = _block_metric(metric, shape)
+    i, j, k = imin, jmin, kmin
 
-                if cell_center:
+    length = None
+    if integrate:
+        length = get_length(c1, c2, c3, (i, j, k), cylindrical)
+
+    if cell_center:
 # FIXME: built-in ghosts
-                    # Average across cells sharing edge.
-                    val = metric.calculate((i+1, j+1, k+1), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i, j+1, k), length)
-                    else:
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i, j, k+1), length)
-                    val *= 0.25
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                         val +=metric.calculate((i, j+1, k), length)
-                    else:
-                         val +=metric.calculate((i, j, k+1), length)
-                    val *= 0.5
+        # Average across cells sharing edge.
+        val = calculate((i+1, j+1, k+1), length)
+        if edge == 'i':
+            val += calculate((i+1, j, k+1), length)
+            val += calculate((i+1, j+1, k), length)
+            val += calculate((i+1, j, k), length)
+        elif edge == 'j':
+            val += calculate((i, j+1, k+1), length)
+            val += calculate((i+1, j+1, k), length)
+            val += calculate((i, j+1, k), length)
+        else:
+            val += calculate((i, j+1, k+1), length)
+            val += calculate((i+1, j, k+1), length)
+            val += calculate((i, j, k+1), length)
+        val *= 0.25
+    else:
+        # Average across vertices.
+        val = calculate((i, j, k), length)
+        if edge == 'i':
+            val += calculate((i+1, j, k), length)
+        elif edge == 'j':
+            val += calculate((i, j+1, k), length)
+        else:
+            val += calculate((i, j, k+1), length)
+        val *= 0.5
 
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
+    return _total(val, integrate, weights)
 
 
 def _curve_2d(metric, integrate, zone, region, weights):
@@ -818,15 +760,6 @@ def _curve_2d(metric, integrate, zone, region, weights):
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
-
     if imin != imax:
         edge = 'i'
         jmax += 1
@@ -835,41 +768,43 @@ def _curve_2d(metric, integrate, zone, region, weights):
         edge = 'j'
         imax += 1
         get_length = _jedge_length
+    shape = (imax-imin, jmax-jmin)
 
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
+    if cylindrical:
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
+    else:
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
+
+    calculate = _block_metric(metric, shape)
+    i, j = imin, jmin
 
-            if integrate:
-                length = get_length(c1, c2, c3, (i, j), cylindrical)
+    length = None
+    if integrate:
+        length = get_length(c1, c2, c3, (i, j), cylindrical)
 
-            if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-                # Average across cells sharing edge.
-                val = metric.calculate((i+1, j+1), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
-            else:
-                # Average across vertices.
-                val = metric.calculate((i, j), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
+        # Average across cells sharing edge.
+        val = calculate((i+1, j+1), length)
+        if edge == 'i':
+            val += calculate((i+1, j), length)
+        else:
+            val += calculate((i, j+1), length)
+        val *= 0.5
+    else:
+        # Average across vertices.
+        val = calculate((i, j), length)
+        if edge == 'i':
+            val += calculate((i+1, j), length)
+        else:
+            val += calculate((i, j+1), length)
+        val *= 0.5
 
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
+    return _total(val, integrate, weights)
 
 
 def _curve_1d(metric, integrate, zone, region, weights):
@@ -879,43 +814,90 @@ def _curve_1d(metric, integrate, zone, region, weights):
     flow = zone.flow_solution
     cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
+    shape = (imax-imin,)
 
     if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+        c1 = _window(grid.z, shape)
+        c2 = _window(grid.r, shape)
+        c3 = _window(grid.t, shape)
     else:
-        c1 = grid.x.item
-        c2 = None if grid.y is None else grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        c1 = _window(grid.x, shape)
+        c2 = _window(grid.y, shape)
+        c3 = _window(grid.z, shape)
 
-    get_length = _iedge_length
+    calculate = _block_metric(metric, shape)
+    i = imin
 
     length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
+    if integrate:
+        length = _iedge_length(c1, c2, c3, (i,), cylindrical)
 
-        if integrate:
-            length = get_length(c1, c2, c3, (i,), cylindrical)
-
-        if cell_center:
+    if cell_center:
 # FIXME: built-in ghosts
-            # Cell value is value.
-            val = metric.calculate((i+1,), length)
-        else:
-            # Average across vertices.
-            val  = metric.calculate((i,), length)
-            val += metric.calculate((i+1,), length)
-            val *= 0.5
+        # Cell value is value.
+        val = calculate((i+1,), length)
+    else:
+        # Average across vertices.
+        val  = calculate((i,), length)
+        val += calculate((i+1,), length)
+        val *= 0.5
 
-        if integrate:
-            total += val
-        else:
-            weight = weights[weight_index]
-            weight_index += 1
-            total += val * weight
-    return total
+    return _total(val, integrate, weights)
+
+
+def _total(val, integrate, weights):
+    """ Return sum of `val`, weighted by `weights` if not integrating. """
+    if integrate:
+        return float(val.sum())
+    else:
+        return float((val * weights).sum())
+
+
+def _window(arr, shape):
+    """
+    Returns a function of starting indices which returns the double-precision
+    block of `arr` having `shape`, or None if `arr` is None. This lets the
+    per-cell geometry functions below operate on whole blocks at once.
+    """
+    if arr is None:
+        return None
+
+    def block(*loc):
+        return arr[_block_index(loc, shape)].astype(numpy.float64)
+    return block
+
+
+def _block_index(loc, shape):
+    """ Return tuple of slices selecting the `shape` block starting at `loc`. """
+    return tuple([slice(start, start+size) for start, size in zip(loc, shape)])
+
+
+def _block_metric(metric, shape):
+    """
+    Returns a function of ``(loc, geom)`` which evaluates `metric` on the
+    `shape` block starting at `loc`. Metrics without :meth:`calculate_array`
+    are evaluated one cell at a time.
+    """
+    if hasattr(metric, 'calculate_array'):
+        def calculate(loc, geom):
+            index = _block_index(loc, shape)
+            return numpy.array(metric.calculate_array(index, geom),
+                               dtype=numpy.float64)
+    else:
+        def calculate(loc, geom):
+            val = numpy.empty(shape)
+            for index in numpy.ndindex(*shape):
+                if geom is None:
+                    cell_geom = None
+                elif isinstance(geom, tuple):
+                    cell_geom = tuple([item.item(*index) for item in geom])
+                else:
+                    cell_geom = geom.item(*index)
+                cell = tuple([start+offset
+                              for start, offset in zip(loc, index)])
+                val[index] = metric.calculate(cell, cell_geom)
+            return val
+    return calculate
 
 
 def _point(metric, zone, region):
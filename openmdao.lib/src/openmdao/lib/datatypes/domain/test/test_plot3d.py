@@ -6,9 +6,12 @@ import logging
 import os.path
 import unittest
 
+import numpy
+
 from openmdao.lib.datatypes.domain import read_plot3d_q, write_plot3d_q, \
                                           read_plot3d_f, write_plot3d_f, \
-                                          read_plot3d_shape, write_plot3d_grid
+                                          read_plot3d_shape, write_plot3d_grid, \
+                                          read_plot3d_grid, mesh_probe
 
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_2d, \
                                                      create_wedge_3d
@@ -196,6 +199,60 @@ class TestCase(unittest.TestCase):
         self.assertTrue((test_flow.f_3 == wedge_flow.momentum.y).all())
         self.assertTrue((test_flow.f_4 == wedge_flow.energy_stagnation_density).all())
 
+    def test_lazy(self):
+        logging.debug('')
+        logging.debug('test_lazy')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge2 = create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.)
+        wedge.add_domain(wedge2)
+        regions = (('zone_2', 2, 2, 0, -1, 0, -1),)
+        variables = (('area', None), ('density', None))
+
+        # Big-endian binary, multiblock.
+        write_plot3d_q(wedge, 'be-binary.xyz', 'be-binary.q', logger=logger,
+                       big_endian=True, unformatted=False)
+        domain = read_plot3d_q('be-binary.xyz', 'be-binary.q', logger=logger,
+                               big_endian=True, unformatted=False)
+        lazy = read_plot3d_q('be-binary.xyz', 'be-binary.q', logger=logger,
+                             big_endian=True, unformatted=False, lazy=True)
+        self.assertTrue(isinstance(lazy.zone_2.grid_coordinates.x,
+                                   numpy.memmap))
+        self.assertTrue(isinstance(lazy.zone_2.flow_solution.density,
+                                   numpy.memmap))
+        self.assertTrue(lazy.is_equivalent(domain, logger=logger))
+        self.assertEqual(mesh_probe(lazy, regions, variables),
+                         mesh_probe(domain, regions, variables))
+
+        # Extraction copies just the requested plane.
+        plane = lazy.extract([(2, 2, 0, -1, 0, -1)])
+        expected = domain.extract([(2, 2, 0, -1, 0, -1)])
+        self.assertTrue(plane.is_equivalent(expected, logger=logger))
+
+        # Rewritten little-endian unformatted.
+        write_plot3d_q(lazy, 'unformatted.xyz', 'unformatted.q',
+                       logger=logger)
+        lazy = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                             logger=logger, lazy=True)
+        self.assertTrue(lazy.is_equivalent(domain, logger=logger))
+
+        # Function file (don't overwrite files which are still mapped).
+        del lazy
+        write_plot3d_f(domain, 'unformatted.xyz', 'unformatted.f',
+                       logger=logger)
+        lazy = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                             logger=logger, lazy=True)
+        self.assertTrue((lazy.zone_2.flow_solution.f_1 ==
+                         domain.zone_2.flow_solution.density).all())
+
+        try:
+            read_plot3d_grid('unformatted.xyz', binary=False, lazy=True)
+        except ValueError as exc:
+            self.assertEqual(str(exc), 'lazy reading requires binary data')
+        else:
+            self.fail('Expected ValueError')
+
 
 if __name__ == '__main__':
     import nose
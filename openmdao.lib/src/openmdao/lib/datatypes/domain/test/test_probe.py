@@ -10,6 +10,7 @@ import unittest
 from math import pi
 
 from openmdao.lib.datatypes.domain import mesh_probe
+from openmdao.lib.datatypes.domain.metrics import register_metric
 from openmdao.lib.datatypes.domain.test import restart, overflow
 from openmdao.lib.datatypes.domain.test.cube import create_cube
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d
@@ -237,6 +238,34 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, metrics[5], -149.525, 0.00001)
         assert_rel_error(self, metrics[6], -262.976, 0.00001)
 
+    def test_scalar_metric(self):
+        logging.debug('')
+        logging.debug('test_scalar_metric')
+
+        # Metric without calculate_array() is evaluated a cell at a time.
+        register_metric('scalar_density', _ScalarDensity, False)
+
+        domain = restart.read('lpc-test', logging.getLogger())
+        regions = [('zone_1', 2, 2, 0, -1, 0, -1),
+                   ('zone_2', 2, 2, 0, -1, 0, -1)]
+        variables = [('density', None), ('scalar_density', None)]
+        for scheme in ('area', 'mass'):
+            vector, scalar = mesh_probe(domain, regions, variables, scheme)
+            logging.debug('%s density %r, scalar_density %r',
+                          scheme, vector, scalar)
+            assert_rel_error(self, scalar, vector, 0.0000000001)
+
+        cube = create_cube((41, 17, 9), 5., 4., 3.)
+        surface = cube.extract([(0, -1, 0, -1, 2, 2)])
+        surface.demote()
+        for regions in ((('xyzzy', 0, -1, 0, -1, 2, 2),),
+                        (('xyzzy', 5, 5, 0, -1, 5, 5),)):
+            vector, scalar = mesh_probe(cube, regions, variables)
+            assert_rel_error(self, scalar, vector, 0.0000000001)
+        for regions in ((('xyzzy', 0, -1, 0, -1),), (('xyzzy', 0, -1, 5, 5),)):
+            vector, scalar = mesh_probe(surface, regions, variables)
+            assert_rel_error(self, scalar, vector, 0.0000000001)
+
     def test_errors(self):
         logging.debug('')
         logging.debug('test_errors')
@@ -426,6 +455,19 @@ class TestCase(unittest.TestCase):
         self.assertEqual(pt_area_1d, pt_area_3d)
 
 
+class _ScalarDensity(object):
+    """ Density metric only supporting per-cell calculation. """
+
+    def __init__(self, zone, zone_name, reference_state):
+        self.density = zone.flow_solution.density.item
+
+    def calculate(self, loc, geom):
+        return self.density(*loc)
+
+    def dimensionalize(self, value):
+        raise NotImplementedError('Dimensional scalar_density')
+
+
 if __name__ == '__main__':
     import nose
     import sys
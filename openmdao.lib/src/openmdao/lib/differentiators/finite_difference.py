@@ -10,7 +10,9 @@ from itertools import product
 from openmdao.main.numpy_fallback import array
 
 from enthought.traits.api import HasTraits
-from openmdao.lib.datatypes.api import Enum, Float
+from openmdao.lib.datatypes.api import Bool, Enum, Float
+from openmdao.main.case import Case
+from openmdao.main.hasparameters import ParameterGroup
 from openmdao.main.interfaces import implements, IDifferentiator
 from openmdao.main.container import find_name
 
@@ -50,6 +52,11 @@ class FiniteDifference(HasTraits):
     default_stepsize = Float(1.0e-6, iotype='in', desc='Default finite ' + \
                              'difference step size.')
     
+    sequential = Bool(True, iotype='in', desc='If True, evaluate the ' + \
+                      'perturbed points sequentially. Otherwise evaluate ' + \
+                      'them concurrently on servers obtained from the ' + \
+                      'ResourceAllocationManager.')
+    
     def __init__(self):
         
         # This gets set in the callback
@@ -190,14 +197,14 @@ class FiniteDifference(HasTraits):
             self.gradient_case[param] = pcase
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        todo = []
         for key, case in self.gradient_case.iteritems():
             for ipcase, pcase in enumerate(case):
                 if deltas[ipcase]:
-                    pcase['data'] = self._run_point(pcase['param'])
+                    todo.append(pcase)
                 else:
                     pcase['data'] = base_data
+        self._run_points(todo)
                 
         
         # Calculate gradients
@@ -301,8 +308,7 @@ class FiniteDifference(HasTraits):
             self.hessian_offdiag_case[param1] = offdiag
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        todo = []
         
         # We don't need to re-run on-diag cases if the gradients were
         # calculated with Central Difference.
@@ -316,15 +322,14 @@ class FiniteDifference(HasTraits):
                     pcase['data'] = gradient_ipcase['data'] 
         else:
             for case in self.hessian_ondiag_case.values():
-                for pcase in case:
-                    data = self._run_point(pcase['param'])
-                    pcase['data'] = data
+                todo.extend(case)
 
         # Off-diag cases must always be run.
         for cases in self.hessian_offdiag_case.values():
             for case in cases.values():
-                for pcase in case:
-                    pcase['data'] = self._run_point(pcase['param'])
+                todo.extend(case)
+                
+        self._run_points(todo)
 
                     
         # Calculate Hessians - On Diagonal
@@ -364,6 +369,104 @@ class FiniteDifference(HasTraits):
                         self.hessian[key1][key2][name]
                     
     
+    def _run_points(self, pcases):
+        """Runs the model at each of the points in `pcases` and stores the
+        results in the 'data' entry of each one. Points are evaluated
+        concurrently unless `sequential` is True."""
+        
+        if not pcases:
+            return
+        
+        if self.sequential:
+            for pcase in pcases:
+                pcase['data'] = self._run_point(pcase['param'])
+            return
+        
+        # This import is here to avoid a circular dependency between the
+        # differentiators and the drivers.
+        from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver
+        from openmdao.lib.casehandlers.api import ListCaseIterator
+        
+        driver = self._parent
+        params = driver.get_parameters().values()
+        outputs = self._get_output_exprs()
+        
+        cases = []
+        for pcase in pcases:
+            case = Case(parent_uuid=driver._case_id)
+            for param, val in zip(params, pcase['param'].values()):
+                if isinstance(param, ParameterGroup):
+                    targets = param._params
+                else:
+                    targets = [param]
+                for target in targets:
+                    case.add_input(target.target, target._transform(float(val)))
+            case.add_outputs(outputs)
+            cases.append(case)
+            
+        # The runner evaluates a copy of our driver's workflow on each server.
+        runner = CaseIteratorDriver()
+        runner.name = '%s_fd' % driver.name
+        runner.parent = driver.parent
+        runner.sequential = False
+        runner.error_policy = 'ABORT'
+        runner.workflow = driver.workflow.__class__(runner, members=\
+                                                 driver.workflow.get_names())
+        runner.iterator = ListCaseIterator(cases)
+        runner.execute()
+        
+        # Cases are recorded in order of completion, so match them up by uuid.
+        evaluated = dict([(case.uuid, case) for case in runner.evaluated])
+        for pcase, case in zip(pcases, cases):
+            pcase['data'] = self._get_case_data(evaluated[case.uuid])
+            
+    def _get_output_exprs(self):
+        """Returns the list of expressions needed from each perturbed point
+        to compute the objectives and constraints."""
+        
+        outputs = [item.text for item in
+                   self._parent.get_objectives().values()]
+        
+        if self.ineqconst_names:
+            for item in self._parent.get_ineq_constraints().values():
+                outputs.extend([item.lhs.text, item.rhs.text])
+                
+        if self.eqconst_names:
+            for item in self._parent.get_eq_constraints().values():
+                outputs.extend([item.lhs.text, item.rhs.text])
+                
+        return outputs
+        
+    def _get_case_data(self, case):
+        """Extracts objective and constraint data from an evaluated Case in
+        the same form returned by _run_point."""
+        
+        if case.msg:
+            self.raise_exception('Finite difference point failed: %s' \
+                                 % case.msg, RuntimeError)
+        data = {}
+        
+        # Get Objectives
+        for key, item in self._parent.get_objectives().iteritems():
+            data[key] = case[item.text]
+            
+        # Get Constraints
+        constraints = []
+        if self.ineqconst_names:
+            constraints.extend(self._parent.get_ineq_constraints().items())
+        if self.eqconst_names:
+            constraints.extend(self._parent.get_eq_constraints().items())
+            
+        for key, item in constraints:
+            lhs = (case[item.lhs.text] + item.adder)*item.scaler
+            rhs = (case[item.rhs.text] + item.adder)*item.scaler
+            if '>' in item.comparator:
+                data[key] = rhs-lhs
+            else:
+                data[key] = lhs-rhs
+                
+        return data
+    
     def _run_point(self, data_param):
         """Runs the model at a single point and captures the results. Note that 
         some differences require the baseline point."""
@@ -155,6 +155,25 @@ class FiniteDifferenceTestCase(unittest.TestCase):
         #assert_rel_error(self, hess[0][1], 4.0, .001)
         #assert_rel_error(self, hess[1][0], 4.0, .001)
         
+    def test_concurrent(self):
+        
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        self.model.driver.differentiator.calc_gradient()
+        expected = {}
+        for wrt in ['comp.x', 'comp.u']:
+            for name in ['comp.y', 'comp.v', 'Con1', 'ConE']:
+                expected[(name, wrt)] = \
+                    self.model.driver.differentiator.get_derivative(name, wrt=wrt)
+                    
+        self.model.driver.differentiator.reset_state()
+        self.model.driver.differentiator.sequential = False
+        self.model.driver.differentiator.calc_gradient()
+        for (name, wrt), value in expected.items():
+            self.assertEqual(value,
+                self.model.driver.differentiator.get_derivative(name, wrt=wrt))
+        
     def test_reset_state(self):
         
         self.model.driver.form = 'central'
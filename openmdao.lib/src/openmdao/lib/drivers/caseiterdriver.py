@@ -3,16 +3,20 @@
 
 """
 
+import copy
+import hashlib
+import heapq
 import os.path
 import Queue
 import sys
 import thread
 import threading
+import time
 import traceback
 
-from openmdao.main.datatypes.api import Bool, Dict, Enum, Int, Slot
+from openmdao.main.datatypes.api import Bool, Dict, Enum, Float, Int, Slot
 
-from openmdao.main.api import Driver
+from openmdao.main.api import Assembly, Container, Driver
 from openmdao.main.exceptions import RunStopped, TracedError, traceback_str
 from openmdao.main.interfaces import ICaseIterator, ICaseRecorder, ICaseFilter
 from openmdao.main.rbac import get_credentials, set_credentials
@@ -29,11 +33,103 @@ _EMPTY     = 'empty'
 _LOADING   = 'loading'
 _EXECUTING = 'executing'
 
+# Statistics reported by :meth:`CaseIterDriverBase.get_pool_stats`.
+_POOL_STATS = ('allocated', 'reused', 'expired', 'released',
+               'transfers', 'loads', 'loads_skipped', 'inputs_reset')
+
+# Marks an input whose value in a worker's model is unknown.
+_UNKNOWN = object()
+
+# Completed cases required before speculating on stragglers.
+_MIN_SAMPLES = 3
+
+# Reply polling interval while servers are idle (seconds).
+_SPECULATE_POLL = 0.1
+
+
 class _ServerError(Exception):
     """ Raised when a server thread has problems. """
     pass
 
 
+class _PooledWorker(object):
+    """ State retained for an idle worker in the pool. """
+
+    def __init__(self, server, info, queue, thread, tlo, model):
+        self.server = server
+        self.info = info
+        self.queue = queue
+        self.thread = thread
+        self.tlo = tlo
+        self.model = model  # [egg checksum, {path: input value}]
+        self.last_used = time.time()
+
+
+def _file_checksum(path):
+    """ Return MD5 hex digest of the contents of `path`. """
+    md5 = hashlib.md5()
+    with open(path, 'rb') as inp:
+        for chunk in iter(lambda: inp.read(1 << 16), ''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _percentile(values, pct):
+    """ Return `pct` percentile of `values` (nearest rank). """
+    ordered = sorted(values)
+    return ordered[int(round((len(ordered) - 1) * pct / 100.))]
+
+
+def _same(old, new):
+    """ Return True if `old` and `new` are known to be equal. """
+    if old is _UNKNOWN:
+        return False
+    if getattr(old, 'shape', None) != getattr(new, 'shape', None):
+        return False
+    try:
+        equal = (old == new)
+        if isinstance(equal, bool):
+            return equal
+        return bool(equal.all())  # numpy array.
+    except Exception:
+        return False
+
+
+def _update_digest(md5, value):
+    """ Update `md5` with the contents of `value`. """
+    dtype = getattr(value, 'dtype', None)
+    if dtype is None:
+        md5.update(repr(value))
+    elif dtype == object:
+        md5.update(repr(value.tolist()))
+    else:  # numpy array or scalar, repr() may elide values.
+        md5.update('%s %s ' % (dtype, getattr(value, 'shape', ())))
+        md5.update(value.tostring())
+
+
+def _input_values(container, prefix, visited):
+    """
+    Return list of ``(path, value)`` for inputs within `container`,
+    descending into Container values and the components of assemblies.
+    """
+    values = []
+    visited.add(id(container))
+    for name, value in container.items(iotype='in'):
+        path = prefix + name
+        if isinstance(value, Container):
+            if id(value) not in visited:
+                values.extend(_input_values(value, path + '.', visited))
+        else:
+            values.append((path, value))
+    if isinstance(container, Assembly):
+        for name in container.list_containers():
+            child = getattr(container, name)
+            if id(child) not in visited:
+                values.extend(_input_values(child, '%s%s.' % (prefix, name),
+                                            visited))
+    return values
+
+
 class CaseIterDriverBase(Driver):
     """
     A base class for Drivers that run sets of cases in a manner similar
@@ -63,6 +159,34 @@ class CaseIterDriverBase(Driver):
                                         ' requirements will be included in the'
                                         ' generated egg.')
 
+    keep_workers = Bool(False, iotype='in',
+                        desc='If True, concurrent evaluation servers are kept'
+                             ' in a pool between executions. Workers keep'
+                             ' their loaded model while its structure and'
+                             ' values which can\'t be set remotely (such as'
+                             ' VariableTree contents) are unchanged, and only'
+                             ' inputs which changed are updated.')
+
+    pool_size = Int(0, low=0, iotype='in',
+                    desc='Maximum number of workers used and kept by the'
+                         ' pool (0 implies no limit).')
+
+    idle_timeout = Float(300., low=0., iotype='in', units='s',
+                         desc='Time an idle pooled worker is kept before being'
+                              ' released (0 implies no timeout).')
+
+    lookahead = Int(0, low=0, iotype='in',
+                    desc='Number of cases read ahead from the iterator so'
+                         ' that the highest estimated cost is run first'
+                         ' (see get_case_cost()).')
+
+    speculate_percentile = Float(0., low=0., high=100., iotype='in',
+                                 desc='If nonzero, otherwise idle servers'
+                                      ' re-run cases executing longer than'
+                                      ' this percentile of completed case'
+                                      ' durations. The first result is'
+                                      ' kept.')
+
     def __init__(self, *args, **kwargs):
         super(CaseIterDriverBase, self).__init__(*args, **kwargs)
         self._iter = None  # Set to None when iterator is empty.
@@ -73,6 +197,16 @@ class CaseIterDriverBase(Driver):
         self._egg_file = None
         self._egg_required_distributions = None
         self._egg_orphan_modules = None
+        self._egg_checksum = None
+        self._egg_signature = None
+        self._egg_inputs = None  # Model inputs when egg was saved.
+        self._run_inputs = None  # Model inputs for current run.
+
+        # Persistent worker pool, keyed by worker name.
+        self._pool = {}
+        self._pool_lock = None
+        self._pool_reply_q = None
+        self._pool_stats = dict.fromkeys(_POOL_STATS, 0)
 
         self._reply_q = None  # Replies from server threads.
         self._server_lock = None  # Lock for server data.
@@ -87,11 +221,43 @@ class CaseIterDriverBase(Driver):
         self._server_cases = {}
         self._exceptions = {}
         self._load_failures = {}
+        self._threads = {}
+        self._worker_models = {}
+        self._reused = set()
+        self._started = {}
+        self._spec_todo = {}
  
         self._todo = []   # Cases grabbed during server startup.
         self._rerun = []  # Cases that failed and should be retried.
         self._generation = 0  # Used to keep worker names unique.
 
+        # Scheduling data.
+        self._ready = []  # Heap of (-cost, fetch count, case).
+        self._fetched = 0
+        self._exhausted = False
+        self._running = {}  # Servers executing a case, keyed by seqno.
+        self._idle = set()  # Servers available for speculation.
+        self._abandoned = set()  # Servers which lost a speculative race.
+        self._durations = []
+        self._server_times = {}  # (cases, busy time) keyed by server name.
+        self._case_timing = []
+        self._speculated = set()
+
+    def __getstate__(self):
+        """Return dict representing this driver's state."""
+        state = super(CaseIterDriverBase, self).__getstate__()
+        state['_egg_inputs'] = None
+        state['_run_inputs'] = None
+        state['_pool'] = {}
+        state['_pool_lock'] = None
+        state['_pool_reply_q'] = None
+        return state
+
+    def pre_delete(self):
+        """Release any pooled workers."""
+        self.shutdown_workers()
+        super(CaseIterDriverBase, self).pre_delete()
+
     def execute(self):
         """
         Runs all cases and records results in `recorder`.
@@ -145,7 +311,7 @@ class CaseIterDriverBase(Driver):
             self.setup()
 
         try:
-            case = self._iter.next()
+            case = self._next_case()
         except StopIteration:
             if not self._rerun:
                 self._iter = None
@@ -172,9 +338,21 @@ class CaseIterDriverBase(Driver):
              If True, then replicate the model and save to an egg file
              first (for concurrent evaluation).
         """
+        if not self.keep_workers:
+            self.shutdown_workers()
         self._cleanup(remove_egg=replicate)
 
         if not self.sequential:
+            signature = None
+            if self.keep_workers:
+                signature = self._model_signature()
+                if self._egg_file is not None and \
+                   signature == self._egg_signature:
+                    # Pooled workers can keep their loaded model.
+                    replicate = False
+                else:
+                    self._remove_egg()
+
             if replicate or self._egg_file is None:
                 # Save model to egg.
                 # Must do this before creating any locks or queues.
@@ -205,14 +383,187 @@ class CaseIterDriverBase(Driver):
                 self._egg_file = egg_info[0]
                 self._egg_required_distributions = egg_info[1]
                 self._egg_orphan_modules = [name for name, path in egg_info[2]]
+                self._egg_checksum = _file_checksum(self._egg_file)
+                if self.keep_workers:
+                    self._egg_signature = signature
+                    self._egg_inputs = self._model_inputs()
+
+            if self.keep_workers:
+                self._run_inputs = self._model_inputs()
 
         self._iter = self.get_case_iterator()
         self._seqno = 0
+        self._ready = []
+        self._fetched = 0
+        self._exhausted = False
+        self._durations = []
+        self._server_times = {}
+        self._case_timing = []
+        self._speculated = set()
         
     def get_case_iterator(self):
         """Returns a new iterator over the Case set."""
         raise NotImplementedError('get_case_iterator')
 
+    def get_case_cost(self, case):
+        """
+        Return estimated cost of evaluating `case`, or None if unknown.
+        When `lookahead` is nonzero, buffered cases are run in order of
+        decreasing cost, so this can also be used as a priority.
+        """
+        return None
+
+    def get_case_timing(self):
+        """
+        Return list of ``(seqno, label, server, elapsed, speculated)`` for
+        each case evaluation accepted in the last run. `speculated` is True
+        if the case was also started on a second server.
+        """
+        return list(self._case_timing)
+
+    def get_server_stats(self):
+        """
+        Return dictionary of ``(cases, busy_time)`` keyed by server name for
+        the last run.
+        """
+        return dict((name, tuple(times))
+                    for name, times in self._server_times.items())
+
+    def _next_case(self):
+        """
+        Return next case from the iterator, highest estimated cost first
+        from up to `lookahead` buffered cases.
+        Raises StopIteration when no cases remain.
+        """
+        while not self._exhausted and len(self._ready) < max(self.lookahead, 1):
+            try:
+                case = self._iter.next()
+            except StopIteration:
+                self._exhausted = True
+            else:
+                cost = self.get_case_cost(case)
+                self._fetched += 1
+                heapq.heappush(self._ready, (-(cost or 0), self._fetched, case))
+        if not self._ready:
+            raise StopIteration()
+        return heapq.heappop(self._ready)[2]
+
+    def get_pool_stats(self):
+        """
+        Return dictionary of worker pool statistics: servers allocated,
+        workers reused, expired, and released, egg transfers, model loads
+        and loads skipped, and inputs reset in loaded models.
+        """
+        stats = dict(self._pool_stats)
+        stats['idle'] = len(self._pool)
+        return stats
+
+    def shutdown_workers(self):
+        """
+        Release all idle pooled workers and remove the egg file they use.
+        """
+        if self._pool_lock is not None:
+            with self._pool_lock:
+                pool = self._pool
+                self._pool = {}
+            for worker in pool.values():
+                worker.queue.put(None)
+            for name in self._await_shutdown(pool, self._pool_reply_q):
+                self._logger.warning('Timeout waiting for pooled worker %r'
+                                     ' to shut-down.', name)
+            self._pool_stats['released'] += len(pool)
+        if self.keep_workers:
+            self._remove_egg()
+
+    def _model_signature(self):
+        """
+        Return checksum of our model's structure and of the values which
+        can't be updated in a loaded model (see :meth:`_fixed_values`).
+        Used to determine if the saved egg can still be used by pooled
+        workers.
+        """
+        parent = self.parent
+        parts = [sorted(parent.list_inputs()),
+                 sorted(parent.list_connections()),
+                 list(self.workflow.get_names())]
+        for name in sorted(parent.list_containers()):
+            obj = getattr(parent, name)
+            cls = type(obj)
+            parts.append((name, cls.__module__, cls.__name__))
+            if hasattr(obj, 'list_inputs'):
+                parts.append(sorted(obj.list_inputs()))
+        md5 = hashlib.md5(repr(parts))
+        for path, value in sorted(self._fixed_values(),
+                                  key=lambda item: item[0]):
+            md5.update(path)
+            _update_digest(md5, value)
+        return md5.hexdigest()
+
+    def _input_paths(self):
+        """
+        Return paths of inputs which could be set in a loaded model:
+        the parent's inputs and unconnected inputs of workflow components.
+        """
+        paths = list(self.parent.list_inputs())
+        for comp in self.workflow:
+            paths.extend(['%s.%s' % (comp.name, name)
+                          for name in comp.list_inputs(connected=False)])
+        return paths
+
+    def _model_inputs(self):
+        """
+        Return copies of our model's input values which could be set in a
+        loaded model. Container values are handled by :meth:`_fixed_values`.
+        """
+        parent = self.parent
+        inputs = {}
+        for path in self._input_paths():
+            try:
+                value = parent.get(path)
+                if not isinstance(value, Container):
+                    inputs[path] = copy.deepcopy(value)
+            except Exception:
+                pass  # Not something we can update remotely.
+        return inputs
+
+    def _fixed_values(self):
+        """
+        Return list of ``(path, value)`` for model values which are fixed
+        when the egg is saved: the contents of Container inputs (such as
+        VariableTrees and Slots), inputs connected to components outside
+        our workflow, and inputs within sub-assemblies of our workflow.
+        """
+        parent = self.parent
+        names = set(self.workflow.get_names())
+        values = []
+        containers = []
+        for path in self._input_paths():
+            try:
+                value = parent.get(path)
+            except Exception:
+                continue
+            if isinstance(value, Container):
+                containers.append((path, value))
+
+        for src, dst in parent.list_connections():
+            if '.' in src and src.split('.')[0] not in names and \
+               dst.split('.')[0] in names:
+                try:
+                    values.append((dst, parent.get(dst)))
+                except Exception:
+                    pass
+
+        for comp in self.workflow:
+            if isinstance(comp, Assembly):
+                containers.extend([('%s.%s' % (comp.name, name),
+                                    getattr(comp, name))
+                                   for name in comp.list_containers()])
+
+        visited = set([id(parent), id(self)])
+        for path, obj in containers:
+            values.extend(_input_values(obj, path + '.', visited))
+        return values
+
     def _start(self):
         """ Start evaluating cases concurrently. """
         # Need credentials in case we're using a PublicKey server.
@@ -231,9 +582,19 @@ class CaseIterDriverBase(Driver):
             msg = 'No servers supporting required resources %s' % resources
             self.raise_exception(msg, RuntimeError)
 
+        if self.keep_workers:
+            if self._pool_lock is None:
+                self._pool_lock = threading.Lock()
+                self._pool_reply_q = Queue.Queue()
+            if self.pool_size:
+                max_servers = min(max_servers, self.pool_size)
+            self._server_lock = self._pool_lock
+            self._reply_q = self._pool_reply_q
+        else:
+            self._server_lock = threading.Lock()
+            self._reply_q = Queue.Queue()
+
         # Kick off initial wave of cases.
-        self._server_lock = threading.Lock()
-        self._reply_q = Queue.Queue()
         self._generation += 1
         n_servers = 0
         while n_servers < max_servers:
@@ -242,7 +603,7 @@ class CaseIterDriverBase(Driver):
 
             # Get next case. Limits servers started if max_servers > cases.
             try:
-                case = self._iter.next()
+                case = self._next_case()
             except StopIteration:
                 if not self._rerun:
                     self._iter = None
@@ -251,9 +612,16 @@ class CaseIterDriverBase(Driver):
 
             self._seqno += 1
             self._todo.append((case, self._seqno))
+            n_servers += 1
+
+            # Reuse pooled worker if possible.
+            name = self._checkout_worker()
+            if name is not None:
+                self._logger.debug('reusing worker %r', name)
+                self._in_use[name] = self._server_ready(name)
+                continue
 
             # Start server worker thread.
-            n_servers += 1
             name = '%s_%d_%d' % (self.name, self._generation, n_servers)
             self._logger.debug('starting worker for %r', name)
             self._servers[name] = None
@@ -265,6 +633,7 @@ class CaseIterDriverBase(Driver):
                                              args=(name, resources,
                                                    credentials, self._reply_q))
             server_thread.daemon = True
+            self._threads[name] = server_thread
             try:
                 server_thread.start()
             except thread.error:
@@ -281,6 +650,8 @@ class CaseIterDriverBase(Driver):
                     except Queue.Empty:
                         break  # Timeout.
                     else:
+                        if name not in self._in_use:  # 'Stale' pool reply.
+                            continue
                         # Difficult to force startup failure.
                         if self._servers[name] is None:  #pragma nocover
                             self._logger.debug('server startup failed for %r',
@@ -304,6 +675,7 @@ class CaseIterDriverBase(Driver):
                     self._in_use[name] = self._server_ready(name)
 
         # Continue until no servers are busy.
+        last_reply = time.time()
         while self._busy():
             if self._more_to_go():
                 timeout = None
@@ -312,10 +684,17 @@ class CaseIterDriverBase(Driver):
                 # This has happened with a server that got 'lost'
                 # in RAM.allocate()
                 timeout = 60
+            if self._idle:
+                # Periodically check for stragglers to speculate on.
+                timeout = _SPECULATE_POLL
             try:
                 name, result, exc = self._reply_q.get(timeout=timeout)
             # Hard to force worker to hang, which is handled here.
             except Queue.Empty:  #pragma no cover
+                if self._idle:
+                    self._speculate()
+                    if time.time() - last_reply < 60 or self._more_to_go():
+                        continue
                 msgs = []
                 for name, in_use in self._in_use.items():
                     if in_use:
@@ -337,24 +716,147 @@ class CaseIterDriverBase(Driver):
                     for msg in msgs:
                         self._logger.error('    %s', msg)
             else:
-                self._in_use[name] = self._server_ready(name)
+                last_reply = time.time()
+                if name in self._in_use:  # Ignore 'stale' pool reply.
+                    self._in_use[name] = self._server_ready(name)
+
+        if self.keep_workers:
+            self._checkin_workers()
+            self._logger.debug('Worker pool %s', self.get_pool_stats())
+
+        # Don't wait for servers still executing a case another server
+        # has completed (they may be hung).
+        for name in self._abandoned:
+            self._logger.debug('Abandoning %r', name)
+            self._queues.pop(name).put(None)
 
         # Shut-down (started) servers.
         self._logger.debug('Shut-down (started) servers')
         for queue in self._queues.values():
             queue.put(None)
-        for i in range(len(self._queues)):
+        hung = self._await_shutdown(self._queues, self._reply_q)
+        # Hard to force worker to hang, which is handled here.
+        for name in hung:  #pragma no cover
+            self._logger.warning('Timeout waiting for %r to shut-down.', name)
+
+    def _await_shutdown(self, names, reply_q):
+        """
+        Wait for workers in `names` to acknowledge shut-down on `reply_q`.
+        Replies from other workers are ignored: abandoned servers reply
+        *late*, and with `keep_workers` they share the pool's reply queue.
+        Returns the names which didn't reply in time.
+        """
+        waiting = set(names)
+        while waiting:
             try:
-                name, status, exc = self._reply_q.get(True, 60)
+                name, status, exc = reply_q.get(True, 60)
             # Hard to force worker to hang, which is handled here.
             except Queue.Empty:  #pragma no cover
-                pass
+                break
+            waiting.discard(name)
+        return sorted(waiting)
+
+    def _checkout_worker(self):
+        """
+        Remove an idle worker from the pool and setup per-server data for it.
+        Returns the worker name, or None if no worker is available.
+        """
+        if not self._pool:
+            return None
+        with self._pool_lock:
+            while self._pool:
+                name, worker = self._pool.popitem()
+                if worker.thread.is_alive():
+                    break
             else:
-                if name in self._queues:  # 'Stale' worker can reply *late*.
-                    del self._queues[name]
-        # Hard to force worker to hang, which is handled here.
-        for name in self._queues.keys():  #pragma no cover
-            self._logger.warning('Timeout waiting for %r to shut-down.', name)
+                return None
+
+        self._pool_stats['reused'] += 1
+        self._servers[name] = worker.server
+        self._server_info[name] = worker.info
+        self._queues[name] = worker.queue
+        self._threads[name] = worker.thread
+        self._top_levels[name] = worker.tlo
+        self._worker_models[name] = worker.model
+        self._reused.add(name)
+        self._in_use[name] = True
+        self._server_cases[name] = None
+        self._server_states[name] = _EMPTY
+        self._load_failures[name] = 0
+        return name
+
+    def _checkin_workers(self):
+        """
+        Return healthy workers to the pool, up to `pool_size`.
+        Pooled workers are removed from `_queues` so they aren't shut-down.
+        """
+        with self._pool_lock:
+            for name in sorted(self._queues.keys()):
+                if self.pool_size and len(self._pool) >= self.pool_size:
+                    break
+                tlo = self._top_levels.get(name)
+                if tlo is None or self._server_states.get(name) != _EMPTY \
+                   or not self._threads[name].is_alive():
+                    continue
+                self._pool[name] = \
+                    _PooledWorker(self._servers[name], self._server_info[name],
+                                  self._queues.pop(name), self._threads[name],
+                                  tlo, self._worker_models.get(name))
+
+    def _expire_worker(self, name):
+        """
+        Returns True if pooled worker `name` has been idle too long, after
+        removing it from the pool.
+        """
+        with self._pool_lock:
+            worker = self._pool.get(name)
+            if worker is not None and \
+               time.time() - worker.last_used >= self.idle_timeout:
+                del self._pool[name]
+                self._pool_stats['expired'] += 1
+                return True
+        return False
+
+    def _speculate(self):
+        """
+        Start a second copy of straggling cases on idle servers. A case is
+        a straggler if it has been executing longer than the
+        `speculate_percentile` of completed case durations.
+        """
+        if self._stop or len(self._durations) < _MIN_SAMPLES:
+            return
+        threshold = _percentile(self._durations, self.speculate_percentile)
+        now = time.time()
+        stragglers = []
+        for seqno, servers in self._running.items():
+            if len(servers) == 1:
+                server = list(servers)[0]
+                elapsed = now - self._started[server]
+                if elapsed > threshold:
+                    stragglers.append((elapsed, seqno, server))
+        if not stragglers:
+            return
+
+        # Longest running stragglers go to the fastest servers.
+        stragglers.sort(reverse=True)
+        idle = sorted(self._idle, key=self._server_rate, reverse=True)
+        for (elapsed, seqno, server), name in zip(stragglers, idle):
+            self._logger.debug('speculating on case %d from %r (%.1f sec)'
+                               ' using %r', seqno, server, elapsed, name)
+            self._idle.discard(name)
+            self._speculated.add(seqno)
+            self._spec_todo[name] = self._server_cases[server]
+            if self.reload_model:
+                self._load_model(name)
+                self._server_states[name] = _LOADING
+                self._in_use[name] = True
+            else:
+                self._in_use[name] = self._start_next_case(name)
+
+    def _server_rate(self, server):
+        """ Return cases per second completed by `server`. """
+        cases, busy = self._server_times.get(server, (0, 0.))
+        return cases / busy if busy else 0.
 
     def _busy(self):
         """ Return True while at least one server is in use. """
@@ -378,13 +880,36 @@ class CaseIterDriverBase(Driver):
         self._server_cases = {}
         self._exceptions = {}
         self._load_failures = {}
+        self._threads = {}
+        self._worker_models = {}
+        self._reused = set()
+        self._started = {}
+        self._spec_todo = {}
+        self._running = {}
+        self._idle = set()
+        self._abandoned = set()
 
         self._todo = []
         self._rerun = []
 
+        if not self.keep_workers:  # Pooled workers may need to reload.
+            self._remove_egg()
+
+    def _remove_egg(self):
+        """ Remove egg file (if any). """
         if self._egg_file and os.path.exists(self._egg_file):
             os.remove(self._egg_file)
-            self._egg_file = None
+        self._egg_file = None
+        self._egg_checksum = None
+        self._egg_signature = None
+        self._egg_inputs = None
+
+    def _count(self, stat, incr=1):
+        """ Update pool statistic `stat` from a server thread. """
+        lock = self._server_lock
+        if lock is not None:
+            with lock:
+                self._pool_stats[stat] += incr
 
     def _server_ready(self, server, stepping=False):
         """
@@ -434,27 +959,56 @@ class CaseIterDriverBase(Driver):
         elif state == _EXECUTING:
             case, seqno = self._server_cases[server]
             self._server_cases[server] = None
+            elapsed = time.time() - self._started.pop(server)
+            times = self._server_times.setdefault(server, [0, 0.])
+            times[1] += elapsed
+            running = self._running.get(seqno, set())
+            others = running - set([server])
             exc = self._model_status(server)
-            if exc is None:
-                # Grab the data from the model.
-                scope = self.parent if server is None else self._top_levels[server]
-                try:
-                    case.update_outputs(scope)
-                except Exception as exc:
-                    msg = 'Exception getting case outputs: %s' % exc
-                    self._logger.debug('    %s', msg)
-                    case.msg = '%s: %s' % (self.get_pathname(), msg)
+
+            if server not in running:
+                # Another server completed this case first.
+                self._logger.debug('    discarding result of case %d', seqno)
+                self._abandoned.discard(server)
+
+            elif exc is not None and others:
+                # Let the other copy finish.
+                self._logger.debug('    exception while executing: %r,'
+                                   ' waiting for other copy', exc)
+                running.discard(server)
+
             else:
-                self._logger.debug('    exception while executing: %r', exc)
-                case.msg = str(exc)
+                if exc is None:
+                    # Grab the data from the model.
+                    try:
+                        self._model_get_outputs(server, case)
+                    except Exception as exc:
+                        msg = 'Exception getting case outputs: %s' % exc
+                        self._logger.debug('    %s', msg)
+                        case.msg = '%s: %s' % (self.get_pathname(), msg)
+                else:
+                    self._logger.debug('    exception while executing: %r', exc)
+                    case.msg = str(exc)
 
-            if case.msg is not None and self.error_policy == 'ABORT':
-                if self._abort_exc is None:
-                    self._abort_exc = exc
-                self._stop = True
+                if case.msg is not None and self.error_policy == 'ABORT':
+                    if self._abort_exc is None:
+                        self._abort_exc = exc
+                    self._stop = True
+
+                del self._running[seqno]
+                for other in others:
+                    self._logger.debug('    abandoning copy on %r', other)
+                    self._in_use[other] = False
+                    self._abandoned.add(other)
+
+                times[0] += 1
+                if case.msg is None:
+                    self._durations.append(elapsed)
+                self._case_timing.append((seqno, case.label, server, elapsed,
+                                          seqno in self._speculated))
 
-            # Record the data.
-            self._record_case(case, seqno)
+                # Record the data.
+                self._record_case(case, seqno)
 
             # Set up for next case.
             in_use = self._start_processing(server, stepping, reload=True)
@@ -469,6 +1023,11 @@ class CaseIterDriverBase(Driver):
                 self._stop = True
             in_use = False
 
+        if self.speculate_percentile and server is not None:
+            if in_use or self._stop or server not in self._queues:
+                self._idle.discard(server)
+            elif self._server_states[server] == _EMPTY:
+                self._idle.add(server)
         return in_use
 
     def _more_to_go(self, stepping=False):
@@ -508,7 +1067,12 @@ class CaseIterDriverBase(Driver):
 
     def _start_next_case(self, server, stepping=False):
         """ Look for the next case and start it. """
-        if self._todo:
+        spec = self._spec_todo.pop(server, None)
+        if spec is not None and spec[1] in self._running:
+            self._logger.debug('    run speculative copy')
+            in_use = self._run_case(spec[0], spec[1], server, rerun=True,
+                                    speculative=True)
+        elif self._todo:
             self._logger.debug('    run startup case')
             case, seqno = self._todo.pop(0)
             in_use = self._run_case(case, seqno, server)
@@ -523,7 +1087,7 @@ class CaseIterDriverBase(Driver):
             in_use = False
         else:
             try:
-                case = self._iter.next()
+                case = self._next_case()
             except StopIteration:
                 self._logger.debug('    no more cases')
                 self._iter = None
@@ -533,10 +1097,16 @@ class CaseIterDriverBase(Driver):
                 self._logger.debug('    run next case')
                 self._seqno += 1
                 in_use = self._run_case(case, self._seqno, server)
+        if not in_use:
+            self._server_states[server] = _EMPTY  # Idle, may be pooled.
         return in_use
 
-    def _run_case(self, case, seqno, server, rerun=False):
-        """ Setup and start a case. Returns True if started. """
+    def _run_case(self, case, seqno, server, rerun=False, speculative=False):
+        """
+        Setup and start a case. Returns True if started.
+        A `speculative` copy of a running case isn't recorded if it fails
+        to start.
+        """
         if not rerun:
             if not case.max_retries:
                 case.max_retries = self.max_retries
@@ -545,26 +1115,29 @@ class CaseIterDriverBase(Driver):
         case.parent_uuid = self._case_id
 
         try:
-            for event in self.get_events(): 
-                try: 
-                    self._model_set(server, event, None, True)
-                except Exception as exc:
-                    msg = 'Exception setting %r: %s' % (event, exc)
-                    self._logger.debug('    %s', msg)
-                    self.raise_exception(msg, _ServerError)
+            if server is None:
+                for event in self.get_events(): 
+                    try: 
+                        self._model_set(server, event, None, True)
+                    except Exception as exc:
+                        msg = 'Exception setting %r: %s' % (event, exc)
+                        self._logger.debug('    %s', msg)
+                        self.raise_exception(msg, _ServerError)
             try:
-                scope = self.parent if server is None else self._top_levels[server]
-                case.apply_inputs(scope)
+                self._model_set_inputs(server, case)
             except Exception as exc:
                 msg = 'Exception setting case inputs: %s' % exc
                 self._logger.debug('    %s', msg)
                 self.raise_exception(msg, _ServerError)
             self._server_cases[server] = (case, seqno)
+            self._started[server] = time.time()
+            self._running.setdefault(seqno, set()).add(server)
             self._model_execute(server)
             self._server_states[server] = _EXECUTING
         except _ServerError as exc:
-            case.msg = str(exc)
-            self._record_case(case, seqno)
+            if not speculative:
+                case.msg = str(exc)
+                self._record_case(case, seqno)
             return self._start_processing(server, stepping=False)
         else:
             return True
@@ -593,8 +1166,10 @@ class CaseIterDriverBase(Driver):
             # Clear egg re-use indicator.
             server_info['egg_file'] = None
             self._logger.debug('%r using %r', name, server_info['name'])
+            self._count('allocated')
 
         request_q = Queue.Queue()
+        ack_shutdown = True
 
         try:
             with self._server_lock:
@@ -605,7 +1180,17 @@ class CaseIterDriverBase(Driver):
             reply_q.put((name, True, None))  # ACK startup.
 
             while True:
-                request = request_q.get()
+                if self.keep_workers and self.idle_timeout:
+                    try:
+                        request = request_q.get(True, self.idle_timeout)
+                    except Queue.Empty:
+                        if self._expire_worker(name):
+                            self._logger.debug('%r idle timeout', name)
+                            ack_shutdown = False  # Nobody is waiting.
+                            break
+                        continue
+                else:
+                    request = request_q.get()
                 if request is None:
                     break
                 try:
@@ -625,7 +1210,8 @@ class CaseIterDriverBase(Driver):
         finally:
             self._logger.debug('%r releasing server', name)
             RAM.release(server)
-            reply_q.put((name, True, None))  # ACK shutdown.
+            if ack_shutdown:
+                reply_q.put((name, True, None))  # ACK shutdown.
 
     def _load_model(self, server):
         """ Load a model into a server. """
@@ -634,7 +1220,18 @@ class CaseIterDriverBase(Driver):
             self._queues[server].put((self._remote_load_model, server))
 
     def _remote_load_model(self, server):
-        """ Load model into remote server. """
+        """
+        Load model into remote server. A reused worker keeps its model if
+        it was loaded from the same egg, only updating changed inputs.
+        """
+        model = self._worker_models.get(server)
+        if server in self._reused:
+            self._reused.discard(server)
+            if model is not None and model[0] == self._egg_checksum:
+                self._count('loads_skipped')
+                self._update_inputs(server, model[1])
+                return
+
         egg_file = self._server_info[server].get('egg_file', None)
         if egg_file is None or egg_file is not self._egg_file:
             # Only transfer if changed.
@@ -650,6 +1247,7 @@ class CaseIterDriverBase(Driver):
                 return
             else:
                 self._server_info[server]['egg_file'] = self._egg_file
+                self._count('transfers')
         try:
             tlo = self._servers[server].load_model(self._egg_file)
         # Difficult to force load error.
@@ -660,6 +1258,29 @@ class CaseIterDriverBase(Driver):
             self._exceptions[server] = TracedError(exc, traceback.format_exc())
         else:
             self._top_levels[server] = tlo
+            self._count('loads')
+            if self._run_inputs is not None:
+                self._update_inputs(server, self._egg_inputs)
+
+    def _update_inputs(self, server, current):
+        """
+        Set inputs in server's model which differ from `current`, the values
+        we believe the model has.
+        """
+        changes = [(path, value) for path, value in self._run_inputs.items()
+                                 if not _same(current.get(path, _UNKNOWN),
+                                              value)]
+        try:
+            if changes:
+                self._top_levels[server].set_many(changes)
+        except Exception as exc:
+            self._logger.error('server %r input update failed: %r',
+                               server, exc)
+            self._exceptions[server] = TracedError(exc, traceback.format_exc())
+        else:
+            self._count('inputs_reset', len(changes))
+            self._worker_models[server] = [self._egg_checksum,
+                                           dict(self._run_inputs)]
 
     def _model_set(self, server, name, index, value):
         """ Set value in server's model. """
@@ -668,6 +1289,44 @@ class CaseIterDriverBase(Driver):
         else:
             self._top_levels[server].set(name, value, index)
 
+    def _model_set_inputs(self, server, case):
+        """
+        Set events and `case` inputs in server's model.
+        For a remote server everything is sent in a single message.
+        """
+        if server is None:
+            case.apply_inputs(self.parent)
+        else:
+            items = [(event, True) for event in self.get_events()]
+            items.extend(case.get_inputs())
+            model = self._worker_models.get(server)
+            if model is not None:
+                # Case inputs need to be reset for a reused model.
+                inputs = model[1]
+                for name, value in items:
+                    inputs[name.split('[')[0]] = _UNKNOWN
+            self._top_levels[server].set_many(items)
+
+    def _model_get_outputs(self, server, case):
+        """
+        Update `case` outputs from server's model.
+        For a remote server everything is fetched in a single message.
+        """
+        if server is None:
+            case.update_outputs(self.parent)
+        else:
+            tlo = self._top_levels[server]
+            names = case.keys(iotype='out')
+            try:
+                values = tlo.get_many(names)
+            except Exception:
+                # Go one at a time to get per-output error information.
+                case.update_outputs(tlo)
+            else:
+                case.msg = None
+                for name, value in zip(names, values):
+                    case[name] = value
+
     def _model_execute(self, server):
         """ Execute model in server. """
         self._exceptions[server] = None
@@ -724,6 +1383,16 @@ class CaseIteratorDriver(CaseIterDriverBase):
         else:
             self.raise_exception("iterator has not been set", ValueError)
 
+    def get_case_cost(self, case):
+        """
+        Return estimated cost of evaluating `case` from `iterator`, if it
+        provides a ``get_cost(case)`` method.
+        """
+        get_cost = getattr(self.iterator, 'get_cost', None)
+        if get_cost is None:
+            return None
+        return get_cost(case)
+
     def _select_cases(self):
         """ Select cases to be evaluated. """
         for i, case in enumerate(iter(self.iterator)):
@@ -5,8 +5,10 @@ Test CaseIteratorDriver.
 import logging
 import os
 import pkg_resources
+import Queue
 import re
 import sys
+import threading
 import time
 import unittest
 import nose
@@ -14,14 +16,16 @@ import nose
 import random
 import numpy.random as numpy_random
 
-from openmdao.main.api import Assembly, Component, Case, set_as_top
+from openmdao.main.api import Assembly, Component, Case, VariableTree, \
+                              set_as_top
 from openmdao.main.interfaces import ICaseIterator
 from openmdao.main.eggchecker import check_save_load
 from openmdao.main.exceptions import RunStopped
 from openmdao.main.resource import ResourceAllocationManager, ClusterAllocator
 
 from openmdao.lib.datatypes.api import Float, Bool, Array, Int, Slot, Str
-from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver
+from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver, \
+                                               _PooledWorker
 from openmdao.lib.drivers.simplecid import SimpleCaseIterDriver
 from openmdao.lib.casehandlers.api import ListCaseRecorder, ListCaseIterator, \
                                           SequenceCaseFilter
@@ -33,6 +37,9 @@ from openmdao.util.testutil import assert_raises
 # Capture original working directory so we can restore in tearDown().
 ORIG_DIR = os.getcwd()
 
+# Seconds a straggling case takes.
+STRAGGLER_DELAY = 3
+
 # pylint: disable-msg=E1101
 
 def replace_uuid(msg):
@@ -121,6 +128,50 @@ class Verifier(Component):
             assert case['driven.sum_y'] == sum(case['driven.y'])
 
 
+class StragglerComponent(Component):
+    """ Slow the first time `marker` doesn't exist. """
+
+    x = Float(iotype='in')
+    marker = Str(iotype='in')
+    y = Float(iotype='out')
+
+    def execute(self):
+        """ Double `x`, possibly slowly. """
+        if self.marker and not os.path.exists(self.marker):
+            open(self.marker, 'w').close()
+            time.sleep(STRAGGLER_DELAY)
+        self.y = 2 * self.x
+
+
+class ScaleTree(VariableTree):
+    """ Scale factor held in a VariableTree. """
+
+    factor = Float(1.)
+
+
+class ScaledComponent(Component):
+    """ Scales `x` by `scale.factor`. """
+
+    scale = Slot(ScaleTree, iotype='in')
+    x = Float(iotype='in')
+    y = Float(iotype='out')
+
+    def __init__(self):
+        super(ScaledComponent, self).__init__()
+        self.add('scale', ScaleTree())
+
+    def execute(self):
+        """ Scale `x`. """
+        self.y = self.scale.factor * self.x
+
+
+class CostCaseIterator(ListCaseIterator):
+    """ Provides cost estimates for cases. """
+
+    def get_cost(self, case):
+        return float(case.label)
+
+
 class TracedComponent(Component):
     """ Used to check iteration coordinates. """
 
@@ -145,6 +196,7 @@ class TestCase(unittest.TestCase):
         os.chdir(self.directory)
         self.model = set_as_top(MyModel())
         self.generate_cases()
+        self.threads = []  # Worker threads which may outlive the test.
 
     def generate_cases(self, force_errors=False):
         self.cases = []
@@ -161,6 +213,11 @@ class TestCase(unittest.TestCase):
         self.model.pre_delete()
         self.model = None
 
+        # Let abandoned workers finish and release their servers.
+        deadline = time.time() + 2 * STRAGGLER_DELAY
+        for thread in self.threads:
+            thread.join(max(deadline - time.time(), 0))
+
         # Verify we didn't mess-up working directory.
         end_dir = os.getcwd()
         os.chdir(ORIG_DIR)
@@ -254,6 +311,103 @@ class TestCase(unittest.TestCase):
         self.model.driver.extra_resources = {'allocator': name}
         self.run_cases(sequential=False)
 
+    def test_keep_workers(self):
+        logging.debug('')
+        logging.debug('test_keep_workers')
+        driver = self.model.driver
+        driver.keep_workers = True
+        self.run_cases(sequential=False)
+        stats = driver.get_pool_stats()
+        allocated = stats['allocated']
+        self.assertTrue(allocated > 0)
+        self.assertEqual(stats['reused'], 0)
+        self.assertEqual(stats['transfers'], allocated)
+        self.assertEqual(stats['idle'], allocated)
+        egg_file = driver._egg_file
+        self.assertTrue(os.path.exists(egg_file))
+
+        # Rerun with a changed (non-case) input, workers & egg are reused.
+        self.model.driven.sleep = 0.1
+        driver.iterator = ListCaseIterator(self.cases)
+        driver.recorders = [ListCaseRecorder()]
+        self.model.run()
+        self.verify_results()
+        stats = driver.get_pool_stats()
+        self.assertEqual(stats['allocated'], allocated)
+        self.assertEqual(stats['reused'], allocated)
+        self.assertEqual(stats['transfers'], allocated)
+        self.assertEqual(stats['loads_skipped'], allocated)
+        self.assertTrue(stats['inputs_reset'] > 0)
+        self.assertEqual(driver._egg_file, egg_file)
+
+        # Idle workers are released after `idle_timeout`.
+        driver.idle_timeout = 0.5
+        driver.iterator = ListCaseIterator(self.cases)
+        self.model.run()
+        time.sleep(2)
+        stats = driver.get_pool_stats()
+        self.assertEqual(stats['idle'], 0)
+        self.assertEqual(stats['expired'], allocated)
+
+        driver.shutdown_workers()
+        self.assertFalse(os.path.exists(egg_file))
+
+    def test_keep_workers_vartree(self):
+        logging.debug('')
+        logging.debug('test_keep_workers_vartree')
+
+        top = set_as_top(Assembly())
+        top.add('driver', CaseIteratorDriver())
+        top.add('comp', ScaledComponent())
+        top.driver.workflow.add('comp')
+        top.driver.sequential = False
+        top.driver.keep_workers = True
+        cases = [Case(inputs=[('comp.x', i)], outputs=['comp.y'])
+                 for i in range(4)]
+        try:
+            top.driver.iterator = ListCaseIterator(cases)
+            top.run()
+            self.assertEqual(sorted([case['comp.y']
+                                     for case in top.driver.evaluated]),
+                             [0., 1., 2., 3.])
+            loads = top.driver.get_pool_stats()['loads']
+
+            # A changed VariableTree input can't be set in a loaded model,
+            # so workers must load a new egg.
+            top.comp.scale.factor = 2.
+            top.driver.iterator = ListCaseIterator(cases)
+            top.run()
+            self.assertEqual(sorted([case['comp.y']
+                                     for case in top.driver.evaluated]),
+                             [0., 2., 4., 6.])
+            self.assertTrue(top.driver.get_pool_stats()['loads'] > loads)
+        finally:
+            top.driver.shutdown_workers()
+
+    def test_model_signature(self):
+        logging.debug('')
+        logging.debug('test_model_signature')
+
+        top = set_as_top(Assembly())
+        top.add('driver', CaseIteratorDriver())
+        top.add('comp', ScaledComponent())
+        top.add('sub', Assembly())
+        top.sub.add('comp', ScaledComponent())
+        top.driver.workflow.add(['comp', 'sub'])
+        driver = top.driver
+        signature = driver._model_signature()
+
+        # Inputs which can be set in a loaded model.
+        top.comp.x = 2.
+        self.assertEqual(driver._model_signature(), signature)
+
+        # VariableTree contents and sub-assembly values can't.
+        top.comp.scale.factor = 2.
+        self.assertNotEqual(driver._model_signature(), signature)
+        signature = driver._model_signature()
+        top.sub.comp.x = 3.
+        self.assertNotEqual(driver._model_signature(), signature)
+
     def run_cases(self, sequential, forced_errors=False, retry=True):
         """ Evaluate cases, either sequentially or across multiple servers. """
         self.model.driver.sequential = sequential
@@ -436,6 +590,95 @@ class TestCase(unittest.TestCase):
         for i, case in enumerate(rerun.cases):
             self.assertEqual(case, orig_cases[rerun_seq[i]])
 
+    def test_speculation(self):
+        logging.debug('')
+        logging.debug('test_speculation')
+
+        top = set_as_top(Assembly())
+        top.add('driver', CaseIteratorDriver())
+        top.add('comp', StragglerComponent())
+        top.driver.workflow.add('comp')
+        top.driver.sequential = False
+        top.driver.speculate_percentile = 90.
+
+        marker = os.path.join(self.directory, 'straggler.marker')
+        if os.path.exists(marker):
+            os.remove(marker)
+        cases = []
+        for i in range(10):
+            cases.append(Case(label=str(i),
+                              inputs=[('comp.x', i),
+                                      ('comp.marker', marker if i == 0 else '')],
+                              outputs=['comp.y']))
+        top.driver.iterator = ListCaseIterator(cases)
+        before = set(threading.enumerate())
+        try:
+            top.run()
+        finally:
+            self.threads = [thread for thread in threading.enumerate()
+                                   if thread not in before]
+            if os.path.exists(marker):
+                os.remove(marker)
+
+        self.assertEqual(len(top.driver.evaluated), 10)
+        for case in top.driver.evaluated:
+            self.assertEqual(case.msg, None)
+            self.assertEqual(case['comp.y'], 2 * case['comp.x'])
+        timing = top.driver.get_case_timing()
+        self.assertEqual(len(timing), 10)
+        speculated = [label for seqno, label, server, elapsed, spec in timing
+                            if spec]
+        self.assertEqual(speculated, ['0'])
+        for seqno, label, server, elapsed, spec in timing:
+            self.assertTrue(elapsed < STRAGGLER_DELAY)
+        self.assertEqual(sum([count for count, busy in
+                              top.driver.get_server_stats().values()]), 10)
+
+    def test_stale_shutdown_reply(self):
+        logging.debug('')
+        logging.debug('test_stale_shutdown_reply')
+
+        # An abandoned server's late ACK must not be taken for a pooled
+        # worker's shut-down.
+        driver = self.model.driver
+        driver._pool_lock = threading.Lock()
+        driver._pool_reply_q = reply_q = Queue.Queue()
+        reply_q.put(('abandoned', True, None))
+
+        request_q = Queue.Queue()
+        def worker():
+            request_q.get()
+            time.sleep(0.1)
+            reply_q.put(('pooled', True, None))
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+        driver._pool['pooled'] = _PooledWorker(None, {}, request_q, thread,
+                                               None, None)
+
+        driver.shutdown_workers()
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(reply_q.empty())
+        self.assertEqual(driver.get_pool_stats()['released'], 1)
+
+    def test_lookahead(self):
+        logging.debug('')
+        logging.debug('test_lookahead')
+
+        cases = []
+        for i in range(5):
+            cases.append(Case(label=str(i), inputs=[('comp1.inp', i)],
+                              outputs=['comp1.itername']))
+        top = set_as_top(Assembly())
+        top.add('driver', CaseIteratorDriver())
+        top.add('comp1', TracedComponent())
+        top.driver.workflow.add('comp1')
+        top.driver.iterator = CostCaseIterator(cases)
+        top.driver.lookahead = 3
+        top.run()
+        labels = [case.label for case in top.driver.evaluated]
+        self.assertEqual(labels, ['2', '3', '4', '1', '0'])
+
     def test_itername(self):
         logging.debug('')
         logging.debug('test_itername')
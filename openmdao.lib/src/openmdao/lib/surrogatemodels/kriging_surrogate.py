@@ -1,14 +1,17 @@
 """ Surrogate model based on Kriging. """
 
-from math import log, e, sqrt
+from math import log
 import logging
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import array, zeros, dot, ones, arange, eye, abs, vstack, exp, diag
+    from numpy import array, zeros, dot, ones, eye, abs, vstack, exp, \
+                      diag, sqrt, newaxis, fill_diagonal, logaddexp, outer, \
+                      tensordot
+    from numpy import log as nplog
     from numpy.linalg import det, linalg, lstsq
     from scipy.linalg import cho_factor, cho_solve
-    from scipy.optimize import fmin
+    from scipy.optimize import fmin, fmin_l_bfgs_b
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
@@ -27,12 +30,18 @@ class KrigingSurrogate(object):
         self.n = None #number of training points
         self.thetas = None
         self.nugget = 0 #nugget smoothing parameter from [Sasena, 2002]
+        self.use_gradient = False #train using analytic likelihood gradients
+        self.theta_bounds = (-3., 2.) #log10(theta) bounds for gradient training
         
         self.R = None
         self.R_fact = None
+        self.Rinv_Ymu = None # R^-1 (Y-mu), reused for predictions
+        self.Rinv_one = None # R^-1 1, reused for predictions
         self.mu = None
         self.sig2 = None
         self.log_likelihood = None
+        self.log_likelihood_grad = None
+        self._sqdist = None # squared distances between training points
 
         self.X = X
         self.Y = Y
@@ -49,55 +58,41 @@ class KrigingSurrogate(object):
         """Calculates a predicted value of the response based on the current
         trained model for the supplied list of inputs.
         """
+        f, RMSE = self.predict_batch([new_x])
+        return NormalDistribution(f[0], RMSE[0])
+    
+    def predict_batch(self, new_X):
+        """Calculates predicted values of the response based on the current
+        trained model for each row of `new_X`, an (m, k) array of inputs.
+        Returns a tuple of arrays (mean, RMSE), each of length m.
+        """
         if self.m == None: #untrained surrogate
             raise RuntimeError("KrigingSurrogate has not been trained, so no "
                                "prediction can be made")
-        r = zeros(self.n)
-        X, Y = self.X, self.Y
         thetas = 10.**self.thetas
-        XX = array(X)
-        new_x = array(new_x)
-        for i in range(self.n):
-            r[i] = sum(thetas*(XX[i]-new_x)**2.)
-        r = exp(-r)
-            
-        one = ones(self.n)
+        XX = array(self.X)
+        new_X = array(new_X, dtype=float)
+        
+        # correlation between every new point and every training point
+        dist = dot((new_X[:, newaxis, :]-XX[newaxis, :, :])**2., thetas)
+        r = exp(-dist)
+        
         if self.R_fact is not None: 
             #---CHOLESKY DECOMPOSTION ---
-            #f = self.mu+dot(r,cho_solve(self.R_fact,Y-dot(one,self.mu)))
-            #term1 = dot(r,cho_solve(self.R_fact,r))
-            #term2 = (1.0-dot(one,cho_solve(self.R_fact,r)))**2./dot(one,cho_solve(self.R_fact,one))
-            
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
             R_fact = (self.R_fact[0].T,not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-            
-            f = self.mu + dot(r, cho[0])
-            term1 = dot(r, cho[1])
-            term2 = (1.0 - dot(one, cho[1]))**2./dot(one, cho[2])
-            
+            Rinv_r = cho_solve(R_fact, r.T).T
         else: 
             #-----LSTSQ-------
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-            lsq = lstsq(self.R.T, rhs)[0].T
+            Rinv_r = lstsq(self.R.T, r.T)[0].T
             
-            f = self.mu + dot(r, lsq[0])
-            term1 = dot(r, lsq[1])
-            term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-            """
-      #-----LSTSQ-------
-      rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-      lsq = lstsq(self.R.T, rhs)[0].T
-      
-      f = self.mu + dot(r, lsq[0])
-      term1 = dot(r, lsq[1])
-      term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-      """
+        f = self.mu + dot(r, self.Rinv_Ymu)
+        term1 = (r*Rinv_r).sum(axis=1)
+        term2 = (1.0 - Rinv_r.sum(axis=1))**2./self.Rinv_one.sum()
+        
         MSE = self.sig2*(1.0-term1+term2)
         RMSE = sqrt(abs(MSE))
         
-        return NormalDistribution(f, RMSE)
-        
+        return f, RMSE
 
     def train(self,X,Y):
         """Train the surrogate model with the given set of inputs and outputs."""
@@ -113,26 +108,52 @@ class KrigingSurrogate(object):
         self.Y = Y
         self.m = len(X[0])
         self.n = len(X)
+        
+        # squared distances between all pairs of training points in each
+        # dimension, shape (n, n, m). These don't depend on thetas.
+        XX = array(X, dtype=float)
+        self._sqdist = (XX[:, newaxis, :]-XX[newaxis, :, :])**2.
                 
         thetas = zeros(self.m)
-        def _calcll(thetas):
-            self.thetas = thetas
-            self._calculate_log_likelihood()
-            return -self.log_likelihood
-        #if self.thetas == None:
-        self.thetas = fmin(_calcll, thetas, disp=False, ftol = 0.0001)
+        if self.use_gradient:
+            def _calcll_grad(thetas):
+                self.thetas = thetas
+                self._calculate_log_likelihood(gradient=True)
+                return -self.log_likelihood, -self.log_likelihood_grad
+            # the likelihood is too flat to follow where R is nearly 
+            # singular, so start from thetas where det(R) isn't tiny
+            low, high = self.theta_bounds
+            thetas = thetas.clip(low, high)
+            while thetas[0] < high:
+                self.thetas = thetas
+                self._calculate_log_likelihood()
+                if self.R_fact is not None and \
+                   2.*nplog(diag(self.R_fact[0])).sum() > log(1.e-16):
+                    break
+                thetas = (thetas+0.5).clip(low, high)
+            bounds = [self.theta_bounds]*self.m
+            self.thetas = fmin_l_bfgs_b(_calcll_grad, thetas, 
+                                        bounds=bounds)[0]
+        else:
+            def _calcll(thetas):
+                self.thetas = thetas
+                self._calculate_log_likelihood()
+                return -self.log_likelihood
+            self.thetas = fmin(_calcll, thetas, disp=False, ftol = 0.0001)
         self._calculate_log_likelihood()
         
-    def _calculate_log_likelihood(self):
-        #if self.m == None:
-        #    Give error message
-        R = zeros((self.n, self.n))
-        X,Y = array(self.X), array(self.Y)
+    def _calculate_log_likelihood(self, gradient=False):
+        """Calculate the concentrated log likelihood for the current thetas.
+        If gradient is True, also calculate its gradient with respect to
+        log10(thetas).
+        """
+        if self._sqdist is None:
+            XX = array(self.X, dtype=float)
+            self._sqdist = (XX[:, newaxis, :]-XX[newaxis, :, :])**2.
+        Y = array(self.Y)
         thetas = 10.**self.thetas
-        for i in range(self.n):
-            for j in arange(i+1,self.n):
-                R[i,j] = (1-self.nugget)*e**(-sum(thetas*(X[i]-X[j])**2.)) #weighted distance formula
-        R = R + R.T + eye(self.n)
+        R = (1-self.nugget)*exp(-dot(self._sqdist, thetas)) #weighted distance formula
+        fill_diagonal(R, 1.)
         self.R = R
         one = ones(self.n)
         try:
@@ -142,9 +163,13 @@ class KrigingSurrogate(object):
             cho = cho_solve(R_fact, rhs).T
             
             self.mu = dot(one,cho[0])/dot(one,cho[1])
-            self.sig2 = dot(Y-dot(one,self.mu),cho_solve(self.R_fact,(Y-dot(one,self.mu))))/self.n
-            #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
-            self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))
+            self.Rinv_one = cho[1]
+            self.Rinv_Ymu = cho_solve(self.R_fact,(Y-dot(one,self.mu)))
+            self.sig2 = dot(Y-dot(one,self.mu),self.Rinv_Ymu)/self.n
+            # log(det(R)+1e-16), using the diagonal of the Cholesky factor
+            logdet = 2.*nplog(diag(self.R_fact[0])).sum()
+            logdet_reg = logaddexp(logdet, log(1.e-16))
+            dlogdet = exp(logdet-logdet_reg) # d(logdet_reg)/d(logdet)
         except (linalg.LinAlgError,ValueError):
             #------LSTSQ---------
             self.R_fact = None #reset this to none, so we know not to use cholesky
@@ -152,6 +177,24 @@ class KrigingSurrogate(object):
             rhs = vstack([Y, one]).T
             lsq = lstsq(self.R.T,rhs)[0].T
             self.mu = dot(one,lsq[0])/dot(one,lsq[1])
-            self.sig2 = dot(Y-dot(one,self.mu),lstsq(self.R,Y-dot(one,self.mu))[0])/self.n
-            self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))
-            #print self.log_likelihood
\ No newline at end of file
+            self.Rinv_one = lsq[1]
+            self.Rinv_Ymu = lstsq(self.R,Y-dot(one,self.mu))[0]
+            self.sig2 = dot(Y-dot(one,self.mu),self.Rinv_Ymu)/self.n
+            detR = det(self.R)
+            logdet_reg = log(abs(detR+1.e-16))
+            dlogdet = detR/(detR+1.e-16)
+            
+        #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*logdet_reg-sum(thetas)
+        self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*logdet_reg
+        
+        if gradient:
+            if self.R_fact is not None:
+                Rinv = cho_solve(self.R_fact, eye(self.n))
+            else:
+                Rinv = lstsq(self.R, eye(self.n))[0]
+            # dL/dR_ij, using the fact that mu minimizes sig2
+            a = self.Rinv_Ymu
+            dL_dR = outer(a, a)/(2.*self.sig2) - (dlogdet/2.)*Rinv
+            # dR_ij/dlog10(theta_k) = -ln(10)*theta_k*sqdist_ijk*R_ij
+            self.log_likelihood_grad = -log(10.)*thetas * \
+                    tensordot(dL_dR*R, self._sqdist, axes=([0,1],[0,1]))
@@ -0,0 +1,41 @@
+"""
+Time KrigingSurrogate training for various training set sizes.
+"""
+
+import time
+
+from numpy import sin
+import numpy.random as numpy_random
+
+from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate
+
+
+def run_test(npoints, ndims, use_gradient):
+    """ Train on `npoints` random points in `ndims` dimensions.
+    Returns (train_time, log_likelihood).
+    """
+    rand = numpy_random.RandomState(10)
+    X = rand.rand(npoints, ndims)
+    Y = sin(3.*X.sum(axis=1)) + X[:, 0]**2
+
+    krig = KrigingSurrogate()
+    krig.use_gradient = use_gradient
+    start = time.time()
+    krig.train(X, Y)
+    return (time.time() - start, krig.log_likelihood)
+
+
+def main():
+    """ Time KrigingSurrogate training for various training set sizes. """
+    ndims = 3
+    for npoints in (50, 100, 200, 500):
+        for use_gradient in (False, True):
+            et, llf = run_test(npoints, ndims, use_gradient)
+            print '%d points, %d dims, %s: %g sec, log likelihood %g' \
+                  % (npoints, ndims,
+                     'gradient' if use_gradient else 'simplex', et, llf)
+
+
+if __name__ == '__main__':
+    main()
+
@@ -72,6 +72,59 @@ class KrigingSurrogateTests(unittest.TestCase):
         self.assertAlmostEqual(14.513550,pred.sigma,places=2)
         self.assertAlmostEqual(18.759264,pred.mu,places=2)
         
+    def test_predict_batch(self):
+        def bran(x):
+            y = (x[1]-(5.1/(4.*pi**2.))*x[0]**2.+5.*x[0]/pi-6.)**2.+10.*(1.-1./(8.*pi))*cos(x[0])+10.
+            return y
+
+        x = array([[-2.,0.],[-0.5,1.5],[1.,3.],[8.5,4.5],[-3.5,6.],[4.,7.5],[-5.,9.],[5.5,10.5],
+                   [10.,12.],[7.,13.5],[2.5,15.]])
+        y = array([bran(case) for case in x])
+        krig1 = KrigingSurrogate(x,y)
+        
+        new_x = array([[-2.,0.],[5.,5.],[0.,10.]])
+        mu, sigma = krig1.predict_batch(new_x)
+        self.assertEqual(mu.shape, (3,))
+        self.assertEqual(sigma.shape, (3,))
+        self.assertAlmostEqual(14.513550,sigma[1],places=2)
+        self.assertAlmostEqual(18.759264,mu[1],places=2)
+        for i, point in enumerate(new_x):
+            pred = krig1.predict(point)
+            self.assertAlmostEqual(pred.mu,mu[i],places=10)
+            self.assertAlmostEqual(pred.sigma,sigma[i],places=10)
+            
+        # least squares solver
+        x = [[case] for case in linspace(0.,1.,40)]
+        y = sin(x).flatten()
+        krig1 = KrigingSurrogate(x,y)
+        mu, sigma = krig1.predict_batch([[0.5], [0.25]])
+        self.assertAlmostEqual(0.479425538688,mu[0],places=7)
+        self.assertAlmostEqual(0.247403959255,mu[1],places=7)
+        
+    def test_gradient_training(self):
+        x = array([[0.05], [.25], [0.61], [0.95]])
+        y = array([0.738513784857542,-0.210367746201974,-0.489015457891476,12.3033138316612])
+        krig1 = KrigingSurrogate()
+        krig1.use_gradient = True
+        krig1.train(x,y)
+        self.assertAlmostEqual(1.18375,krig1.thetas[0],places=3)
+        
+        # compare analytic likelihood gradient to finite difference
+        x = numpy_random.RandomState(1).rand(12,2)
+        y = sin(3.*x.sum(axis=1))
+        krig1 = KrigingSurrogate(x,y)
+        thetas = array([0.5, 0.8])
+        krig1.thetas = thetas
+        krig1._calculate_log_likelihood(gradient=True)
+        base = krig1.log_likelihood
+        grad = krig1.log_likelihood_grad
+        for i in range(2):
+            krig1.thetas = thetas.copy()
+            krig1.thetas[i] += 1.e-6
+            krig1._calculate_log_likelihood()
+            fd = (krig1.log_likelihood-base)/1.e-6
+            self.assertAlmostEqual(fd/grad[i], 1.0, places=4)
+        
     def test_get_uncertain_value(self): 
         x = array([[0.05], [.25], [0.61], [0.95]])
         y = array([0.738513784857542,-0.210367746201974,-0.489015457891476,12.3033138316612])
@@ -5,6 +5,7 @@
 __all__ = ['Assembly', 'set_as_top']
 
 import cStringIO
+import re
 import threading
 
 # pylint: disable-msg=E0611,F0401
@@ -14,11 +15,12 @@ from networkx.algorithms.dag import is_directed_acyclic_graph
 from networkx.algorithms.components import strongly_connected_components
 
 from openmdao.main.interfaces import implements, IAssembly, IDriver
-from openmdao.main.container import find_trait_and_value
+from openmdao.main.container import Container, find_trait_and_value, _copydict
 from openmdao.main.component import Component
 from openmdao.main.variable import Variable
 from openmdao.main.datatypes.slot import Slot
 from openmdao.main.driver import Driver
+from openmdao.main.datatypes.float import Float
 from openmdao.main.attrwrapper import AttrWrapper
 from openmdao.main.rbac import rbac
 from openmdao.main.mp_support import is_instance
@@ -26,9 +28,14 @@ from openmdao.main.expreval import ConnectedExprEvaluator
 from openmdao.main.printexpr import eliminate_expr_ws, ExprNameTransformer
 from openmdao.util.nameutil import partition_names_by_comp
 from openmdao.main.depgraph import DependencyGraph
+from openmdao.units import PhysicalQuantity
 
 _iodict = { 'out': 'output', 'in': 'input' }
 
+# source and destination expressions that can be handled by a _Transfer
+_simple_src = re.compile(r'^(?:([_a-zA-Z]\w*)\.)?([_a-zA-Z]\w*)((?:\[-?\d+\])*)$')
+_simple_dest = re.compile(r'^([_a-zA-Z]\w*)\.([_a-zA-Z]\w*)$')
+
 
 __has_top__ = False
 __toplock__ = threading.RLock()
@@ -93,6 +100,63 @@ class Run_Once(Driver):
         self.record_case()
         
         
+
+class _Transfer(object):
+    """Moves the value of a simple source variable (possibly with constant
+    integer indices) to a simple input variable of a child Component
+    using direct attribute access, bypassing the expression evaluation,
+    source checking and unit lookups done by a normal set().
+    """
+    def __init__(self, srcobj, srcname, srcpath, index, copier, conversion,
+                 destcomp, destname):
+        self.srcobj = srcobj
+        self.srcname = srcname
+        self.srcpath = srcpath  # source var name relative to the Assembly
+        self.index = index
+        self.copier = copier
+        self.conversion = conversion  # (factor, offset) or None
+        self.destcomp = destcomp
+        self.destname = destname
+
+    def is_valid(self):
+        """Return False if our source variable is invalid."""
+        return self.srcobj._valid_dict.get(self.srcname) is not False
+
+    def transfer(self):
+        """Set the destination to the current value of the source."""
+        val = getattr(self.srcobj, self.srcname)
+        if self.copier is not None:
+            val = self.copier(val)
+        for idx in self.index:
+            val = val[idx]
+        if self.conversion is not None:
+            factor, offset = self.conversion
+            val = (val + offset) * factor
+            
+        destcomp = self.destcomp
+        name = self.destname
+        # bypass input source checking, same as Container.set()
+        chk = destcomp._input_check
+        destcomp._input_check = destcomp._input_nocheck
+        try:
+            setattr(destcomp, name, val)
+        finally:
+            destcomp._input_check = chk
+        if destcomp._call_execute:
+            destcomp._input_updated(name)
+
+
+def _unit_conversion(src_units, dest_units):
+    """Return the (factor, offset) tuple used to convert a value from
+    src_units to dest_units, or None if no conversion is needed.
+    """
+    if not src_units or not dest_units or src_units == dest_units:
+        return None
+    src = PhysicalQuantity(0., src_units).unit
+    dest = PhysicalQuantity(0., dest_units).unit
+    return src.conversion_tuple_to(dest)
+
+        
 class ExprMapper(object):
     """A mapping between source expressions and destination expressions"""
     def __init__(self, scope):
@@ -313,11 +377,20 @@ class Assembly (Component):
         
         self._exprmapper = ExprMapper(self)
         
+        # dict of destination expression text -> (source text, _Transfer or None)
+        self._transfers = {}
+        
         # default Driver executes its workflow once
         self.add('driver', Run_Once())
         
         set_as_top(self, first_only=True) # we're the top Assembly only if we're the first instantiated
         
+    def __getstate__(self):
+        """Return dict representing this container's state."""
+        state = super(Assembly, self).__getstate__()
+        state['_transfers'] = {}
+        return state
+
     @rbac(('owner', 'user'))
     def set_itername(self, itername, seqno=0):
         """
@@ -531,6 +604,7 @@ class Assembly (Component):
         or removed, etc.
         """
         super(Assembly, self).config_changed(update_parent)
+        self._transfers = {}
         # driver must tell workflow that config has changed because
         # dependencies may have changed
         if self.driver is not None:
@@ -581,18 +655,30 @@ class Assembly (Component):
         component variables relative to the component, e.g., 'abc[3][1]' rather
         than 'comp1.abc[3][1]'.
         """
-        parent = self.parent
         expr_info = []
         invalids = []
+        transfers = self._transfers
         
         if compname is not None:
             exprs = ['.'.join([compname, n]) for n in exprs]
         for expr in exprs:
-            srctxt = self._exprmapper.get_source(expr)
-            if srctxt:
+            try:
+                srctxt, xfer = transfers[expr]
+            except KeyError:
+                srctxt = self._exprmapper.get_source(expr)
+                if not srctxt:
+                    continue
+                xfer = self._plan_transfer(srctxt, expr)
+                transfers[expr] = (srctxt, xfer)
+            if xfer is None:
                 srcexpr = self._exprmapper.get_expr(srctxt)
                 invalids.extend(srcexpr.invalid_refs())
-                expr_info.append((srcexpr, self._exprmapper.get_expr(expr)))
+                expr_info.append((srctxt, expr, srcexpr, 
+                                  self._exprmapper.get_expr(expr)))
+            else:
+                if not xfer.is_valid():
+                    invalids.append(xfer.srcpath)
+                expr_info.append((srctxt, expr, None, xfer))
             
         # if source exprs reference invalid vars, request an update
         if invalids:
@@ -604,12 +690,75 @@ class Assembly (Component):
                     getattr(self, cname).update_outputs(vnames)
                     #self.set_valid(vnames, True)
             
-        for srcexpr, destexpr in expr_info:
+        for srctxt, desttxt, srcexpr, dest in expr_info:
             try:
-                destexpr.set(srcexpr.evaluate(), src=srcexpr.text)
+                if srcexpr is None:
+                    dest.transfer()
+                else:
+                    dest.set(srcexpr.evaluate(), src=srctxt)
             except Exception as err:
                 self.raise_exception("cannot set '%s' from '%s': %s" % 
-                                     (destexpr.text, srcexpr.text, str(err)), type(err))
+                                     (desttxt, srctxt, str(err)), type(err))
+        
+    def _plan_transfer(self, srctxt, desttxt):
+        """Return a _Transfer that moves data from the source expression to
+        the destination expression, or None if the connection isn't simple
+        enough and must be handled via expression evaluation.
+        """
+        destmatch = _simple_dest.match(desttxt)
+        srcmatch = _simple_src.match(srctxt)
+        if destmatch is None or srcmatch is None:
+            return None
+        
+        destcompname, destname = destmatch.groups()
+        destcomp = getattr(self, destcompname, None)
+        # proxies and components that override set() use the general path
+        if not isinstance(destcomp, Component) or \
+           destcomp.set.im_func is not Container.set.im_func:
+            return None
+        desttrait = destcomp.get_trait(destname)
+        if desttrait is None or desttrait.iotype != 'in':
+            return None
+        
+        srccompname, srcname, idxtxt = srcmatch.groups()
+        if srccompname is None:
+            srcobj = self
+            srcpath = srcname
+        elif srccompname == 'parent':
+            return None
+        else:
+            srcobj = getattr(self, srccompname, None)
+            if not isinstance(srcobj, Component):
+                return None
+            srcpath = '.'.join([srccompname, srcname])
+        srctrait = srcobj.get_trait(srcname)
+        if srctrait is None or srctrait.iotype is None or \
+           srctrait.trait_type is None:
+            return None
+        
+        ttype = srctrait.trait_type
+        index = tuple([int(idx) for idx in re.findall(r'-?\d+', idxtxt)])
+        if index:
+            if isinstance(ttype, Float):
+                return None  # let the general path report the error
+            copier = None
+        else:
+            copier = _copydict.get(ttype.copy)
+        
+        # mimic the unit conversion done when the destination validates 
+        # the wrapped source value returned by get_wrapped_attr()
+        conversion = None
+        if ttype.get_val_wrapper is not None and ttype.units:
+            dtype = desttrait.trait_type
+            if not isinstance(dtype, Float):
+                return None
+            try:
+                conversion = _unit_conversion(ttype.units, dtype.units)
+            except Exception:
+                return None
+            
+        return _Transfer(srcobj, srcname, srcpath, index, copier, conversion,
+                         destcomp, destname)
         
     def update_outputs(self, outnames):
         """Execute any necessary internal or predecessor components in order
@@ -104,6 +104,52 @@ class DirectoryContext(object):
 _iodict = { 'out': 'output', 'in': 'input' }
 
 
+class _ValidDict(dict):
+    """Maps variable names to validity flags, keeping the set of invalid
+    names up to date as entries change so validity checks don't have to
+    scan every variable."""
+
+    def __init__(self, *args, **kwargs):
+        super(_ValidDict, self).__init__(*args, **kwargs)
+        self.invalid = set([k for k, v in self.items() if not v])
+
+    def __setitem__(self, name, valid):
+        dict.__setitem__(self, name, valid)
+        if valid:
+            self.invalid.discard(name)
+        else:
+            self.invalid.add(name)
+
+    def __delitem__(self, name):
+        dict.__delitem__(self, name)
+        self.invalid.discard(name)
+
+    def __reduce__(self):
+        return (_ValidDict, (dict(self),))
+
+    def update(self, *args, **kwargs):
+        for name, valid in dict(*args, **kwargs).items():
+            self[name] = valid
+
+    def pop(self, name, *args):
+        self.invalid.discard(name)
+        return dict.pop(self, name, *args)
+
+    def clear(self):
+        dict.clear(self)
+        self.invalid.clear()
+
+    def setdefault(self, name, valid=None):
+        if name not in self:
+            self[name] = valid
+        return dict.__getitem__(self, name)
+
+    def popitem(self):
+        name, valid = dict.popitem(self)
+        self.invalid.discard(name)
+        return (name, valid)
+
+
 
 class Component (Container):
     """This is the base class for all objects containing Traits that are \
@@ -126,6 +172,9 @@ class Component (Container):
     exec_count = Int(0, desc='Number of times this Component has been executed.')
     
     create_instance_dir = Bool(False)
+
+    thread_safe = Bool(True, desc='If False, a concurrent Dataflow will not'
+                                  ' run this component alongside any other.')
     
     def __init__(self, doc=None, directory=''):
         super(Component, self).__init__(doc)
@@ -139,7 +188,7 @@ class Component (Container):
 
         # contains validity flag for each io Trait (inputs are valid since they're not connected yet,
         # and outputs are invalid)
-        self._valid_dict = dict([(name,t.iotype=='in') for name,t in self.class_traits().items() if t.iotype])
+        self._valid_dict = _ValidDict([(name,t.iotype=='in') for name,t in self.class_traits().items() if t.iotype])
         
         # dependency graph between us and our boundaries (bookkeeps connections between our
         # variables and external ones).  This replaces self._depgraph from Container.
@@ -164,6 +213,11 @@ class Component (Container):
         self._expr_sources = None
         self._connected_inputs = None
         self._connected_outputs = None
+        # sets of the above for membership tests
+        self._input_set = None
+        self._output_set = None
+        self._connected_input_set = None
+        self._connected_output_set = None
         
         self.exec_count = 0
         self.derivative_exec_count = 0
@@ -236,11 +290,17 @@ class Component (Container):
         state['_expr_sources'] = None
         state['_connected_inputs'] = None
         state['_connected_outputs'] = None
+        state['_input_set'] = None
+        state['_output_set'] = None
+        state['_connected_input_set'] = None
+        state['_connected_output_set'] = None
         
         return state
 
     def __setstate__(self, state):
         super(Component, self).__setstate__(state)
+        if not isinstance(self._valid_dict, _ValidDict):
+            self._valid_dict = _ValidDict(self._valid_dict)
         
         # make sure all input callbacks are in place.  If callback is
         # already there, this will have no effect. 
@@ -348,8 +408,7 @@ class Component (Container):
                 valids[name] = True
         else:
             valids = self._valid_dict
-            invalid_ins = [inp for inp in self.list_inputs(connected=True) 
-                                    if valids.get(inp) is False]
+            invalid_ins = self.list_inputs(valid=False, connected=True)
             if invalid_ins:
                 self._call_execute = True
                 self.parent.update_inputs(self.name, invalid_ins)
@@ -596,7 +655,7 @@ class Component (Container):
         """Return False if any of our variables is invalid."""
         if self._call_execute:
             return False
-        if False in self._valid_dict.values():
+        if self._valid_dict.invalid:
             self._call_execute = True
             return False
         if self.parent is not None:
@@ -680,6 +739,8 @@ class Component (Container):
             self._connected_inputs = self._depgraph.get_connected_inputs()
             nset.update(self._connected_inputs)
             self._input_names = list(nset)
+            self._input_set = nset
+            self._connected_input_set = set(self._connected_inputs)
     
         if valid is None:
             if connected is None:
@@ -687,16 +748,18 @@ class Component (Container):
             elif connected is True:
                 return self._connected_inputs
             else: # connected is False
-                return [n for n in self._input_names if n not in self._connected_inputs]
+                return [n for n in self._input_names if n not in self._connected_input_set]
         
         valids = self._valid_dict
-        ret = self._input_names
-        ret = [n for n in ret if valids[n] == valid]
+        if valid:
+            ret = [n for n in self._input_names if valids[n]]
+        else:
+            ret = [n for n in valids.invalid if n in self._input_set]
             
         if connected is True:
-            return [n for n in ret if n in self._connected_inputs]
+            return [n for n in ret if n in self._connected_input_set]
         elif connected is False:
-            return [n for n in ret if n not in self._connected_inputs]
+            return [n for n in ret if n not in self._connected_input_set]
 
         return ret # connected is None, valid is not None
         
@@ -716,6 +779,8 @@ class Component (Container):
             self._connected_outputs = self._depgraph.get_connected_outputs()
             nset.update(self._connected_outputs)
             self._output_names = list(nset)
+            self._output_set = nset
+            self._connected_output_set = set(self._connected_outputs)
             
         if valid is None:
             if connected is None:
@@ -723,16 +788,18 @@ class Component (Container):
             elif connected is True:
                 return self._connected_outputs
             else: # connected is False
-                return [n for n in self._output_names if n not in self._connected_outputs]
+                return [n for n in self._output_names if n not in self._connected_output_set]
         
         valids = self._valid_dict
-        ret = self._output_names
-        ret = [n for n in ret if valids[n] == valid]
+        if valid:
+            ret = [n for n in self._output_names if valids[n]]
+        else:
+            ret = [n for n in valids.invalid if n in self._output_set]
             
         if connected is True:
-            return [n for n in ret if n in self._connected_outputs]
+            return [n for n in ret if n in self._connected_output_set]
         elif connected is False:
-            return [n for n in ret if n not in self._connected_outputs]
+            return [n for n in ret if n not in self._connected_output_set]
 
         return ret # connected is None, valid is not None
         
@@ -896,6 +896,21 @@ class Container(SafeHasTraits):
                 return self._get_failed(path, index)
             return get_indexed_value(obj, '', index)
      
+    @rbac(('owner', 'user'))
+    def get_many(self, paths):
+        """Return a list of the values of the objects specified by `paths`.
+        Each entry may be a pathname or an expression.  This is equivalent
+        to calling :meth:`get` for each entry, but when called through
+        a proxy all values are returned in a single message.
+        """
+        values = []
+        for path in paths:
+            if is_legal_name(path):
+                values.append(self.get(path))
+            else:
+                values.append(ExprEvaluator(path, scope=self).evaluate())
+        return values
+     
     def _set_failed(self, path, value, index=None, src=None, force=False):
         """If set() cannot locate the specified variable, raise an exception.
         Inherited classes can override this to locate the variable elsewhere
@@ -997,6 +1012,20 @@ class Container(SafeHasTraits):
                 setattr(self, path, value)
 
         
+    @rbac(('owner', 'user'))
+    def set_many(self, items):
+        """Set the values of the Variables specified in `items`, a list of
+        tuples of the form (path, value).  A path may also be an expression
+        that is valid on the left hand side of an assignment.  This is
+        equivalent to calling :meth:`set` for each entry, but when called
+        through a proxy all values are sent in a single message.
+        """
+        for path, value in items:
+            if is_legal_name(path):
+                self.set(path, value)
+            else:
+                ExprEvaluator(path, scope=self).set(value)
+
     def _index_set(self, name, value, index):
         obj = get_indexed_value(self, name, index[:-1])
         idx = index[-1]
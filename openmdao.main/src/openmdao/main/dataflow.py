@@ -1,23 +1,55 @@
+import heapq
+import Queue
+import sys
+import threading
 
 import networkx as nx
 from networkx.algorithms.components import strongly_connected_components
 
+from openmdao.main.exceptions import RunStopped
 from openmdao.main.seqentialflow import SequentialWorkflow
 from openmdao.main.interfaces import IDriver
 from openmdao.main.mp_support import has_interface
+from openmdao.main.rbac import get_credentials, set_credentials
 
 __all__ = ['Dataflow']
 
 class Dataflow(SequentialWorkflow):
     """
-    A Dataflow consists of a collection of Components which are executed in 
+    A Dataflow consists of a collection of Components which are executed in
     data flow order.
+
+    The collapsed dependency graph and the ordering derived from it are
+    kept up to date incrementally as components and connections are added
+    and removed, unless a Driver is part of the workflow, in which case
+    they are rebuilt after each configuration change.
+
+    If `max_concurrency` is greater than 1, components whose predecessors
+    have all completed are run concurrently in up to `max_concurrency`
+    threads, which helps when components spend most of their time waiting
+    on external codes. Components with `thread_safe` set to False, or with
+    a `directory` to execute in, are always run by themselves.
     """
+
+    max_concurrency = 1  # maximum number of components to run at once
+
     def __init__(self, parent=None, scope=None, members=None):
         """ Create an empty flow. """
+        self._reset()
         super(Dataflow, self).__init__(parent, scope, members)
         self.config_changed()
 
+    def _reset(self):
+        """Discard our collapsed graph and ordering."""
+        self._collapsed_graph = None
+        self._topsort = None
+        self._position = {}  # relative position of each node in _topsort
+        self._stale = False  # True if graph needs to be brought up to date
+        self._depgraph = None  # DependencyGraph we're keeping up with
+        self._change_count = 0  # changes to _depgraph already applied
+        self._expr_edges = {}  # edges from ExprEvaluators, keyed by comp name
+        self._expr_refs = {}  # number of components needing each expr edge
+
     def __iter__(self):
         """Iterate through the nodes in dataflow order."""
         # resolve all of the components up front so if there's a problem it'll fail early
@@ -25,74 +57,266 @@ class Dataflow(SequentialWorkflow):
         scope = self.scope
         return [getattr(scope, n) for n in self._get_topsort()].__iter__()
 
+    def run(self, ffd_order=0, case_id=''):
+        """ Run the Components in this Workflow. """
+        if self.max_concurrency > 1:
+            self._run_concurrent(ffd_order, case_id)
+        else:
+            super(Dataflow, self).run(ffd_order, case_id)
+
+    def _run_concurrent(self, ffd_order, case_id):
+        """Run components as soon as all of their predecessors in the
+        collapsed graph have completed, up to `max_concurrency` at a time.
+        Iteration coordinates are assigned by position in the dataflow
+        ordering, so they're the same as for a sequential run.
+        """
+        self._stop = False
+        self._exec_count += 1
+        self._comp_count = 0
+        order = self._get_topsort()
+        succ = self._collapsed_graph.succ
+        indegree = dict([(n, len(preds))
+                         for n, preds in self._collapsed_graph.pred.items()])
+        iterbase = self._iterbase(case_id)
+        scope = self.scope
+        comps = {}
+        itername = {}
+        position = {}
+        ready = []
+        for i, name in enumerate(order):
+            comps[name] = getattr(scope, name)
+            itername[name] = '%s-%d' % (iterbase, i+1)
+            position[name] = i
+            if indegree[name] == 0:
+                ready.append((i, name))
+        heapq.heapify(ready)
+
+        todo = Queue.Queue()
+        done = Queue.Queue()
+        # Credentials are per-thread, workers need to run as our caller.
+        credentials = get_credentials()
+        workers = []
+        for i in range(min(self.max_concurrency, len(order))):
+            worker = threading.Thread(target=self._worker,
+                                      args=(todo, done, ffd_order, case_id,
+                                            credentials))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+
+        running = set()
+        error = None
+        try:
+            while True:
+                while ready and error is None and not self._stop:
+                    name = ready[0][1]
+                    comp = comps[name]
+                    if self._is_exclusive(comp):
+                        if running:
+                            break  # wait for everything else to finish
+                        heapq.heappop(ready)
+                        self._comp_count += 1
+                        comp.set_itername(itername[name])
+                        try:
+                            comp.run(ffd_order=ffd_order, case_id=case_id)
+                        except Exception:
+                            error = sys.exc_info()
+                        else:
+                            self._release(name, succ, indegree, position,
+                                          ready)
+                    elif len(running) < self.max_concurrency:
+                        heapq.heappop(ready)
+                        self._comp_count += 1
+                        comp.set_itername(itername[name])
+                        running.add(name)
+                        todo.put(comp)
+                    else:
+                        break
+                if not running:
+                    break
+                name, exc_info = done.get()
+                running.remove(name)
+                if exc_info is None:
+                    self._release(name, succ, indegree, position, ready)
+                elif error is None:
+                    error = exc_info
+                    # don't wait for the others to finish on their own
+                    for cname in running:
+                        comps[cname].stop()
+        finally:
+            for worker in workers:
+                todo.put(None)
+
+        if error is not None:
+            raise error[0], error[1], error[2]
+        if self._stop:
+            raise RunStopped('Stop requested')
+
+    @staticmethod
+    def _worker(todo, done, ffd_order, case_id, credentials):
+        """Run components from `todo` as `credentials` until None is
+        received, reporting (name, exc_info) for each one in `done`.
+        """
+        set_credentials(credentials)
+        while True:
+            comp = todo.get()
+            if comp is None:
+                return
+            try:
+                comp.run(ffd_order=ffd_order, case_id=case_id)
+            except:
+                done.put((comp.name, sys.exc_info()))
+            else:
+                done.put((comp.name, None))
+
+    @staticmethod
+    def _release(name, succ, indegree, position, ready):
+        """Mark `name` complete and add any successors that are now
+        ready to run to the `ready` heap.
+        """
+        for node in succ[name]:
+            indegree[node] -= 1
+            if indegree[node] == 0:
+                heapq.heappush(ready, (position[node], node))
+
+    @staticmethod
+    def _is_exclusive(comp):
+        """Return True if `comp` must not run alongside other components.
+        Running in a `directory` changes the working directory of the
+        whole process.
+        """
+        return not getattr(comp, 'thread_safe', True) or \
+               bool(getattr(comp, 'directory', ''))
+
     def add(self, compnames):
         """ Add new component(s) to the workflow by name. """
+        start = len(self._names)
         super(Dataflow, self).add(compnames)
-        self.config_changed()
+        if self._depgraph is None:
+            self._reset()
+            return
+        try:
+            for name in self._names[start:]:
+                self._add_node(name)
+        except Exception:
+            # can't resolve the new member yet, so start over later
+            self._reset()
 
     def remove(self, compname):
         """Remove a component from this Workflow by name."""
         super(Dataflow, self).remove(compname)
-        self.config_changed()
+        if self._depgraph is None:
+            self._reset()
+        elif compname not in self._names:
+            self._remove_node(compname)
+
+    def clear(self):
+        """Remove all components from this workflow."""
+        super(Dataflow, self).clear()
+        self._reset()
 
     def config_changed(self):
         """Notifies the Workflow that its configuration (dependencies, etc.)
         has changed.
         """
-        self._collapsed_graph = None
-        self._topsort = None
+        if self._depgraph is None:
+            self._reset()
+        else:
+            # we'll catch up with the changes the next time our ordering
+            # is needed
+            self._stale = True
 
     def _get_topsort(self):
+        graph = self._get_collapsed_graph()
         if self._topsort is None:
-            graph = self._get_collapsed_graph()
-            try:
-                self._topsort = nx.topological_sort(graph)
-            except nx.NetworkXUnfeasible:
-                # do a little extra work here to give more info to the user in the error message
-                strcon = strongly_connected_components(graph)
-                self.scope.raise_exception('circular dependency found between the following: %s' % str(strcon[0]),
-                                           RuntimeError)
+            self._topsort = self._sort(graph)
+            self._position = dict([(n,i) for i,n in enumerate(self._topsort)])
         return self._topsort
-            
+
+    def _sort(self, graph):
+        """Return a topological ordering of the given graph. Whenever there's
+        a choice, components are taken in the order they were added to the
+        workflow in order to mimic a SequentialWorkflow in cases where
+        nodes aren't connected.
+        """
+        index = {}
+        for i, name in enumerate(self._names):
+            index.setdefault(name, i)
+        indegree = dict([(n, len(preds)) for n, preds in graph.pred.items()])
+        ready = [(index[n], n) for n, deg in indegree.items() if deg == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            node = heapq.heappop(ready)[1]
+            order.append(node)
+            for succ in graph.succ[node]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    heapq.heappush(ready, (index[succ], succ))
+        if len(order) < len(indegree):
+            # do a little extra work here to give more info to the user in the error message
+            strcon = strongly_connected_components(graph)
+            self.scope.raise_exception('circular dependency found between the following: %s' % str(strcon[0]),
+                                       RuntimeError)
+        return order
+
     def _get_collapsed_graph(self):
         """Get a dependency graph with only our workflow components
         in it, with additional edges added to it from sub-workflows
         of any Driver components in our workflow, and from any ExprEvaluators
         in any components in our workflow.
         """
-        if self._collapsed_graph:
-            return self._collapsed_graph
-        
-        to_add = []
+        if self._collapsed_graph is None:
+            self._build_collapsed_graph()
+        elif self._stale:
+            self._update_collapsed_graph()
+        return self._collapsed_graph
+
+    def _build_collapsed_graph(self):
+        """Build our collapsed graph from scratch."""
+        self._reset()
         scope = self.scope
-        graph = scope._depgraph.copy_graph()
-        
+        cnames = set(self._names)
         contents = self.get_components()
-        
-        # add any dependencies due to ExprEvaluators
-        for comp in contents:
-            graph.add_edges_from([tup for tup in comp.get_expr_depends()])
-            
-        collapsed_graph = nx.DiGraph(graph)  # this way avoids a deep copy of edge/node data
+        depgraph = scope._depgraph
+
+        drivers = [comp for comp in contents if has_interface(comp, IDriver)]
+        if not drivers:
+            graph = depgraph.component_graph(cnames)
+            for comp in contents:
+                self._update_expr_edges(graph, comp)
+            self._collapsed_graph = graph
+            self._depgraph = depgraph
+            self._change_count = depgraph.change_count
+            return
 
         # find all of the incoming and outgoing edges to/from all of the components
         # in each driver's iteration set so we can add edges to/from the driver
         # in our collapsed graph
-        cnames = set(self._names)
         removes = set()
         itersets = {}
+        for comp in drivers:
+            iterset = [c.name for c in comp.iteration_set()]
+            itersets[comp.name] = iterset
+            removes.update(iterset)
+
+        # only components in our workflow or in the iteration set of one
+        # of our drivers can affect our ordering
+        graph = depgraph.component_graph(cnames.union(removes))
+
+        # add any dependencies due to ExprEvaluators
         for comp in contents:
-            cname = comp.name
-            if has_interface(comp, IDriver):
-                iterset = [c.name for c in comp.iteration_set()]
-                itersets[cname] = iterset
-                removes.update(iterset)
-                for u,v in graph.edges_iter(nbunch=iterset): # outgoing edges
-                    if v != cname and v not in iterset:
-                        collapsed_graph.add_edge(cname, v)
-                for u,v in graph.in_edges_iter(nbunch=iterset): # incoming edges
-                    if u != cname and u not in iterset:
-                        collapsed_graph.add_edge(u, cname)
+            graph.add_edges_from([tup for tup in comp.get_expr_depends()])
+
+        collapsed_graph = nx.DiGraph(graph)  # this way avoids a deep copy of edge/node data
+
+        for cname, iterset in itersets.items():
+            for u,v in graph.edges_iter(nbunch=iterset): # outgoing edges
+                if v != cname and v not in iterset:
+                    collapsed_graph.add_edge(cname, v)
+            for u,v in graph.in_edges_iter(nbunch=iterset): # incoming edges
+                if u != cname and u not in iterset:
+                    collapsed_graph.add_edge(u, cname)
         # connect all of the edges from each driver's iterset members to itself
         to_add = []
         for drv,iterset in itersets.items():
@@ -104,23 +328,141 @@ class Dataflow(SequentialWorkflow):
                     if u != drv:
                         to_add.append((u, drv))
         collapsed_graph.add_edges_from(to_add)
-        
-        # now add some fake dependencies for degree 0 nodes in an attempt to
-        # mimic a SequentialWorkflow in cases where nodes aren't connected.
-        # Edges are added from each degree 0 node to all nodes after it in
-        # sequence order.
-        last = len(self._names)-1
-        if last > 0:
-            to_add = []
-            for i,cname in enumerate(self._names):
-                if collapsed_graph.degree(cname) == 0:
-                    if i < last:
-                        for n in self._names[i+1:]:
-                            to_add.append((cname, n))
-                    else:
-                        for n in self._names[0:i]:
-                            to_add.append((n, cname))
-            collapsed_graph.add_edges_from(to_add)
-        
+
+        # _depgraph is left as None so we'll be rebuilt after any change
         self._collapsed_graph = collapsed_graph.subgraph(cnames-removes)
-        return self._collapsed_graph
+
+    def _update_collapsed_graph(self):
+        """Bring our collapsed graph up to date with any changes made to our
+        scope's DependencyGraph since we last looked at it, keeping the
+        current ordering if it's still valid.
+        """
+        depgraph = self.scope._depgraph
+        changes = None
+        if depgraph is self._depgraph:
+            changes = depgraph.get_changes(self._change_count)
+        if changes is None:
+            self._build_collapsed_graph()
+            return
+
+        self._stale = False
+        self._change_count = depgraph.change_count
+        graph = self._collapsed_graph
+        nodes = graph.succ
+        added = []
+        for u, v, is_add in changes:
+            if u in nodes and v in nodes:
+                if is_add:
+                    graph.add_edge(u, v)
+                    added.append((u, v))
+                elif v in nodes[u] and (u, v) not in self._expr_refs and \
+                     depgraph.get_link(u, v) is None:
+                    # no longer needed by a connection or an ExprEvaluator
+                    graph.remove_edge(u, v)
+                    self._topsort = None
+
+        # ExprEvaluator dependencies aren't tracked by the DependencyGraph
+        for cname in self._expr_edges.keys():
+            added.extend(self._update_expr_edges(graph, getattr(self.scope,
+                                                                cname)))
+        self._check_order(added)
+
+    def _update_expr_edges(self, graph, comp):
+        """Update the edges in graph resulting from ExprEvaluators in the
+        given component and return a list of any new ones.
+        """
+        if not hasattr(comp, '_delegates_'):
+            return []
+        nodes = graph.succ
+        refs = self._expr_refs
+        old = self._expr_edges.get(comp.name, set())
+        new = set([(u,v) for u,v in comp.get_expr_depends()
+                                 if u in nodes and v in nodes])
+        self._expr_edges[comp.name] = new
+        for edge in old-new:
+            self._release_expr_edge(graph, edge)
+        added = list(new-old)
+        for edge in added:
+            refs[edge] = refs.get(edge, 0) + 1
+        graph.add_edges_from(added)
+        return added
+
+    def _release_expr_edge(self, graph, edge):
+        """Drop one component's need for an ExprEvaluator edge, removing
+        it from graph if nothing else, including a connection, needs it.
+        """
+        refs = self._expr_refs
+        refs[edge] -= 1
+        if refs[edge] == 0:
+            del refs[edge]
+            u, v = edge
+            nodes = graph.succ
+            if u in nodes and v in nodes[u] and self._depgraph is not None \
+               and self._depgraph.get_link(u, v) is None:
+                graph.remove_edge(u, v)
+                self._topsort = None
+
+    def _check_order(self, edges):
+        """Discard our current ordering if it isn't consistent with
+        all of the given edges that are still in our collapsed graph.
+        """
+        if self._topsort is not None:
+            position = self._position
+            succ = self._collapsed_graph.succ
+            for u,v in edges:
+                if position[u] >= position[v] and v in succ[u]:
+                    self._topsort = None
+                    return
+
+    def _add_node(self, name):
+        """Add a new workflow member to our collapsed graph and ordering."""
+        graph = self._collapsed_graph
+        if name in graph:  # already a member
+            return
+        comp = getattr(self.scope, name)
+        if has_interface(comp, IDriver):
+            self._reset()
+            return
+
+        nodes = graph.succ
+        graph.add_node(name)
+        # Edges found here may also show up later in the DependencyGraph's
+        # change log, which is harmless.
+        graph.add_edges_from(self._depgraph.component_edges(name, nodes))
+        added = self._update_expr_edges(graph, comp)
+        for cname in self._expr_edges.keys():
+            if cname != name:
+                added.extend(self._update_expr_edges(graph,
+                                                  getattr(self.scope, cname)))
+
+        if self._topsort is not None:
+            if graph.succ[name]:
+                # something downstream is already in the ordering
+                self._topsort = None
+            else:
+                if self._topsort:
+                    self._position[name] = self._position[self._topsort[-1]]+1
+                else:
+                    self._position[name] = 0
+                self._topsort.append(name)
+                self._check_order(added)
+
+    def _remove_node(self, name):
+        """Remove a former workflow member from our collapsed graph.
+        The ordering is discarded since, with fewer constraints, a fresh
+        sort may break ties differently.
+        """
+        graph = self._collapsed_graph
+        if name in graph:
+            graph.remove_node(name)
+            refs = self._expr_refs
+            for edge in self._expr_edges.pop(name, ()):
+                if edge in refs:
+                    self._release_expr_edge(graph, edge)
+            for cname, edges in self._expr_edges.items():
+                self._expr_edges[cname] = set([(u,v) for u,v in edges
+                                               if u != name and v != name])
+            for edge in refs.keys():
+                if name in edge:
+                    del refs[edge]
+            self._topsort = None
@@ -4,7 +4,7 @@ import sys
 import StringIO
 
 import networkx as nx
-from networkx.algorithms.dag import topological_sort_recursive,is_directed_acyclic_graph
+from networkx.algorithms.dag import topological_sort_recursive
 from networkx.algorithms.components import strongly_connected_components
 
 from openmdao.main.expreval import ExprEvaluator
@@ -56,9 +56,28 @@ def _cvt_names_to_graph(srcpath, destpath):
         
     return (srccompname, srcvarname, destcompname, destvarname)
 
+def _is_reachable(graph, start, end):
+    """Return True if there is a path from start to end in graph."""
+    if start == end:
+        return True
+    succ = graph.succ
+    visited = set([start])
+    stack = [start]
+    while stack:
+        for node in succ[stack.pop()]:
+            if node == end:
+                return True
+            if node not in visited:
+                visited.add(node)
+                stack.append(node)
+    return False
+
 #fake nodes for boundary and passthrough connections
 _fakes = ['@xin', '@xout', '@bin', '@bout']
 
+# maximum number of entries kept in a DependencyGraph's change log
+_MAX_CHANGES = 10000
+
 _exprset = set('+-/*[]()&| %<>!') # to use as a quick check for exprs to avoid overhead of constructing an ExprEvaluator
 
 class DependencyGraph(object):
@@ -81,6 +100,10 @@ class DependencyGraph(object):
         self._graph = nx.DiGraph()
         self._graph.add_nodes_from(_fakes)
         self._allsrcs = {}
+        # log of (srcnode, destnode, added) entries used by workflows to
+        # keep up with changes to the graph
+        self._changes = []
+        self._changes_base = 0
         
     def __contains__(self, compname):
         """Return True if this graph contains the given component."""
@@ -101,6 +124,56 @@ class DependencyGraph(object):
         graph.remove_nodes_from(_fakes)
         return graph
     
+    def component_graph(self, names):
+        """Return a new graph containing only the named Components and
+        the connections between them.
+        
+        names: set of str
+            Names of the Components to include.
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from(names)
+        succ = self._graph.succ
+        for name in names:
+            if name in succ:
+                graph.add_edges_from([(name, v) for v in succ[name]
+                                                if v in names])
+        return graph
+    
+    def component_edges(self, name, names):
+        """Return a list of the connections between the named Component and
+        any of the Components in `names`.
+        """
+        if name not in self._graph:
+            return []
+        edges = [(u, name) for u in self._graph.pred[name] if u in names]
+        edges.extend([(name, v) for v in self._graph.succ[name] if v in names])
+        return edges
+    
+    def _log_change(self, u, v, added):
+        """Record the addition or removal of an edge."""
+        changes = self._changes
+        changes.append((u, v, added))
+        if len(changes) > _MAX_CHANGES:
+            half = len(changes) // 2
+            del changes[:half]
+            self._changes_base += half
+    
+    @property
+    def change_count(self):
+        """The total number of edge changes made to this graph."""
+        return self._changes_base + len(self._changes)
+    
+    def get_changes(self, since):
+        """Return a list of (srcnode, destnode, added) tuples for each edge
+        that has been added or removed after `since` changes were made.
+        If those changes are no longer available, None is returned.
+        """
+        start = since - self._changes_base
+        if start < 0:
+            return None
+        return self._changes[start:]
+    
     def get_source(self, destpath):
         return self._allsrcs.get(destpath)
 
@@ -112,6 +185,8 @@ class DependencyGraph(object):
         """Remove the name of a Component from the graph. It is not
         an error if the component is not found in the graph.
         """
+        for u, v in self._graph.in_edges(name) + self._graph.edges(name):
+            self._log_change(u, v, False)
         self._graph.remove_node(name)
                                     
     def invalidate_deps(self, scope, cnames, varsets, force=False):
@@ -283,9 +358,16 @@ class DependencyGraph(object):
             except KeyError:
                 link=_Link(srccompname, destcompname)
                 graph.add_edge(srccompname, destcompname, link=link)
+                new_edge = True
+            else:
+                new_edge = False
             
-            if is_directed_acyclic_graph(graph):
+            # the new edge creates a cycle only if srccompname was
+            # already reachable from destcompname
+            if not _is_reachable(graph, destcompname, srccompname):
                 link.connect(srcvarname, destvarname)
+                if new_edge:
+                    self._log_change(srccompname, destcompname, True)
             else:   # cycle found
                 # do a little extra work here to give more info to the user in the error message
                 strongly_connected = strongly_connected_components(graph)
@@ -402,6 +484,7 @@ class DependencyGraph(object):
                 link.disconnect(srcvarname, destvarname)
                 if len(link) == 0:
                     self._graph.remove_edge(srccompname, destcompname)
+                    self._log_change(srccompname, destcompname, False)
         
         try:
             del self._allsrcs[destpath]
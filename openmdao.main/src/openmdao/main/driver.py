@@ -4,6 +4,7 @@
 __all__ = ["Driver"]
 
 import fnmatch
+import sys
 
 from networkx.algorithms.shortest_paths.generic import shortest_path
 from enthought.traits.api import List
@@ -183,7 +184,25 @@ class Driver(Component):
         """
         # Override just to reset the workflow :-(
         self.workflow.reset()
-        super(Driver, self).run(force, ffd_order, case_id)
+        try:
+            super(Driver, self).run(force, ffd_order, case_id)
+        except:
+            # Don't let a recorder problem hide the original exception.
+            exc_info = sys.exc_info()
+            try:
+                self._flush_recorders()
+            except Exception as exc:
+                self._logger.error('error flushing recorders: %s', exc)
+            raise exc_info[0], exc_info[1], exc_info[2]
+        else:
+            self._flush_recorders()
+
+    def _flush_recorders(self):
+        """Write out anything our recorders are holding onto."""
+        for recorder in self.recorders:
+            flush = getattr(recorder, 'flush', None)
+            if flush is not None:
+                flush()
 
     def execute(self):
         """ Iterate over a workflow of Components until some condition
@@ -8,8 +8,14 @@ import math
 import ast
 import copy
 import re
+import threading
 import __builtin__
 
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
 from openmdao.main.printexpr import _get_attr_node, _get_long_name, transform_expression, ExprPrinter
 from openmdao.util.nameutil import partition_names_by_comp
 from openmdao.main.index import INDEX, ATTR, CALL, SLICE
@@ -51,6 +57,87 @@ else:
 
 _Missing = object()
 
+def _find_local(name):
+    """Return True if the given (dotted) name refers to a builtin or to
+    something in our _expr_dict dict. Raises a KeyError if the name refers to
+    something in _expr_dict that doesn't exist, e.g., math.foobar.
+    """
+    if hasattr(__builtin__, name) or name=='_local_setter_':
+        return True
+    parts = name.split('.')
+    obj = _expr_dict.get(parts[0], _Missing)
+    if obj is _Missing:
+        return False
+    for part in parts[1:]:
+        obj = getattr(obj, part, _Missing)
+        if obj is _Missing:
+            raise KeyError("Can't find '%s' in current scope" % name)
+    return True
+
+
+class ExprCache(object):
+    """A bounded, least recently used cache of the results of parsing
+    expressions (compiled code, referenced names, etc.), shared by all
+    ExprEvaluators in the process so that creating a new ExprEvaluator
+    for a previously seen expression doesn't require parsing it again.
+
+    Entries are keyed on (kind, text, getter). The result of parsing can
+    also depend on the scope, because an attribute of the scope hides a
+    builtin or math function with the same name, so each entry holds one
+    result for each such 'shape' of scope that it has been parsed with.
+    """
+
+    def __init__(self, maxsize=2000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, scope=None):
+        """Return the cached value for `key` that is valid for `scope`,
+        or None if there isn't one.
+        """
+        with self._lock:
+            variants = self._entries.pop(key, None)
+            if variants is not None:
+                self._entries[key] = variants  # now most recently used
+        if variants is not None:
+            for shape, value in variants:
+                for name, in_scope in shape:
+                    if hasattr(scope, name) != in_scope:
+                        break
+                else:
+                    self.hits += 1
+                    return value
+        self.misses += 1
+        return None
+
+    def put(self, key, shape, value):
+        """Cache `value` for `key`. `shape` is a tuple of (name, in_scope)
+        tuples indicating, for each builtin or local name in the expression,
+        whether the scope had an attribute with that name.
+        """
+        with self._lock:
+            variants = self._entries.pop(key, [])
+            variants.append((shape, value))
+            self._entries[key] = variants
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset the hit and miss counts."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+# the cache used by all ExprEvaluators
+expr_cache = ExprCache()
+
+
 class ExprTransformer(ast.NodeTransformer):
     """Transforms dotted name references, e.g., abc.d.g in an expression AST
     into scope.get('abc.d.g') and turns assignments into the appropriate
@@ -362,6 +449,44 @@ class ExprExaminer(ast.NodeVisitor):
         super(ExprExaminer, self).generic_visit(node)
     
 
+class _ArgTransformer(ast.NodeTransformer):
+    """Replaces references to the given variables with items of the sequence
+    ``_grad_args_``, so that an expression can be compiled once and then
+    evaluated with any values of those variables.
+    """
+    def __init__(self, names):
+        super(_ArgTransformer, self).__init__()
+        self._indices = dict([(name, i) for i, name in enumerate(names)])
+
+    def _arg_node(self, node, name):
+        idx = self._indices.get(name)
+        if idx is None:
+            return self.generic_visit(node)
+        return ast.Subscript(value=ast.Name(id='_grad_args_', ctx=ast.Load()),
+                             slice=ast.Index(value=ast.Num(n=idx)),
+                             ctx=ast.Load())
+
+    def visit_Name(self, node):
+        return self._arg_node(node, node.id)
+
+    def visit_Attribute(self, node):
+        return self._arg_node(node, _get_long_name(node))
+
+    def visit_Subscript(self, node):
+        p = ExprPrinter()
+        p.visit(node)
+        return self._arg_node(node, p.get_text())
+
+
+def _compile_args_expr(text, names):
+    """Return a code object for expression `text` with references to `names`
+    replaced by ``_grad_args_`` items.
+    """
+    root = _ArgTransformer(names).visit(ast.parse(text, mode='eval'))
+    ast.fix_missing_locations(root)
+    return compile(root, '<string>', 'eval')
+
+
 class ExprEvaluator(object):
     """A class that translates an expression string into a new string
     containing any necessary framework access functions, e.g., set, get. The
@@ -372,8 +497,12 @@ class ExprEvaluator(object):
     function invocation are also translated in a similar way.  For a description
     of the format of the 'index' arg of set/get that is generated by ExprEvaluator,
     see the doc string for the ``openmdao.main.index.process_index_entry`` function.
+    Parsing results are shared between instances via `expr_cache`.
     """
     
+    _shape = None  # list of names checked by is_local while parsing
+    _grad_info = None  # compiled gradient data, see _get_grad_info
+    
     def __init__(self, text, scope=None, getter='get'):
         self._scope = None
         self.scope = scope
@@ -389,7 +518,7 @@ class ExprEvaluator(object):
     @text.setter
     def text(self, value):
         self._code = self._assignment_code = None
-        self._examiner = self.cached_grad_eq = None
+        self._examiner = self._grad_info = None
         self._text = value
 
     @property
@@ -406,7 +535,7 @@ class ExprEvaluator(object):
     def scope(self, value):
         if value is not self.scope:
             self._code = self._assignment_code = None
-            self._examiner = self.cached_grad_eq = None
+            self._examiner = self._grad_info = None
             if value is not None:
                 self._scope = weakref.ref(value)
             else:
@@ -419,7 +548,7 @@ class ExprEvaluator(object):
         exist.
         """
         if self._code is None:
-            self._pre_parse()
+            self._allow_set = self._cached('assignable', self._check_assignee)
         return self._allow_set
     
     def refers_to(self, name):
@@ -439,6 +568,7 @@ class ExprEvaluator(object):
         # remove weakref to scope because it won't pickle
         state['_scope'] = self.scope
         state['_code'] = None  # <type 'code'> won't pickle either.
+        state['_grad_info'] = None  # Also holds code.
         if state.get('_assignment_code'):
             state['_assignment_code'] = None # more unpicklable <type 'code'>
         return state
@@ -455,21 +585,40 @@ class ExprEvaluator(object):
         refers to something in _expr_dict that doesn't exist, e.g., math.foobar.
         Returns False if the name refers to nothing in _expr_dict, e.g., mycomp.x.
         """
-        global _expr_dict
         if hasattr(self.scope, name):
+            if self._shape is not None:
+                try:
+                    if _find_local(name):
+                        self._shape.append((name, True))
+                except KeyError:
+                    self._shape.append((name, True))
             return False
-        if hasattr(__builtin__, name) or name=='_local_setter_':
-            return True
-        parts = name.split('.')
-        obj = _expr_dict.get(parts[0], _Missing)
-        if obj is _Missing:
-            return False
-        for part in parts[1:]:
-            obj = getattr(obj, part, _Missing)
-            if obj is _Missing:
-                raise KeyError("Can't find '%s' in current scope" % name)
-        return True
+        local = _find_local(name)
+        if local and self._shape is not None:
+            self._shape.append((name, False))
+        return local
         
+    def _cached(self, kind, build):
+        """Return the result of `build` for our text, getter and scope from
+        `expr_cache`, calling `build` and caching its result if it isn't
+        there.
+        """
+        key = (kind, self.text, self.getter)
+        scope = self.scope
+        value = expr_cache.get(key, scope)
+        if value is None:
+            self._shape = []
+            try:
+                value = build()
+            finally:
+                shape, self._shape = self._shape, None
+            expr_cache.put(key, tuple(shape), value)
+        return value
+    
+    def _check_assignee(self):
+        self._pre_parse()
+        return self._allow_set
+
     def _pre_parse(self):
         try:
             root = ast.parse(self.text, mode='eval')
@@ -499,14 +648,33 @@ class ExprEvaluator(object):
         code = compile(assign_ast,'<string>','exec')
         return (assign_ast, code)
     
-    def _parse(self):
+    def _build_set(self):
+        return self._parse_set()[1]
+
+    def _build(self):
         self.var_names = set()
+        self._code = self._parse_get()[1]
+        return (self._code, frozenset(self.var_names), self._allow_set)
+        
+    def _parse(self):
         try:
-            new_ast, self._code = self._parse_get()
+            code, var_names, allow_set = self._cached('get', self._build)
         except SyntaxError as err:
             raise SyntaxError("failed to parse expression '%s': %s" % (self.text, str(err)))
+        self._code = code
+        self.var_names = set(var_names)
+        self._allow_set = allow_set
+    
+    def _build_examiner(self):
+        examiner = ExprExaminer(ast.parse(self.text, mode='eval'), self)
+        examiner._evaluator = None  # don't keep us alive in the cache
+        return examiner
         
-        return new_ast
+    def _get_examiner(self):
+        """Return our own copy of the (cached) ExprExaminer for our text."""
+        examiner = copy.copy(self._cached('examiner', self._build_examiner))
+        examiner.refs = examiner.refs.copy()
+        return examiner
     
     def _get_updated_scope(self, scope):
         if scope is not None:
@@ -534,8 +702,7 @@ class ExprEvaluator(object):
         if self._code is None:
             self._parse()
         if self._examiner is None:
-            self._examiner = ExprExaminer(ast.parse(self.text, 
-                                                    mode='eval'), self)
+            self._examiner = self._get_examiner()
         if copy:
             return self._examiner.refs.copy()
         else:
@@ -543,8 +710,9 @@ class ExprEvaluator(object):
     
     def evaluate_gradient(self, stepsize=1.0e-6, wrt=None, scope=None):
         """Return a dict containing the gradient of the expression with respect to 
-        each of the referenced varpaths. The gradient is calculated by 1st order central
-        difference for now. 
+        each of the referenced varpaths. The gradient is calculated symbolically
+        if possible, otherwise by 1st order central difference. Either way the
+        expressions are compiled once and cached.
         
         stepsize: float
             Step size for finite difference.
@@ -555,17 +723,19 @@ class ExprEvaluator(object):
         global _expr_dict
         
         scope = self._get_updated_scope(scope)
-        inputs = list(self.refs(copy=False))
+        inputs = self.refs(copy=False)
 
         if wrt==None:
             wrt = inputs
         elif isinstance(wrt, str):
             wrt = [wrt]
                 
-        gradient = {}
-        if self.cached_grad_eq is None:
-            self.cached_grad_eq = {}
+        if self._grad_info is None or self._grad_info[0] != inputs:
+            self._grad_info = self._get_grad_info()
+        names, sources, grad_codes, fd_code = self._grad_info[1:]
+        values = None
 
+        gradient = {}
         for var in wrt:
 
             # A "fake" boundary connection in an assembly has a special
@@ -580,70 +750,63 @@ class ExprEvaluator(object):
             if var not in inputs:
                 gradient[var] = 0.0
                 continue
-            
-            # First time, try to differentiate symbolically
-            if (var not in self.cached_grad_eq) or self._code is None:
-                
-                #Take symbolic gradient of all inputs using sympy
-                try:
-                    for varname, expression in zip(inputs, SymGrad(self.text, inputs)):
-                        self.cached_grad_eq[varname] = expression
 
-                except SymbolicDerivativeError, NameError:
-                    self.cached_grad_eq[var] = False
+            if values is None:
+                values = [scope.get(src) if isinstance(src, basestring)
+                          else src.evaluate() for src in sources]
 
-            # If we have a cached gradient expression:
-            if self.cached_grad_eq[var]:
-                
-                # This is not the way I wanted to do it, but I didn't want
-                # to mess with everything that's is in self._parse
-                grad_text = self.cached_grad_eq[var]
-                for name in inputs:
-                    if '[' in name:
-                        new_expr = ExprEvaluator(name, scope)
-                        replace_val = new_expr.evaluate()
-                    else:
-                        replace_val = scope.get(name)
-                    grad_text = grad_text.replace(name, str(replace_val))
-                
-                grad_root = ast.parse(grad_text, mode='eval')
-                grad_code = compile(grad_root, '<string>', 'eval')
-                gradient[var] = eval(grad_code, _expr_dict, locals())
+            # If we have a symbolic gradient expression:
+            idx = names.index(var)
+            if grad_codes[idx] is not None:
+                gradient[var] = eval(grad_codes[idx], _expr_dict,
+                                     {'_grad_args_': values})
                 
             # Otherwise resort to finite difference (1st order central)
             else:
-                # Always need to assemble list of constant inputs, for
-                # replacement in the gradient expression text
-                var_dict = {}
-                grad_text = self.text
-                for name in inputs:
-                    if '[' in name:
-                        new_expr = ExprEvaluator(name, scope)
-                        replace_val = new_expr.evaluate()
-                    else:
-                        replace_val = scope.get(name)
-                        
-                    if name==var:
-                        var_dict[name] = replace_val
-                        new_name = "var_dict['%s']" % name
-                        grad_text = grad_text.replace(name, new_name)
-                    else:
-                        # If we don't need derivative of a var, replace with its value
-                        grad_text = grad_text.replace(name, str(replace_val))
-
-                grad_root = ast.parse(grad_text, mode='eval')
-                grad_code = compile(grad_root, '<string>', 'eval')
-
-                # Finite difference (Central difference)
-                var_dict[var] += 0.5*stepsize
-                yp = eval(grad_code, _expr_dict, locals())
-                var_dict[var] -= stepsize
-                ym = eval(grad_code, _expr_dict, locals())
+                args = values[:]
+                args[idx] = values[idx] + 0.5*stepsize
+                yp = eval(fd_code, _expr_dict, {'_grad_args_': args})
+                args[idx] = values[idx] - 0.5*stepsize
+                ym = eval(fd_code, _expr_dict, {'_grad_args_': args})
                     
                 gradient[var] = (yp-ym)/stepsize
                 
         return gradient
     
+    def _get_grad_info(self):
+        """Return a tuple of (refs, names, sources, grad_codes, fd_code) for
+        :meth:`evaluate_gradient`. `names` are our refs in the order expected
+        by the compiled code, and `sources` gives for each of them either the
+        name to get from the scope or an ExprEvaluator for an indexed ref.
+        """
+        refs = self.refs()
+        # Longest first so that SymGrad's textual substitution of one name
+        # can't clobber another name containing it.
+        names = sorted(refs, key=lambda name: (-len(name), name))
+        grad_codes, fd_code = self._cached(('grad',)+tuple(names),
+                                           lambda: self._build_grad(names))
+        sources = [ExprEvaluator(name, self.scope) if '[' in name else name
+                   for name in names]
+        return (refs, names, sources, grad_codes, fd_code)
+
+    def _build_grad(self, names):
+        """Compile the symbolic derivative of our expression with respect to
+        each of `names` (None where that failed) and the expression itself,
+        for evaluation with ``_grad_args_`` holding the values of `names`.
+        """
+        try:
+            grad_texts = SymGrad(self.text, names)
+        except (SymbolicDerivativeError, NameError):
+            grad_texts = [None]*len(names)
+        grad_codes = []
+        for text in grad_texts:
+            try:
+                grad_codes.append(_compile_args_expr(text, names)
+                                  if text else None)
+            except SyntaxError:
+                grad_codes.append(None)
+        return (grad_codes, _compile_args_expr(self.text, names))
+    
     def set(self, val, scope=None, src=None):
         """Set the value of the referenced object to the specified value."""
         global _expr_dict
@@ -659,7 +822,8 @@ class ExprEvaluator(object):
             _local_setter_ = val 
             _local_src_ = src
             if self._assignment_code is None:
-                _, self._assignment_code = self._parse_set()
+                self._assignment_code = self._cached('set',
+                                                     self._build_set)
             exec(self._assignment_code, _expr_dict, locals())
         else:
             raise ValueError("expression '%s' can't be set to a value" % self.text)
@@ -782,8 +946,13 @@ class ExprEvaluator(object):
             else:
                 mapping[var] = oldname+var
         
+        key = ('transform', self.text, frozenset(mapping.items()))
         try:
-            return transform_expression(self.text, mapping)
+            text = expr_cache.get(key)
+            if text is None:
+                text = transform_expression(self.text, mapping)
+                expr_cache.put(key, (), text)
+            return text
         except SyntaxError as err:
             raise SyntaxError("failed to transform expression '%s': %s" % (self.text, str(err)))
     
@@ -812,7 +981,7 @@ class ConnectedExprEvaluator(ExprEvaluator):
         
     def _parse(self):
         super(ConnectedExprEvaluator, self)._parse()
-        self._examiner = ExprExaminer(ast.parse(self.text, mode='eval'), self)
+        self._examiner = self._get_examiner()
         if len(self._examiner.refs) != 1:
             raise RuntimeError("bad connected expression '%s' must reference exactly one variable" %
                                self.text)
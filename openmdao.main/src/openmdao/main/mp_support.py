@@ -17,6 +17,14 @@ is used between the Proxy and Server:
 If `authkey` is not 'PublicKey', then the above session protocol is not used,
 and channel data is in the clear.
 
+After any session establishment, the proxy negotiates a wire format with the
+server (see :data:`WIRE_FORMATS`). The 'frames' format sends large NumPy
+arrays as raw frames rather than inside the pickle, and may compress large
+payloads on non-loopback connections. If the server was created with
+`encrypt_loopback` False, session encryption is also dropped for loopback
+and pipe connections. Servers which don't support negotiation continue
+to use the original protocol.
+
 Public methods of an object are determined by a role-based access control
 attribute associated with the method. The server will verify that the current
 role is allowed access. The current role is determined by an
@@ -59,8 +67,9 @@ from enthought.traits.trait_handlers import TraitDictObject
 
 from openmdao.main.interfaces import obj_has_interface
 from openmdao.main.mp_util import decrypt, encrypt, is_legal_connection, \
-                                  keytype, make_typeid, public_methods, \
-                                  SPECIALS
+                                  is_loopback, keytype, make_typeid, \
+                                  public_methods, recv_message, send_message, \
+                                  SPECIALS, WIRE_FORMATS
 from openmdao.main.rbac import AccessController, RoleError, check_role, \
                                need_proxy, Credentials, \
                                get_credentials, set_credentials
@@ -154,10 +163,15 @@ class OpenMDAO_Server(Server):
     allow_tunneling: bool
         If True, allow connections from 127.0.0.1 (localhost), even if not
         listed otherwise.
+
+    encrypt_loopback: bool
+        If False, session encryption is not used for connections from the
+        local host (loopback or pipe), if the proxy requests that.
     """
 
     def __init__(self, registry, address, authkey, serializer, name=None,
-                 allowed_hosts=None, allowed_users=None, allow_tunneling=False):
+                 allowed_hosts=None, allowed_users=None, allow_tunneling=False,
+                 encrypt_loopback=True):
         super(OpenMDAO_Server, self).__init__(registry, address, authkey,
                                               serializer)
         self.name = name or 'OMS_%d' % os.getpid()
@@ -177,6 +191,7 @@ class OpenMDAO_Server(Server):
         self._allow_tunneling = allow_tunneling
         if allow_tunneling and '127.0.0.1' not in self._allowed_hosts:
             self._allowed_hosts.append('127.0.0.1')
+        self._encrypt_loopback = encrypt_loopback
 
         self._logger = logging.getLogger(name)
         self._logger.info('OpenMDAO_Server process %d started, %r',
@@ -191,6 +206,8 @@ class OpenMDAO_Server(Server):
                               sorted(self._allowed_hosts))
         else:
             self._logger.warning('    allowed_hosts: ANY')
+        if not encrypt_loopback:
+            self._logger.info('    encrypt_loopback: False')
 
         self._authkey = authkey
         if authkey == 'PublicKey':
@@ -349,8 +366,6 @@ class OpenMDAO_Server(Server):
         self._logger.debug('starting server thread to service %r, %s',
                            threading.current_thread().name,
                            keytype(self._authkey))
-        recv = conn.recv
-        send = conn.send
         id_to_obj = self.id_to_obj
         id_to_controller = self._id_to_controller
 
@@ -359,15 +374,18 @@ class OpenMDAO_Server(Server):
         else:
             client_key = ''
             session_key = ''
+        wire = 'pickle'
+        compress = False
 
         while not self.stop:
 
             try:
                 ident = methodname = args = kwds = credentials = None
                 obj = exposed = gettypeid = None
-                data = recv()
                 try:
-                    request = decrypt(data, session_key)
+                    request = recv_message(conn, session_key, wire)
+                except EOFError:
+                    raise
                 except Exception as exc:
                     trace = traceback.format_exc()
                     msg = "Can't decrypt/unpack request. This could be the" \
@@ -389,6 +407,15 @@ class OpenMDAO_Server(Server):
                     self._logger.error('%r' % exc)
                     raise
 
+                if ident == '#WIRE':
+                    # Reply using the current format, then switch.
+                    reply = self._negotiate(conn, *args)
+                    send_message(conn, ('#RETURN', reply), session_key, wire)
+                    wire, plain, compress = reply
+                    if plain:
+                        session_key = ''
+                    continue
+
                 try:
                     obj, exposed, gettypeid = id_to_obj[ident]
                 # Hard to cause this to happen.
@@ -485,9 +512,10 @@ class OpenMDAO_Server(Server):
 
             try:
                 try:
-                    send(encrypt(msg, session_key))
+                    send_message(conn, msg, session_key, wire, compress)
                 except Exception:
-                    send(encrypt(('#UNSERIALIZABLE', repr(msg)), session_key))
+                    send_message(conn, ('#UNSERIALIZABLE', repr(msg)),
+                                 session_key, wire, compress)
             # Just being defensive, this should never happen.
             except Exception as exc: #pragma no cover
                 self._logger.error('exception in thread serving %r',
@@ -536,6 +564,39 @@ class OpenMDAO_Server(Server):
 
         return (client_key, session_key)
 
+    def _negotiate(self, conn, formats, plain, compress):
+        """
+        Returns ``(wire, plain, compress)`` selected from the proxy's
+        requested wire `formats`, `plain` (no encryption) and `compress`.
+        """
+        for wire in formats:
+            if wire in WIRE_FORMATS:
+                break
+        else:
+            wire = 'pickle'
+        plain = plain and not self._encrypt_loopback and \
+                self._is_loopback_conn(conn)
+        compress = compress and wire != 'pickle'
+        self._logger.debug('wire %s, plain %s, compress %s',
+                           wire, plain, compress)
+        return (wire, plain, compress)
+
+    def _is_loopback_conn(self, conn):
+        """ Returns True if `conn` is from the local host. """
+        if self._address_type != 'AF_INET':
+            return True
+        try:
+            sock = socket.fromfd(conn.fileno(), socket.AF_INET,
+                                 socket.SOCK_STREAM)
+            try:
+                return is_loopback(sock.getpeername())
+            finally:
+                sock.close()
+        # Just being defensive.
+        except Exception as exc:  #pragma no cover
+            self._logger.warning("Can't get peer address: %r", exc)
+            return False
+
     def _check_access(self, ident, methodname, function, args, credentials):
         """ Check for valid access, return (role, credentials, controller). """
         obj, exposed, gettypeid = self.id_to_obj[ident]
@@ -816,19 +877,23 @@ class OpenMDAO_Manager(BaseManager):
     allow_tunneling: bool
         If True, allow connections from 127.0.0.1 (localhost), even if not
         listed otherwise.
+
+    encrypt_loopback: bool
+        If False, the server doesn't encrypt loopback or pipe connections.
     """
 
     _Server = OpenMDAO_Server
 
     def __init__(self, address=None, authkey=None, serializer='pickle',
                  pubkey=None, name=None, allowed_hosts=None, allowed_users=None,
-                 allow_tunneling=False):
+                 allow_tunneling=False, encrypt_loopback=True):
         super(OpenMDAO_Manager, self).__init__(address, authkey, serializer)
         self._pubkey = pubkey
         self._name = name
         self._allowed_hosts = allowed_hosts
         self._allowed_users = allowed_users
         self._allow_tunneling = allow_tunneling
+        self._encrypt_loopback = encrypt_loopback
 
     def get_server(self):
         """
@@ -838,7 +903,7 @@ class OpenMDAO_Manager(BaseManager):
         return OpenMDAO_Server(self._registry, self._address, self._authkey,
                                self._serializer, self._name,
                                self._allowed_hosts, self._allowed_users,
-                               self._allow_tunneling)
+                               self._allow_tunneling, self._encrypt_loopback)
 
     def start(self, cwd=None):
         """
@@ -872,7 +937,7 @@ class OpenMDAO_Manager(BaseManager):
             args=(registry, self._address, self._authkey,
                   self._serializer, self._name, self._allowed_hosts,
                   self._allowed_users, self._allow_tunneling,
-                  writer, credentials, cwd),
+                  self._encrypt_loopback, writer, credentials, cwd),
             )
         ident = ':'.join(str(i) for i in self._process._identity)
         self._process.name = type(self).__name__  + '-' + ident
@@ -926,7 +991,8 @@ class OpenMDAO_Manager(BaseManager):
     @classmethod
     def _run_server(cls, registry, address, authkey, serializer, name,
                     allowed_hosts, allowed_users, allow_tunneling,
-                    writer, credentials, cwd=None): #pragma no cover
+                    encrypt_loopback, writer, credentials,
+                    cwd=None): #pragma no cover
         """
         Create a server, report its address and public key, and run it.
         """
@@ -966,7 +1032,8 @@ class OpenMDAO_Manager(BaseManager):
 
             # Create server.
             server = cls._Server(registry, address, authkey, serializer, name,
-                                 allowed_hosts, allowed_users, allow_tunneling)
+                                 allowed_hosts, allowed_users, allow_tunneling,
+                                 encrypt_loopback)
         except Exception as exc:
             writer.send(exc)
             return
@@ -1151,8 +1218,10 @@ class OpenMDAO_Proxy(BaseProxy):
                 self._init_session(conn)
             else:
                 self._tls.session_key = ''
+            self._negotiate(conn)
 
         session_key = self._tls.session_key
+        wire = self._tls.wire
 
 # FIXME: Bizarre problem evidenced by test_extcode.py (Python 2.6.1)
 # For some reason pickling the env_vars dictionary causes:
@@ -1168,15 +1237,16 @@ class OpenMDAO_Proxy(BaseProxy):
                 new_args.append(arg)
 
         try:
-            conn.send(encrypt((self._id, methodname, new_args, kwds,
-                               get_credentials().encode()), session_key))
+            send_message(conn, (self._id, methodname, new_args, kwds,
+                                get_credentials().encode()),
+                         session_key, wire, self._tls.compress)
         except IOError as exc:
             msg = "Can't send to server at %r for %r: %r" \
                   % (self._token.address, methodname, exc)
             logging.error(msg)
             raise RuntimeError(msg)
 
-        kind, result = decrypt(conn.recv(), session_key)
+        kind, result = recv_message(conn, session_key, wire)
 
         if kind == '#RETURN':
             return result
@@ -1239,6 +1309,28 @@ class OpenMDAO_Proxy(BaseProxy):
         
         self._tls.session_key = key_pair.decrypt(server_data[1])
 
+    def _negotiate(self, conn):
+        """
+        Negotiate wire format with server. Requests no encryption and no
+        compression for loopback connections, compression otherwise.
+        Servers without negotiation support reply with an error, in which
+        case the original protocol is used.
+        """
+        session_key = self._tls.session_key
+        loopback = is_loopback(self._token.address)
+        conn.send(encrypt(('#WIRE', '#WIRE',
+                           (WIRE_FORMATS, loopback, not loopback), {},
+                           get_credentials().encode()), session_key))
+        kind, result = decrypt(conn.recv(), session_key)
+        if kind == '#RETURN':
+            wire, plain, compress = result
+        else:
+            wire, plain, compress = 'pickle', False, False
+        self._tls.wire = wire
+        self._tls.compress = compress
+        if plain:
+            self._tls.session_key = ''
+
     def _incref(self):
         """
         Tell server to increment its reference count.
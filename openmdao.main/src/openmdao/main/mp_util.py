@@ -5,6 +5,7 @@ Multiprocessing support utilities.
 import atexit
 import ConfigParser
 import cPickle
+import cStringIO
 import errno
 import getpass
 import inspect
@@ -12,11 +13,18 @@ import logging
 import os.path
 import re
 import socket
+import struct
 import sys
 import time
+import zlib
 
 from Crypto.Cipher import AES
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from multiprocessing import current_process, connection
 from multiprocessing.managers import BaseProxy
 
@@ -29,6 +37,27 @@ from openmdao.util.shellproc import ShellProc, STDOUT
 # Names of attribute access methods requiring special handling.
 SPECIALS = ('__getattribute__', '__getattr__', '__setattr__', '__delattr__')
 
+# Supported wire formats, in order of preference.
+# 'pickle' sends each message as a single (possibly encrypted) pickle.
+# 'frames' sends large arrays as separate raw frames and supports compression.
+WIRE_FORMATS = ('frames', 'pickle')
+
+# Arrays with at least this many bytes are sent as separate frames.
+ARRAY_FRAME_MIN = 65536
+
+# Payloads with at least this many bytes are compressed (if negotiated).
+COMPRESS_MIN = 65536
+
+# Flags in the first byte of a 'frames' message. A message starting with
+# the pickle PROTO opcode instead is just a pickle.
+_COMPRESSED = 1
+_ENCRYPTED = 2
+_HAS_FRAMES = 4
+_PROTO = '\x80'
+
+# Size of sample used to check if a payload is worth compressing.
+_COMPRESS_SAMPLE = 4096
+
 
 def keytype(authkey):
     """
@@ -211,19 +240,8 @@ def encrypt(obj, session_key):
         Key used for encryption. Should be at least 16 bytes long.
     """
     if session_key:
-        # Just being defensive, this should never happen.
-        if len(session_key) < 16:  #pragma no cover
-            session_key += '!'*16
-        session_key = session_key[:16]
-        encryptor = AES.new(session_key, AES.MODE_CBC, '?'*AES.block_size)
-        text = cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL)
-        length = len(text)
-        pad = length % AES.block_size
-        if pad:
-            pad = AES.block_size - pad
-            text += '-'*pad
-        data = encryptor.encrypt(text)
-        return (length, data)
+        return _encrypt_text(cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL),
+                             session_key)
     else:
         return obj
 
@@ -242,17 +260,236 @@ def decrypt(msg, session_key):
         # Just being defensive, this should never happen.
         if len(msg) != 2:  #pragma no cover
             raise RuntimeError('_decrypt: msg not encrypted?')
-        # Just being defensive, this should never happen.
-        if len(session_key) < 16:  #pragma no cover
-            session_key += '!'*16
-        session_key = session_key[:16]
-        decryptor = AES.new(session_key, AES.MODE_CBC, '?'*AES.block_size)
         length, data = msg
-        text = decryptor.decrypt(data)
-        return cPickle.loads(text[:length])
+        return cPickle.loads(_decrypt_text(length, data, session_key))
     else:
         return msg
 
+def _make_cipher(session_key):
+    """ Return AES cipher for `session_key`. """
+    # Just being defensive, this should never happen.
+    if len(session_key) < 16:  #pragma no cover
+        session_key += '!'*16
+    session_key = session_key[:16]
+    return AES.new(session_key, AES.MODE_CBC, '?'*AES.block_size)
+
+def _encrypt_text(text, session_key):
+    """ Returns ``(length, data)`` of encrypted `text`. """
+    length = len(text)
+    pad = length % AES.block_size
+    if pad:
+        pad = AES.block_size - pad
+        text += '-'*pad
+    return (length, _make_cipher(session_key).encrypt(text))
+
+def _decrypt_text(length, data, session_key):
+    """ Returns text from `length` and encrypted `data`. """
+    return _make_cipher(session_key).decrypt(data)[:length]
+
+
+def send_message(conn, obj, session_key='', wire='pickle', compress=False):
+    """
+    Send `obj` on `conn` using wire format `wire`.
+
+    conn: :class:`multiprocessing.Connection`
+        Connection to send on.
+
+    obj: object
+        Object to be sent.
+
+    session_key: string
+        If specified, data is encrypted with this key.
+
+    wire: string
+        Wire format, one of :data:`WIRE_FORMATS`.
+
+    compress: bool
+        If True, large payloads are compressed (only with 'frames').
+
+    With the 'frames' format, NumPy arrays of at least :data:`ARRAY_FRAME_MIN`
+    bytes are replaced in the pickle by a reference and sent directly from
+    the array's buffer in following frames. Frames which need compression or
+    encryption are copied, others are not.
+    """
+    if wire == 'pickle':
+        conn.send(encrypt(obj, session_key))
+        return
+
+    pickler = cPickle.Pickler(cPickle.HIGHEST_PROTOCOL)
+    framer = _ArrayFramer(session_key, compress)
+    if numpy is not None:
+        pickler.inst_persistent_id = framer
+    pickler.dump(obj)
+
+    if framer.arrays or session_key or compress:
+        flags = _HAS_FRAMES if framer.arrays else 0
+        conn.send_bytes(_pack(pickler.getvalue(), session_key, compress,
+                              flags))
+    else:
+        # A bare pickle (starting with the PROTO opcode) needs no flags.
+        conn.send_bytes(pickler.getvalue())
+
+    if framer.arrays:
+        conn.send_bytes(_pack(cPickle.dumps(framer.descriptors,
+                                            cPickle.HIGHEST_PROTOCOL),
+                              session_key, False))
+        for arr, desc in zip(framer.arrays, framer.descriptors):
+            if desc[-1]:
+                conn.send_bytes(_pack(arr.tostring(order='A'), session_key,
+                                      compress))
+            elif arr.flags.c_contiguous:
+                conn.send_bytes(arr)
+            else:
+                conn.send_bytes(arr.T)
+
+def recv_message(conn, session_key='', wire='pickle'):
+    """
+    Receive an object sent by :func:`send_message` from `conn`.
+
+    conn: :class:`multiprocessing.Connection`
+        Connection to receive from.
+
+    session_key: string
+        If specified, data is decrypted with this key, and unencrypted data
+        is rejected.
+
+    wire: string
+        Wire format, one of :data:`WIRE_FORMATS`.
+
+    Raw array frames are received directly into newly allocated arrays.
+    """
+    if wire == 'pickle':
+        return decrypt(conn.recv(), session_key)
+
+    data = conn.recv_bytes()
+    if data[0] == _PROTO:
+        if session_key:
+            raise RuntimeError('received unencrypted data with session key')
+        return cPickle.loads(data)
+
+    flags, text = _unpack(data, session_key)
+    arrays = []
+    if flags & _HAS_FRAMES:
+        desc_text = _unpack(conn.recv_bytes(), session_key)[1]
+        descriptors = cPickle.load(cStringIO.StringIO(desc_text))
+        for dtype, shape, order, packed in descriptors:
+            if packed:
+                data = _unpack(conn.recv_bytes(), session_key)[1]
+                arr = numpy.frombuffer(data, dtype).copy()
+                arr = arr.reshape(shape, order=order)
+            elif session_key:  # Encrypted frames are always packed.
+                raise RuntimeError('received unencrypted data with session key')
+            else:
+                arr = numpy.empty(shape, dtype, order)
+                if order == 'F':
+                    conn.recv_bytes_into(arr.T)
+                else:
+                    conn.recv_bytes_into(arr)
+            arrays.append(arr)
+
+    unpickler = cPickle.Unpickler(cStringIO.StringIO(text))
+    unpickler.persistent_load = arrays.__getitem__
+    return unpickler.load()
+
+
+class _ArrayFramer(object):
+    """
+    Used as :attr:`inst_persistent_id` of a pickler to collect NumPy arrays
+    to be sent as separate frames.
+
+    session_key: string
+        If specified, frames will be encrypted.
+
+    compress: bool
+        If True, large frames will be compressed.
+    """
+
+    def __init__(self, session_key, compress):
+        self.session_key = session_key
+        self.compress = compress
+        self.arrays = []
+        self.descriptors = []
+        self._ids = {}
+
+    def __call__(self, obj):
+        if type(obj) not in _FRAMED_TYPES or obj.dtype.hasobject or \
+           obj.nbytes < ARRAY_FRAME_MIN:
+            return None
+        try:
+            return self._ids[id(obj)]
+        except KeyError:
+            pass
+        index = len(self.arrays)
+        self._ids[id(obj)] = index
+        if obj.flags.c_contiguous:
+            order = 'C'
+        elif obj.flags.f_contiguous:
+            order = 'F'
+        else:
+            obj = numpy.ascontiguousarray(obj)
+            order = 'C'
+        packed = bool(self.session_key) or \
+                 (self.compress and obj.nbytes >= COMPRESS_MIN)
+        self.arrays.append(obj)
+        self.descriptors.append((obj.dtype, obj.shape, order, packed))
+        return index
+
+if numpy is None:  #pragma no cover
+    _FRAMED_TYPES = ()
+else:
+    _FRAMED_TYPES = (numpy.ndarray, numpy.memmap)
+
+def _pack(text, session_key, compress, flags=0):
+    """
+    Returns `text` prefixed by a flags byte, possibly compressed
+    and encrypted.
+    """
+    if compress and len(text) >= COMPRESS_MIN:
+        # Don't bother if a leading sample doesn't compress well.
+        sample = buffer(text, 0, _COMPRESS_SAMPLE)
+        if len(zlib.compress(sample, 1)) < 0.9 * len(sample):
+            packed = zlib.compress(text, 1)
+            if len(packed) < len(text):
+                text = packed
+                flags |= _COMPRESSED
+    if session_key:
+        length, text = _encrypt_text(text, session_key)
+        return chr(flags | _ENCRYPTED) + struct.pack('!I', length) + text
+    return chr(flags) + text
+
+def _unpack(data, session_key):
+    """ Returns ``(flags, text)`` from data formatted by :func:`_pack`. """
+    flags = ord(data[0])
+    if flags & _ENCRYPTED:
+        if not session_key:
+            raise RuntimeError('received encrypted data without session key')
+        length = struct.unpack('!I', data[1:5])[0]
+        text = _decrypt_text(length, data[5:], session_key)
+    elif session_key:
+        raise RuntimeError('received unencrypted data with session key')
+    else:
+        text = buffer(data, 1)
+    if flags & _COMPRESSED:
+        text = zlib.decompress(text)
+    return (flags, text)
+
+
+def is_loopback(address):
+    """
+    Returns True if `address` can only be reached from the local host
+    (a pipe, a Unix socket, or a 127.x.x.x IP address).
+
+    address: tuple or string
+        A :mod:`multiprocessing` address.
+    """
+    if connection.address_type(address) != 'AF_INET':
+        return True
+    try:
+        ip_addr = socket.gethostbyname(address[0])
+    except socket.error:
+        return False
+    return ip_addr.startswith('127.')
+
 
 def public_methods(obj):
     """
@@ -13,6 +13,7 @@ import shutil
 import signal
 import socket
 import sys
+import threading
 import time
 
 from multiprocessing import current_process
@@ -59,8 +60,23 @@ class ObjServerFactory(Factory):
         a pipe (default).  Created :class:`ObjServer` servers will use the
         same form of address.
 
+    encrypt_loopback: bool
+        If False, created servers don't encrypt loopback or pipe connections.
+
+    pool_size: int
+        Maximum number of idle servers kept for reuse. Released servers
+        which pass a health check have their directory scrubbed and are
+        kept, rather than shut-down, until `pool_size` are idle. Zero
+        disables pooling. See :meth:`ObjServer.reset` for what is (and
+        isn't) undone between uses.
+
+    max_uses: int
+        If >0, a pooled server is shut-down rather than reused once it has
+        been handed out this many times.
+
     The environment variable ``OPENMDAO_KEEPDIRS`` can be used to avoid
     having server directory trees removed when servers are shut-down.
+    Setting it also disables pooling.
     """
 
     # These are used to propagate selections from main().
@@ -71,14 +87,21 @@ class ObjServerFactory(Factory):
     _allow_tunneling = False
 
     def __init__(self, name='ObjServerFactory', authkey=None, allow_shell=False,
-                 allowed_types=None, address=None):
+                 allowed_types=None, address=None, encrypt_loopback=True,
+                 pool_size=0, max_uses=0):
         super(ObjServerFactory, self).__init__()
         self._name = name
         self._authkey = authkey
         self._address = address or ObjServerFactory._address
         self._allow_shell = allow_shell or ObjServerFactory._allow_shell
         self._allowed_types = allowed_types or ObjServerFactory._allowed_types
+        self._encrypt_loopback = encrypt_loopback
         self._managers = {}
+        self.pool_size = pool_size
+        self.max_uses = max_uses
+        self._pool = []       # Idle servers: [(pool_key, server), ...]
+        self._pool_info = {}  # server -> [pool_key, times handed out]
+        self._pool_lock = threading.Lock()
         self._logger = logging.getLogger(name)
         self._logger.info('PID: %d, %r, allow_shell %s', os.getpid(),
                           keytype(self._authkey), allow_shell)
@@ -108,11 +131,16 @@ class ObjServerFactory(Factory):
     @rbac(('owner', 'user'))
     def release(self, server):
         """
-        Shut-down :class:`ObjServer` `server`.
+        Shut-down :class:`ObjServer` `server`, or return it to the pool of
+        idle servers if pooling is enabled.
 
         server: :class:`ObjServer`
             Server to be shut down.
         """
+        self._release(server, True)
+
+    def _release(self, server, recycle):
+        """ Release `server`, pooling it if `recycle` and possible. """
         try:
             address = server._token.address
         except AttributeError:
@@ -147,27 +175,136 @@ class ObjServerFactory(Factory):
         if get_credentials().user != owner.user:
             raise RoleError('only the owner can release')
 
+        if recycle and self._recycle(server):
+            return
+        self._shutdown(server)
+
+    def _shutdown(self, server):
+        """ Shut-down `server` and remove its directory. """
+        manager, root_dir, owner = self._managers[server]
         manager.shutdown()
         server._close.cancel()
         del self._managers[server]
+        self._pool_info.pop(server, None)
         keep_dirs = int(os.environ.get('OPENMDAO_KEEPDIRS', '0'))
         if not keep_dirs and os.path.exists(root_dir):
             shutil.rmtree(root_dir)
 
+    def _recycle(self, server):
+        """
+        Try to scrub `server` and add it to the pool of idle servers.
+        Returns True if `server` was pooled.
+        """
+        if self.pool_size <= 0 or \
+           int(os.environ.get('OPENMDAO_KEEPDIRS', '0')):
+            return False
+        pool_key, uses = self._pool_info[server]
+        if self.max_uses > 0 and uses >= self.max_uses:
+            self._logger.debug('retiring %r after %d uses', server, uses)
+            return False
+        with self._pool_lock:
+            if len(self._pool) >= self.pool_size:
+                return False
+        if not self._is_healthy(server):
+            return False
+        try:
+            server.reset()
+        except Exception as exc:
+            self._logger.warning('reset of %r failed: %s', server, exc)
+            return False
+        with self._pool_lock:
+            if len(self._pool) >= self.pool_size:
+                return False
+            self._pool.append((pool_key, server))
+        self._logger.debug('pooled %r', server)
+        return True
+
+    def _from_pool(self, pool_key):
+        """ Return a healthy idle server for `pool_key`, or None. """
+        while True:
+            with self._pool_lock:
+                for i, (key, server) in enumerate(self._pool):
+                    if key == pool_key:
+                        del self._pool[i]
+                        break
+                else:
+                    return None
+            if self._is_healthy(server):
+                self._logger.debug('reusing %r', server)
+                return server
+            self._shutdown(server)
+
+    def _is_healthy(self, server):
+        """ Returns True if `server` is still running and responsive. """
+        manager = self._managers[server][0]
+        try:
+            if manager._process.is_alive():
+                server.echo()
+                return True
+            self._logger.warning('server %r process has exited', server)
+        except Exception as exc:
+            self._logger.warning('server %r failed health check: %s',
+                                 server, exc)
+        return False
+
+    @rbac(('owner', 'user'))
+    def prestart(self, count, allowed_users=None):
+        """
+        Start servers and add them to the pool of idle servers so that
+        subsequent :meth:`create` requests don't wait for server startup.
+        Returns the number of servers started.
+
+        count: int
+            Number of idle servers wanted. The pool is never grown beyond
+            `pool_size`.
+
+        allowed_users: dict or None
+            Passed to servers as in :meth:`create`. If None, servers are
+            private to the current user.
+        """
+        allowed_users = allowed_users or self._default_users()
+        pool_key = self._pool_key(allowed_users)
+        started = 0
+        while True:
+            with self._pool_lock:
+                if len(self._pool) >= min(count, self.pool_size):
+                    break
+            server = self._start_server('', allowed_users)
+            self._pool_info[server] = [pool_key, 0]
+            with self._pool_lock:
+                self._pool.append((pool_key, server))
+            started += 1
+        self._logger.debug('prestart started %d servers', started)
+        return started
+
+    @staticmethod
+    def _default_users():
+        """ Returns `allowed_users` for a server private to the caller. """
+        credentials = get_credentials()
+        return {credentials.user: credentials.public_key}
+
+    @staticmethod
+    def _pool_key(allowed_users):
+        """ Returns key for pooled servers started for `allowed_users`. """
+        return (get_credentials().user, tuple(sorted(allowed_users.keys())))
+
     @rbac('owner')
     def cleanup(self):
         """ Shut-down all remaining :class:`ObjServers`. """
         self._logger.debug('cleanup')
+        with self._pool_lock:
+            self._pool = []
         cleanup_creds = get_credentials()
         servers = self._managers.keys()
         for server in servers:
             # Cleanup overrides release() 'owner' protection.
             set_credentials(self._managers[server][2])
             try:
-                self.release(server)
+                self._release(server, False)
             finally:
                 set_credentials(cleanup_creds)
         self._managers = {}
+        self._pool_info = {}
 
     @rbac('*')
     def get_available_types(self, groups=None):
@@ -209,6 +346,10 @@ class ObjServerFactory(Factory):
             If `name` or `allowed_users` are specified, they are used when
             creating the :class:`ObjServer`. If no `allowed_users` are
             specified, the server is private to the current user.
+
+        If pooling is enabled, a new server request is satisfied from the
+        pool of idle servers started for the same users when possible.
+        Such a server retains its original name.
         """
         self._logger.info('create typname %r, version %r server %s,'
                           ' res_desc %s, args %s', typname, version, server,
@@ -216,62 +357,19 @@ class ObjServerFactory(Factory):
 
         if server is None:
             name = ctor_args.get('name', '')
-            if not name:
-                name = 'Server_%d' % (len(self._managers) + 1)
 
             allowed_users = ctor_args.get('allowed_users')
             if not allowed_users:
-                credentials = get_credentials()
-                allowed_users = {credentials.user: credentials.public_key}
+                allowed_users = self._default_users()
             else:
                 del ctor_args['allowed_users']
 
-            if self._address is None or \
-               isinstance(self._address, basestring) or \
-               self._allow_tunneling:
-                # Local access only via pipe if factory accessed by pipe
-                # or factory is accessed via tunnel.
-                address = None
-            else:
-                # Network access via same IP as factory, system-selected port.
-                address = (self._address[0], 0)
-
-            manager = self.manager_class(address, self._authkey, name=name,
-                                         allowed_users=allowed_users)
-            root_dir = name
-            count = 1
-            while os.path.exists(root_dir):
-                count += 1
-                root_dir = '%s_%d' % (name, count)
-            os.mkdir(root_dir)
-
-            # On Windows, when running the full test suite under Nose,
-            # starting the process starts a new Nose test session, which
-            # will eventually get here and start a new Nose session, which...
-            orig_main = None
-            if sys.platform == 'win32':  #pragma no cover
-                scripts = ('openmdao-script.py', 'openmdao_test-script.py')
-                if sys.modules['__main__'].__file__.endswith(scripts):
-                    orig_main = sys.modules['__main__'].__file__
-                    sys.modules['__main__'].__file__ = \
-                        pkg_resources.resource_filename('openmdao.main',
-                                                        'objserverfactory.py')
-            owner = get_credentials()
-            self._logger.debug('%s starting server %r in dir %s',
-                               owner, name, root_dir)
-            try:
-                manager.start(cwd=root_dir)
-            finally:
-                if orig_main is not None:  #pragma no cover
-                    sys.modules['__main__'].__file__ = orig_main
-
-            self._logger.info('new server %r for %s', name, owner)
-            self._logger.info('    in dir %s', root_dir)
-            self._logger.info('    listening on %s', manager.address)
-            server_class = getattr(manager, self.server_classname)
-            server = server_class(name=name, allow_shell=self._allow_shell,
-                                  allowed_types=self._allowed_types)
-            self._managers[server] = (manager, root_dir, owner)
+            pool_key = self._pool_key(allowed_users)
+            server = self._from_pool(pool_key)
+            if server is None:
+                server = self._start_server(name, allowed_users)
+                self._pool_info[server] = [pool_key, 0]
+            self._pool_info[server][1] += 1
 
         if typname:
             obj = server.create(typname, version, None, res_desc, **ctor_args)
@@ -281,6 +379,63 @@ class ObjServerFactory(Factory):
         self._logger.debug('create returning %r at %r', obj, obj._token.address)
         return obj
 
+    def _start_server(self, name, allowed_users):
+        """
+        Start a new :class:`ObjServer` in a subdirectory of the current
+        directory and return a proxy for it.
+        """
+        if not name:
+            name = 'Server_%d' % (len(self._managers) + 1)
+
+        if self._address is None or \
+           isinstance(self._address, basestring) or \
+           self._allow_tunneling:
+            # Local access only via pipe if factory accessed by pipe
+            # or factory is accessed via tunnel.
+            address = None
+        else:
+            # Network access via same IP as factory, system-selected port.
+            address = (self._address[0], 0)
+
+        manager = self.manager_class(address, self._authkey, name=name,
+                                     allowed_users=allowed_users,
+                                     encrypt_loopback=self._encrypt_loopback)
+        root_dir = name
+        count = 1
+        while os.path.exists(root_dir):
+            count += 1
+            root_dir = '%s_%d' % (name, count)
+        os.mkdir(root_dir)
+
+        # On Windows, when running the full test suite under Nose,
+        # starting the process starts a new Nose test session, which
+        # will eventually get here and start a new Nose session, which...
+        orig_main = None
+        if sys.platform == 'win32':  #pragma no cover
+            scripts = ('openmdao-script.py', 'openmdao_test-script.py')
+            if sys.modules['__main__'].__file__.endswith(scripts):
+                orig_main = sys.modules['__main__'].__file__
+                sys.modules['__main__'].__file__ = \
+                    pkg_resources.resource_filename('openmdao.main',
+                                                    'objserverfactory.py')
+        owner = get_credentials()
+        self._logger.debug('%s starting server %r in dir %s',
+                           owner, name, root_dir)
+        try:
+            manager.start(cwd=root_dir)
+        finally:
+            if orig_main is not None:  #pragma no cover
+                sys.modules['__main__'].__file__ = orig_main
+
+        self._logger.info('new server %r for %s', name, owner)
+        self._logger.info('    in dir %s', root_dir)
+        self._logger.info('    listening on %s', manager.address)
+        server_class = getattr(manager, self.server_classname)
+        server = server_class(name=name, allow_shell=self._allow_shell,
+                              allowed_types=self._allowed_types)
+        self._managers[server] = (manager, root_dir, owner)
+        return server
+
 
 class _FactoryManager(OpenMDAO_Manager):
     """
@@ -334,6 +489,14 @@ class ObjServer(object):
         SimulationRoot.chroot(self._root_dir)
         self.tlo = None
 
+        # Files such as our log which survive reset().
+        self._startup_files = set(os.listdir(self._root_dir))
+
+        # Interpreter state restored by reset().
+        self._startup_modules = set(sys.modules)
+        self._startup_path = sys.path[:]
+        self._startup_environ = os.environ.copy()
+
         # Ensure Traits Array support is initialized. The code contains
         # globals for numpy symbols that are initialized within
         # AbstractArray.__init__() which won't be executed if we simply
@@ -354,6 +517,55 @@ class ObjServer(object):
         """
         return args
 
+    @rbac('owner')
+    def reset(self):
+        """
+        Prepare for reuse by discarding any loaded model and removing
+        everything in the server's directory created since startup.
+        Modules imported from the server's directory (such as those from a
+        model egg) are removed from :data:`sys.modules`, and :data:`sys.path`
+        and :data:`os.environ` are restored to their startup values.
+        Used by :class:`ObjServerFactory` when pooling servers.
+
+        Isolation is not complete: objects returned by :meth:`create` stay
+        alive until their clients release them, modules imported from
+        elsewhere (installed distributions) remain loaded, and state held by
+        extension modules or threads is untouched. Don't pool servers for
+        models which require a pristine process.
+        """
+        self._logger.debug('reset')
+        if self.tlo:
+            self.tlo.pre_delete()
+            self.tlo = None
+        os.chdir(self._root_dir)
+        SimulationRoot.chroot(self._root_dir)
+        for name in os.listdir(self._root_dir):
+            if name in self._startup_files:
+                continue
+            path = os.path.join(self._root_dir, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+        # Forget modules loaded from our directory.
+        prefix = os.path.join(self._root_dir, '')
+        for name, module in sys.modules.items():
+            if name in self._startup_modules:
+                continue
+            if module is None:  # Failed relative import placeholder.
+                del sys.modules[name]
+                continue
+            filename = getattr(module, '__file__', None)
+            if filename and (not os.path.isabs(filename) or
+                             filename.startswith(prefix)):
+                self._logger.debug('    unloading %s', name)
+                del sys.modules[name]
+
+        sys.path[:] = self._startup_path
+        os.environ.clear()
+        os.environ.update(self._startup_environ)
+
     @rbac('owner', proxy_types=[object])
     def create(self, typname, version=None, server=None,
                res_desc=None, **ctor_args):
@@ -442,7 +654,6 @@ class ObjServer(object):
 
         limits = resource_desc.get('resource_limits', {})
         timeout = limits.get('wallclock_time', 0)
-        poll_delay = 1
 
         try:
             process = ShellProc(command, stdin, stdout, stderr, env_vars)
@@ -451,7 +662,7 @@ class ObjServer(object):
             raise
 
         self._logger.debug('    PID = %d', process.pid)
-        return_code, error_msg = process.wait(poll_delay, timeout)
+        return_code, error_msg = process.wait(timeout=timeout)
         self._logger.debug('    returning %s', (return_code, error_msg))
         return (return_code, error_msg)
 
@@ -103,17 +103,26 @@ class ResourceAllocationManager(object):
     By default ``~/.openmdao/resources.cfg`` will be used for additional
     configuration information. To avoid this, call :meth:`configure` before
     any other allocation routines.
+
+    Allocator time estimates are requested concurrently and reused for up to
+    `estimate_ttl` seconds, unless a server is deployed on or released to
+    that allocator. When no resources are available, allocation waits for a
+    server to be released (or one second) before trying again.
     """
 
     _lock = threading.Lock()
+    _released = threading.Condition(_lock)  # Notified by release().
     _RAM = None  # Singleton.
 
+    estimate_ttl = 1.  # Seconds to reuse an allocator's time estimate.
+
     def __init__(self, config_filename=None):
         self._logger = logging.getLogger('RAM')
         self._pid = os.getpid()  # For detecting copy from fork.
         self._allocations = 0
         self._allocators = []
         self._deployed_servers = {}
+        self._estimates = {}  # allocator -> {desc key: (time, estimate)}
         self._allocators.append(LocalAllocator('LocalHost',
                                                authkey='PublicKey',
                                                allow_shell=True))
@@ -248,10 +257,14 @@ class ResourceAllocationManager(object):
             if isinstance(selector, basestring):
                 for i, allocator in enumerate(ram._allocators):
                     if allocator.name == selector:
-                        return ram._allocators.pop(i)
-                raise ValueError('allocator %r not found' % selector)
+                        break
+                else:
+                    raise ValueError('allocator %r not found' % selector)
             else:
-                return ram._allocators.pop(selector)
+                i = selector
+            allocator = ram._allocators.pop(i)
+            ram._estimates.pop(allocator, None)
+            return allocator
 
     @staticmethod
     def list_allocators():
@@ -318,6 +331,7 @@ class ResourceAllocationManager(object):
                 self._logger.debug('deploying on %r', best_allocator._name)
                 server = best_allocator.deploy(name, resource_desc,
                                                best_criteria)
+                self._estimates.pop(best_allocator, None)
                 if server is not None:
                     server_info = {
                         'name': name,
@@ -342,7 +356,8 @@ class ResourceAllocationManager(object):
                 return (None, None)
             # Difficult to generate deployable request that won't deploy...
             else:  #pragma no cover
-                time.sleep(1)  # Wait a bit between retries.
+                # Wait for a release, or a bit for other changes.
+                ResourceAllocationManager._released.wait(1)
 
     @staticmethod
     def get_hostnames(resource_desc):
@@ -373,7 +388,8 @@ class ResourceAllocationManager(object):
                 return None
             # Difficult to generate deployable request that won't deploy...
             else:  #pragma no cover
-                time.sleep(1)  # Wait a bit between retries.
+                # Wait for a release, or a bit for other changes.
+                ResourceAllocationManager._released.wait(1)
 
     def _get_estimates(self, resource_desc, need_hostnames=False):
         """ Return best (estimate, criteria, allocator). """
@@ -381,8 +397,9 @@ class ResourceAllocationManager(object):
         best_criteria = None
         best_allocator = None
 
-        for allocator in self._allocators:
-            estimate, criteria = allocator.time_estimate(resource_desc)
+        estimates = self._time_estimates(resource_desc)
+        for allocator, (estimate, criteria) in zip(self._allocators,
+                                                   estimates):
             if estimate == -2:
                 key = criteria.keys()[0]
                 info = criteria[key]
@@ -407,6 +424,56 @@ class ResourceAllocationManager(object):
 
         return (best_estimate, best_criteria, best_allocator)
 
+    def _time_estimates(self, resource_desc):
+        """
+        Return list of ``(estimate, criteria)`` from each allocator.
+        Recent estimates are reused, the rest are requested concurrently.
+        """
+        key = repr(sorted(resource_desc.items()))
+        now = time.time()
+        estimates = []
+        todo = []
+        for i, allocator in enumerate(self._allocators):
+            try:
+                stamp, estimate = self._estimates[allocator][key]
+            except KeyError:
+                stamp = None
+            if stamp is not None and now - stamp < self.estimate_ttl:
+                estimates.append(estimate)
+            else:
+                estimates.append(None)
+                todo.append(i)
+
+        if len(todo) == 1:
+            i = todo[0]
+            estimates[i] = self._allocators[i].time_estimate(resource_desc)
+        elif todo:
+            credentials = get_credentials()
+            reply_q = Queue.Queue()
+            for i in todo:
+                worker_q = WorkerPool.get(one_shot=True)
+                worker_q.put((self._get_estimate,
+                              (i, self._allocators[i], resource_desc,
+                               credentials), {}, reply_q))
+            for i in todo:
+                worker_q, retval, exc, trace = reply_q.get()
+                if exc:
+                    self._logger.error(trace)
+                    raise exc
+                estimates[retval[0]] = retval[1]
+
+        for i in todo:
+            allocator = self._allocators[i]
+            self._estimates.setdefault(allocator, {})[key] = \
+                (now, estimates[i])
+        return estimates
+
+    @staticmethod
+    def _get_estimate(index, allocator, resource_desc, credentials):
+        """ Return ``(index, time_estimate)`` from `allocator`. """
+        set_credentials(credentials)
+        return (index, allocator.time_estimate(resource_desc))
+
     @staticmethod
     def release(server):
         """
@@ -439,6 +506,11 @@ class ResourceAllocationManager(object):
             self._logger.error("Can't release %r: %r", server_info['name'], exc)
         server._close.cancel()
 
+        # Wake up any allocations waiting for resources.
+        with ResourceAllocationManager._lock:
+            self._estimates.pop(allocator, None)
+            ResourceAllocationManager._released.notify_all()
+
     @staticmethod
     def add_remotes(server, prefix=''):
         """
@@ -820,8 +892,21 @@ class FactoryAllocator(ResourceAllocator):
     allow_shell: bool
         If True, :meth:`execute_command` and :meth:`load_model` are allowed
         in created servers. Use with caution!
+
+    encrypt_loopback: bool
+        If False, deployed servers don't encrypt loopback or pipe connections,
+        avoiding encryption overhead for purely local communication.
+
+    pool_size: int
+        Maximum number of released servers kept idle for reuse by later
+        deployments (see :class:`ObjServerFactory`).
+
+    max_uses: int
+        If >0, the number of deployments after which a pooled server is
+        shut-down rather than reused.
     """
-    def __init__(self, name, authkey=None, allow_shell=False):
+    def __init__(self, name, authkey=None, allow_shell=False,
+                 encrypt_loopback=True, pool_size=0, max_uses=0):
         super(FactoryAllocator, self).__init__(name)
 
         if authkey is None:
@@ -829,7 +914,10 @@ class FactoryAllocator(ResourceAllocator):
             if authkey is None:
                 authkey = 'PublicKey'
                 multiprocessing.current_process().authkey = authkey
-        self.factory = ObjServerFactory(name, authkey, allow_shell)
+        self.factory = ObjServerFactory(name, authkey, allow_shell,
+                                        encrypt_loopback=encrypt_loopback,
+                                        pool_size=pool_size,
+                                        max_uses=max_uses)
 
     def configure(self, cfg):
         """
@@ -840,7 +928,8 @@ class FactoryAllocator(ResourceAllocator):
             Configuration data is located under the section matching
             this allocator's `name`.
 
-        Allows modifying `auth_key` and `allow_shell`.
+        Allows modifying `auth_key`, `allow_shell`, `encrypt_loopback`,
+        `pool_size`, and `max_uses`.
         """
         if cfg.has_option(self.name, 'authkey'):
             value = cfg.get(self.name, 'authkey')
@@ -852,6 +941,29 @@ class FactoryAllocator(ResourceAllocator):
             self._logger.debug('    allow_shell: %s', value)
             self.factory._allow_shell = value
 
+        if cfg.has_option(self.name, 'encrypt_loopback'):
+            value = cfg.getboolean(self.name, 'encrypt_loopback')
+            self._logger.debug('    encrypt_loopback: %s', value)
+            self.factory._encrypt_loopback = value
+
+        if cfg.has_option(self.name, 'pool_size'):
+            value = cfg.getint(self.name, 'pool_size')
+            self._logger.debug('    pool_size: %s', value)
+            if value >= 0:
+                self.factory.pool_size = value
+            else:
+                raise ValueError('%s: pool_size must be >= 0, got %d'
+                                 % (self.name, value))
+
+        if cfg.has_option(self.name, 'max_uses'):
+            value = cfg.getint(self.name, 'max_uses')
+            self._logger.debug('    max_uses: %s', value)
+            if value >= 0:
+                self.factory.max_uses = value
+            else:
+                raise ValueError('%s: max_uses must be >= 0, got %d'
+                                 % (self.name, value))
+
     @rbac('*')
     def deploy(self, name, resource_desc, criteria):
         """
@@ -887,6 +999,18 @@ class FactoryAllocator(ResourceAllocator):
         """
         self.factory.release(server)
 
+    @rbac(('owner', 'user'))
+    def prestart(self, count):
+        """
+        Start servers for the current user ahead of time, so up to `count`
+        subsequent deployments don't wait for server startup.
+        Returns the number of servers started.
+
+        count: int
+            Number of idle servers wanted (limited by `pool_size`).
+        """
+        return self.factory.prestart(count)
+
 
 class LocalAllocator(FactoryAllocator):
     """
@@ -912,6 +1036,16 @@ class LocalAllocator(FactoryAllocator):
         If True, :meth:`execute_command` and :meth:`load_model` are allowed
         in created servers. Use with caution!
 
+    encrypt_loopback: bool
+        If False, deployed servers don't encrypt loopback or pipe connections.
+
+    pool_size: int
+        Maximum number of released servers kept idle for reuse.
+
+    max_uses: int
+        If >0, the number of deployments after which a pooled server is
+        shut-down rather than reused.
+
     Resource configuration file entry equivalent to the default
     ``LocalHost`` allocator::
 
@@ -925,8 +1059,11 @@ class LocalAllocator(FactoryAllocator):
     """
 
     def __init__(self, name='LocalAllocator', total_cpus=0, max_load=1.0,
-                 authkey=None, allow_shell=False):
-        super(LocalAllocator, self).__init__(name, authkey, allow_shell)
+                 authkey=None, allow_shell=False, encrypt_loopback=True,
+                 pool_size=0, max_uses=0):
+        super(LocalAllocator, self).__init__(name, authkey, allow_shell,
+                                             encrypt_loopback, pool_size,
+                                             max_uses)
         if total_cpus > 0:
             self.total_cpus = total_cpus
         else:
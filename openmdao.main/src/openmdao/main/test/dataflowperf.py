@@ -0,0 +1,74 @@
+"""
+Time Dataflow ordering while building and editing large models.
+"""
+
+import random
+import time
+
+from openmdao.main.api import Assembly, Component, set_as_top
+from openmdao.lib.datatypes.api import Float
+
+
+class Simple(Component):
+    """ Component with a few inputs and an output. """
+
+    x = Float(0.0, iotype='in')
+    y = Float(0.0, iotype='in')
+    z = Float(0.0, iotype='in')
+    out = Float(0.0, iotype='out')
+
+    def execute(self):
+        self.out = self.x + self.y + self.z
+
+
+def run_test(ncomps, query_interval=10):
+    """
+    Build a model with `ncomps` randomly connected components, requesting
+    the dataflow ordering every `query_interval` steps, then disconnect
+    and reconnect some of them. Returns (build_time, edit_time).
+    """
+    random.seed(10)
+    top = set_as_top(Assembly())
+    workflow = top.driver.workflow
+    names = []
+
+    start = time.time()
+    for i in range(ncomps):
+        name = 'c%d' % i
+        top.add(name, Simple())
+        workflow.add(name)
+        if names:
+            for inp in ('x', 'y'):
+                src = random.choice(names[-20:])
+                top.connect('%s.out' % src, '%s.%s' % (name, inp))
+        names.append(name)
+        if i % query_interval == 0:
+            list(workflow)
+    list(workflow)
+    build_time = time.time() - start
+
+    start = time.time()
+    for i in range(min(ncomps, 1000)):
+        name = random.choice(names[1:])
+        top.disconnect('%s.x' % name)
+        src = names[random.randrange(names.index(name))]
+        top.connect('%s.out' % src, '%s.x' % name)
+        if i % query_interval == 0:
+            list(workflow)
+    list(workflow)
+    edit_time = time.time() - start
+
+    return (build_time, edit_time)
+
+
+def main():
+    """ Time Dataflow ordering for various model sizes. """
+    for ncomps in (100, 1000, 10000):
+        build_time, edit_time = run_test(ncomps)
+        print '%d components: build %g sec, edit %g sec' \
+              % (ncomps, build_time, edit_time)
+
+
+if __name__ == '__main__':
+    main()
+
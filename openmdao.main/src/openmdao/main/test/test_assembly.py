@@ -12,6 +12,7 @@ from openmdao.main.datatypes.api import Float, Int, Str, Slot, List, Array
 from openmdao.util.decorators import add_delegate
 from openmdao.main.hasobjective import HasObjective
 from openmdao.util.log import enable_trace, disable_trace
+from openmdao.units import convert_units
 
 
 class Multiplier(Component):
@@ -788,6 +789,45 @@ subassy.comp3: ReRun.2-3.2-2.2-1"""
                
         t = set_as_top(TestA())
 
+    def test_transfer_plan(self):
+        class Source(Component):
+            length = Float(2.5, iotype='out', units='ft')
+            temp = Float(20., iotype='out', units='degC')
+            arr = Array([1., 2., 3.], iotype='out')
+
+            def execute(self):
+                pass
+            
+        class Dest(Component):
+            length = Float(0., iotype='in', units='inch')
+            temp = Float(0., iotype='in', units='degF')
+            x = Float(0., iotype='in')
+            arr = Array([0., 0., 0.], iotype='in')
+
+            def execute(self):
+                pass
+            
+        top = set_as_top(Assembly())
+        top.add('src', Source())
+        top.add('dest', Dest())
+        top.driver.workflow.add(['src', 'dest'])
+        top.connect('src.length', 'dest.length')
+        top.connect('src.temp', 'dest.temp')
+        top.connect('src.arr[2]', 'dest.x')
+        top.connect('src.arr', 'dest.arr')
+        top.run()
+        
+        self.assertEqual(top.dest.length, convert_units(2.5, 'ft', 'inch'))
+        self.assertEqual(top.dest.temp, convert_units(20., 'degC', 'degF'))
+        self.assertEqual(top.dest.x, 3.)
+        self.assertEqual(list(top.dest.arr), [1., 2., 3.])
+        for dest in ('dest.length', 'dest.temp', 'dest.x', 'dest.arr'):
+            self.assertTrue(top._transfers[dest][1] is not None)
+            
+        # plan is discarded when the configuration changes
+        top.disconnect('src.length', 'dest.length')
+        self.assertEqual(top._transfers, {})
+        
     def test_tracing(self):
         # Check tracing of iteration coordinates.
         top = Assembly()
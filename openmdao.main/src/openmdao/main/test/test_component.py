@@ -2,6 +2,7 @@
 Test of Component.
 """
 
+import cPickle as pickle
 import logging
 import os.path
 import sys
@@ -75,6 +76,35 @@ class TestCase(unittest.TestCase):
         comp.disconnect('parent.blah', 'cont.dyntrait')
         self.assertEqual(vset, set(comp._valid_dict.keys()))
         
+    def test_invalid_tracking(self):
+        comp = self.comp
+        invalid = lambda: set([n for n,v in comp._valid_dict.items() if not v])
+        self.assertEqual(comp._valid_dict.invalid, set(['xout']))
+        self.assertEqual(comp.list_outputs(valid=False), ['xout'])
+        self.assertEqual(comp.list_inputs(valid=False), [])
+
+        comp.set_valid(['x'], False)
+        self.assertEqual(comp._valid_dict.invalid, invalid())
+        self.assertEqual(comp.list_inputs(valid=False), ['x'])
+
+        comp.connect('parent.blah', 'cont.dyntrait')
+        self.assertEqual(comp._valid_dict.invalid, invalid())
+        self.assertTrue('cont.dyntrait' in comp._valid_dict.invalid)
+        comp.disconnect('parent.blah', 'cont.dyntrait')
+        self.assertEqual(comp._valid_dict.invalid, invalid())
+
+        comp.run()
+        self.assertEqual(comp._valid_dict.invalid, set())
+        self.assertEqual(comp.is_valid(), True)
+        comp.x = 3.
+        self.assertEqual(comp._valid_dict.invalid, set(['xout']))
+
+        copy = pickle.loads(pickle.dumps(comp, -1))
+        self.assertEqual(copy._valid_dict.invalid, set(['xout']))
+        copy._valid_dict['xout'] = True
+        self.assertEqual(copy._valid_dict.invalid, set())
+        self.assertEqual(comp._valid_dict.invalid, set(['xout']))
+
     def test_illegal_directory(self):
         logging.debug('')
         logging.debug('test_bad_directory')
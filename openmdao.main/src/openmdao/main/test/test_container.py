@@ -10,6 +10,7 @@ import copy
 from enthought.traits.api import HasTraits
 
 import openmdao.util.eggsaver as constants
+from openmdao.main.component import Component
 from openmdao.main.container import Container, get_default_name, \
                                     deep_hasattr, get_default_name, find_name, \
                                     find_trait_and_value, _get_entry_group, \
@@ -85,6 +86,19 @@ class ContainerTestCase(unittest.TestCase):
         """this teardown function will be called after each test"""
         self.root = None
 
+    def test_get_set_many(self):
+        # Indexed set() needs a Component (for validity bookkeeping).
+        comp = Component()
+        comp.add('cont', Container())
+        comp.cont.add('number', Float(3.14, iotype='in'))
+        comp.add('arr', List([1., 2., 3.], iotype='in'))
+        comp.set_many([('cont.number', 2.5), ('arr[1]', 7.)])
+        self.assertEqual(comp.cont.number, 2.5)
+        self.assertEqual(comp.arr, [1., 7., 3.])
+        self.assertEqual(comp.get_many(['cont.number', 'arr[1]',
+                                        'cont.number*2']),
+                         [2.5, 7., 5.])
+
     def test_deepcopy(self):
         cont = MyContainer()
         self.assertEqual(cont.dyntrait, 9.)
@@ -240,6 +240,27 @@ class DepGraphTestCase(unittest.TestCase):
         dep.disconnect('3.4*B.d+2.3')
         self.assertEqual(dep.list_connections(), [])
         
+    def test_component_graph(self):
+        graph = self.dep.component_graph(set(['A', 'B', 'D']))
+        self.assertEqual(set(graph.nodes()), set(['A', 'B', 'D']))
+        self.assertEqual(set(graph.edges()), set([('A','B'), ('B','D')]))
+        self.assertEqual(set(self.dep.component_edges('D', set(['B','C']))),
+                         set([('B','D'), ('C','D')]))
+        
+    def test_changes(self):
+        count = self.dep.change_count
+        self.dep.connect('A.d', 'C.a')
+        self.dep.connect('A.d', 'B.d')  # A and B already linked
+        self.dep.disconnect('A.c', 'B.b')  # A.d still connected to B
+        self.dep.disconnect('B.c', 'D.a')
+        self.assertEqual(self.dep.get_changes(count), 
+                         [('A','C',True), ('B','D',False)])
+        count = self.dep.change_count
+        self.dep.remove('D')
+        self.assertEqual(set(self.dep.get_changes(count)),
+                         set([('C','D',False), ('D','@bout',False)]))
+        self.assertEqual(self.dep.get_changes(-1), None)
+        
     def test_dump(self):
         s = StringIO.StringIO()
         self.dep.dump(s)
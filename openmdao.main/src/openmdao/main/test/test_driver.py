@@ -5,6 +5,7 @@ import unittest
 from enthought.traits.api import Event
 from openmdao.main.api import Assembly, Component, Driver, set_as_top
 from openmdao.main.container import _get_entry_group
+from openmdao.main.interfaces import implements, ICaseRecorder
 
 
 class EventComp(Component):
@@ -20,6 +21,25 @@ class EventComp(Component):
     def execute(self):
         pass
 
+class BadComp(Component):
+    def execute(self):
+        raise RuntimeError('execute failed')
+
+class BadFlushRecorder(object):
+    implements(ICaseRecorder)
+
+    def record(self, case):
+        pass
+
+    def flush(self):
+        raise IOError('flush failed')
+
+    def get_iterator(self):
+        return []
+
+    def close(self):
+        pass
+
 class DriverTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -48,6 +68,22 @@ class DriverTestCase(unittest.TestCase):
     def test_default_value_force(self):
         #driver default value should be True
         self.assertTrue(self.asm.driver.force_execute)
+
+    def test_flush_error(self):
+        # A failing flush shouldn't hide the exception from the run.
+        self.asm.add('bad', BadComp())
+        self.asm.driver.workflow.add('bad')
+        self.asm.driver.recorders = [BadFlushRecorder()]
+        try:
+            self.asm.run()
+        except RuntimeError as exc:
+            self.assertTrue('execute failed' in str(exc))
+        else:
+            self.fail('RuntimeError expected')
+
+        # With no other exception the flush error is raised.
+        self.asm.driver.workflow.remove('bad')
+        self.assertRaises(IOError, self.asm.run)
         
 if __name__ == "__main__":
     unittest.main()
@@ -4,7 +4,8 @@ import ast
 
 from openmdao.main.numpy_fallback import array
 from openmdao.main.datatypes.array import Array
-from openmdao.main.expreval import ExprEvaluator, ConnectedExprEvaluator, ExprExaminer
+from openmdao.main.expreval import ExprEvaluator, ConnectedExprEvaluator, ExprExaminer, \
+                                   expr_cache
 from openmdao.main.printexpr import ExprPrinter, transform_expression
 from openmdao.main.api import Assembly, Container, Component, set_as_top
 from openmdao.main.datatypes.api import Float, List, Slot, Dict
@@ -528,6 +529,26 @@ class ExprEvalTestCase(unittest.TestCase):
         assert_rel_error(self, grad['comp1.b2d[0][1]'], 12.0, 0.00001)
         assert_rel_error(self, grad['comp1.b2d[1][1]'], 4.0, 0.00001)
 
+    def test_eval_gradient_cached(self):
+        top = set_as_top(Assembly())
+        top.add('comp1', Simple())
+        top.add('comp2', Simple())
+        top.comp1.c = 1.0/3.0
+
+        # Values aren't rounded by a round trip through text.
+        exp = ExprEvaluator('comp2.b*comp1.c**2', top.driver)
+        grad = exp.evaluate_gradient(scope=top)
+        assert_rel_error(self, grad['comp2.b'], top.comp1.c**2, 1e-15)
+        assert_rel_error(self, grad['comp1.c'], 10.0*top.comp1.c, 1e-15)
+
+        # Compiled gradients are shared, and see new values.
+        top.comp2.b = 6.0
+        hits = expr_cache.hits
+        exp = ExprEvaluator('comp2.b*comp1.c**2', top.driver)
+        grad = exp.evaluate_gradient(scope=top)
+        self.assertTrue(expr_cache.hits > hits)
+        assert_rel_error(self, grad['comp1.c'], 12.0*top.comp1.c, 1e-15)
+
     def test_scope_transform(self):
         exp = ExprEvaluator('myvar+abs(comp.x)*a.a1d[2]', self.top)
         self.assertEqual(new_text(exp), "scope.get('myvar')+abs(scope.get('comp.x'))*scope.get('a.a1d',[(0,2)])")
@@ -538,6 +559,46 @@ class ExprEvalTestCase(unittest.TestCase):
         xformed = exp.scope_transform(self.top.comp, self.top)
         self.assertEqual(xformed, 'var+abs(comp.x)*a.a1d[2]')
         
+    def test_cache(self):
+        expr_cache.clear()
+        self.top.comp.x = 2.
+        ex = ExprEvaluator('comp.x*pi', self.top)
+        self.assertEqual(ex.evaluate(), 2.*math.pi)
+        self.assertEqual((expr_cache.hits, expr_cache.misses), (0, 1))
+        ex = ExprEvaluator('comp.x*pi', self.top)
+        self.assertEqual(ex.evaluate(), 2.*math.pi)
+        self.assertEqual(ex.get_referenced_varpaths(), set(['comp.x']))
+        self.assertEqual((expr_cache.hits, expr_cache.misses), (1, 1))
+        
+        # a scope attribute hides the math constant, so this must be parsed
+        # separately
+        self.top.comp.add('pi', Float(3., iotype='in'))
+        self.top.comp.y = 5.
+        ex = ExprEvaluator('y*pi', self.top.comp)
+        self.assertEqual(ex.evaluate(), 15.)
+        ex = ExprEvaluator('y*pi', self.top.a)
+        self.assertEqual(ex.get_referenced_varpaths(), set(['y']))
+        ex = ExprEvaluator('y*pi', self.top.comp)
+        self.assertEqual(ex.evaluate(), 15.)
+        self.assertEqual(ex.get_referenced_varpaths(), set(['y', 'pi']))
+        self.assertEqual((expr_cache.hits, expr_cache.misses), (2, 3))
+        
+        # least recently used entries are discarded
+        maxsize = expr_cache.maxsize
+        try:
+            expr_cache.maxsize = 2
+            ExprEvaluator('comp.x+1', self.top).evaluate()
+            ExprEvaluator('comp.x+2', self.top).evaluate()
+            ExprEvaluator('comp.x+1', self.top).evaluate()
+            ExprEvaluator('comp.x+3', self.top).evaluate()
+            self.assertEqual(len(expr_cache), 2)
+            ExprEvaluator('comp.x+1', self.top).evaluate()
+            self.assertEqual((expr_cache.hits, expr_cache.misses), (4, 6))
+            ExprEvaluator('comp.x+2', self.top).evaluate()
+            self.assertEqual((expr_cache.hits, expr_cache.misses), (4, 7))
+        finally:
+            expr_cache.maxsize = maxsize
+        
     def test_connected_expr(self):
         try:
             ConnectedExprEvaluator("var1+var2", self.top)._parse()
@@ -6,11 +6,17 @@ import logging
 import os.path
 import socket
 import sys
+import threading
 import unittest
 import nose
 
+from multiprocessing import Pipe
+
+import numpy
+
 from openmdao.main.mp_util import read_server_config, read_allowed_hosts, \
-                                  is_legal_connection
+                                  is_legal_connection, is_loopback, \
+                                  send_message, recv_message
 
 from openmdao.util.publickey import make_private, HAVE_PYWIN32
 from openmdao.util.testutil import assert_raises
@@ -125,6 +131,48 @@ class TestCase(unittest.TestCase):
             finally:
                 os.remove('hosts.allow')
 
+    def test_wire(self):
+        logging.debug('')
+        logging.debug('test_wire')
+
+        big = numpy.arange(20000.).reshape((200, 100))
+        msg = ('#RETURN', {'big': big, 'same': big, 'fortran': big.T,
+                           'strided': big[:, ::2], 'small': numpy.ones(3),
+                           'text': ' ' * 100000})
+        parent, child = Pipe()
+        for session_key in ('', '0123456789abcdef'):
+            for wire in ('pickle', 'frames'):
+                for compress in (False, True):
+                    sender = threading.Thread(target=send_message,
+                                              args=(parent, msg, session_key,
+                                                    wire, compress))
+                    sender.start()
+                    kind, result = recv_message(child, session_key, wire)
+                    sender.join()
+                    self.assertEqual(kind, '#RETURN')
+                    self.assertEqual(result['text'], msg[1]['text'])
+                    for name in ('big', 'fortran', 'strided', 'small'):
+                        self.assertTrue((result[name] == msg[1][name]).all())
+                    self.assertTrue(result['same'] is result['big'])
+                    self.assertTrue(result['fortran'].flags.f_contiguous)
+                    result['big'][0, 0] = -1.  # Received arrays are writable.
+
+        # Unencrypted data is rejected when a session key is in use.
+        for key in ('', 'x'):  # Bare pickle, unencrypted frame.
+            sender = threading.Thread(target=send_message,
+                                      args=(parent, {key: 1}, '',
+                                            'frames', bool(key)))
+            sender.start()
+            assert_raises(self,
+                          "recv_message(child, '0123456789abcdef', 'frames')",
+                          globals(), locals(), RuntimeError,
+                          'received unencrypted data with session key')
+            sender.join()
+
+        self.assertTrue(is_loopback('/tmp/pipe'))
+        self.assertTrue(is_loopback(('127.0.0.1', 0)))
+        self.assertTrue(is_loopback(('localhost', 0)))
+
 
 if __name__ == '__main__':
     sys.argv.append('--cover-package=openmdao.main')
@@ -91,6 +91,55 @@ class TestCase(unittest.TestCase):
             if not keep_dirs:
                 shutil.rmtree(testdir)
 
+    def test_pool(self):
+        logging.debug('')
+        logging.debug('test_pool')
+
+        testdir = 'test_pool'
+        if os.path.exists(testdir):
+            shutil.rmtree(testdir)
+        os.mkdir(testdir)
+        os.chdir(testdir)
+
+        factory = None
+        try:
+            factory = ObjServerFactory(pool_size=1, max_uses=2)
+            self.assertEqual(factory.prestart(2), 1)
+            self.assertEqual(factory.prestart(2), 0)
+
+            # Pre-started server is handed out, scrubbed and reused.
+            server = factory.create('')
+            pid = server.pid
+            startup_files = sorted(server.listdir('.'))
+            with server.open('junk', 'w') as out:
+                out.write('junk')
+            factory.release(server)
+
+            server = factory.create('')
+            self.assertEqual(server.pid, pid)
+            self.assertEqual(sorted(server.listdir('.')), startup_files)
+
+            # Second use, so not returned to the pool.
+            factory.release(server)
+            server = factory.create('')
+            self.assertNotEqual(server.pid, pid)
+
+            # Pool is full, so the extra server is shut-down.
+            extra = factory.create('')
+            factory.release(server)
+            factory.release(extra)
+            self.assertEqual(len(factory._managers), 1)
+
+        finally:
+            if factory is not None:
+                factory.cleanup()
+            SimulationRoot.chroot('..')
+            if sys.platform == 'win32':
+                time.sleep(2)  # Wait for process shutdown.
+            keep_dirs = int(os.environ.get('OPENMDAO_KEEPDIRS', '0'))
+            if not keep_dirs:
+                shutil.rmtree(testdir)
+
     def test_server(self):
         logging.debug('')
         logging.debug('test_server')
@@ -218,6 +267,45 @@ class TestCase(unittest.TestCase):
             SimulationRoot.chroot('..')
             shutil.rmtree(testdir)
 
+    def test_reset(self):
+        logging.debug('')
+        logging.debug('test_reset')
+
+        testdir = 'test_reset'
+        if os.path.exists(testdir):
+            shutil.rmtree(testdir)
+        os.mkdir(testdir)
+        os.chdir(testdir)
+
+        orig_path = sys.path[:]
+        orig_environ = os.environ.copy()
+        try:
+            server = ObjServer()
+
+            # Simulate what loading a model egg leaves behind.
+            os.mkdir('model')
+            with open(os.path.join('model', 'reset_model.py'), 'w') as out:
+                out.write('VALUE = 42\n')
+            sys.path.insert(0, 'model')
+            os.environ['RESET_TEST'] = '1'
+            import reset_model
+            self.assertEqual(reset_model.VALUE, 42)
+
+            server.reset()
+
+            self.assertFalse('reset_model' in sys.modules)
+            self.assertEqual(sys.path, orig_path)
+            self.assertFalse('RESET_TEST' in os.environ)
+            self.assertFalse(os.path.exists('model'))
+            self.assertTrue('logging' in sys.modules)
+        finally:
+            sys.path[:] = orig_path
+            os.environ.clear()
+            os.environ.update(orig_environ)
+            sys.modules.pop('reset_model', None)
+            SimulationRoot.chroot('..')
+            shutil.rmtree(testdir)
+
     def test_shell(self):
         logging.debug('')
         logging.debug('test_shell')
@@ -14,6 +14,8 @@ import shutil
 import socket
 import sys
 import tempfile
+import threading
+import time
 import unittest
 
 from openmdao.main.mp_util import read_server_config
@@ -27,6 +29,46 @@ from openmdao.util.testutil import assert_raises, find_python
 SSH_USERS = []
 
 
+class _Closer(object):
+    """ Stands in for a proxy's finalizer. """
+
+    def cancel(self):
+        pass
+
+
+class _Server(object):
+    """ Stands in for a deployed server proxy. """
+
+    def __init__(self, name):
+        self.name = name
+        self.pid = 0
+        self.host = 'slots'
+        self._close = _Closer()
+
+
+class SlotAllocator(ResourceAllocator):
+    """ Allocator with a fixed number of servers, counting estimates. """
+
+    def __init__(self, name, slots):
+        super(SlotAllocator, self).__init__(name)
+        self.slots = slots
+        self.estimates = 0
+
+    def time_estimate(self, resource_desc):
+        self.estimates += 1
+        retcode, info = self.check_compatibility(resource_desc)
+        if retcode != 0:
+            return (retcode, info)
+        return (0 if self.slots else -1, {'hostnames': [self.name]})
+
+    def deploy(self, name, resource_desc, criteria):
+        self.slots -= 1
+        return _Server(name)
+
+    def release(self, server):
+        self.slots += 1
+
+
 class TestCase(unittest.TestCase):
     """ Test resource allocation. """
 
@@ -134,6 +176,34 @@ class TestCase(unittest.TestCase):
                                        'localhost':False})
         self.assertEqual(hostnames, None)
         
+    def test_estimates(self):
+        logging.debug('')
+        logging.debug('test_estimates')
+
+        allocator = SlotAllocator('Slots', 1)
+        RAM.add_allocator(allocator)
+        rdesc = {'allocator': 'Slots'}
+
+        # Recent estimates are reused.
+        self.assertEqual(RAM.get_hostnames(rdesc), ['Slots'])
+        self.assertEqual(RAM.get_hostnames(rdesc), ['Slots'])
+        self.assertEqual(allocator.estimates, 1)
+
+        # Deployment invalidates them.
+        server, info = RAM.allocate(rdesc)
+        self.assertEqual(allocator.estimates, 1)
+        self.assertEqual(allocator.slots, 0)
+
+        # A waiting allocation proceeds as soon as a server is released.
+        start = time.time()
+        threading.Timer(0.1, RAM.release, args=(server,)).start()
+        server2, info = RAM.allocate(rdesc)
+        self.assertTrue(time.time() - start < 0.9)
+        self.assertEqual(allocator.slots, 0)
+        RAM.release(server2)
+        self.assertEqual(allocator.slots, 1)
+        RAM.remove_allocator('Slots')
+
     def test_resources(self):
         logging.debug('')
         logging.debug('test_resources')
@@ -2,11 +2,14 @@
 Test run/step/stop aspects of a simple workflow.
 """
 
+import threading
+import time
 import unittest
 
 from openmdao.main.api import Assembly, Component, set_as_top
 from openmdao.main.exceptions import RunStopped
-from openmdao.lib.datatypes.api import Int, Bool
+from openmdao.main.rbac import get_credentials, set_credentials
+from openmdao.lib.datatypes.api import Int, Bool, Float
 
 # pylint: disable-msg=E1101,E1103
 # "Instance of <class> has no <attr> member"
@@ -31,6 +34,19 @@ class TestComponent(Component):
 
 
 
+class ExprComp(TestComponent):
+    """ Component with dependencies like those from ExprEvaluators. """
+
+    _delegates_ = {}
+
+    def __init__(self):
+        super(ExprComp, self).__init__()
+        self.expr_depends = []
+
+    def get_expr_depends(self):
+        return self.expr_depends
+
+
 class Model(Assembly):
     """ Just a simple three-component workflow. """
 
@@ -181,6 +197,205 @@ class TestCase(unittest.TestCase):
             self.fail('Expected StopIteration')
 
 
+    def test_order_changes(self):
+        names = lambda: [comp.name for comp in self.model.driver.workflow]
+        self.assertEqual(names(), ['comp_a', 'comp_b', 'comp_c'])
+
+        self.model.disconnect('comp_b.total_executions', 'comp_c.dummy_input')
+        self.model.connect('comp_c.total_executions', 'comp_a.dummy_input')
+        self.assertEqual(names(), ['comp_c', 'comp_a', 'comp_b'])
+
+        self.model.add('comp_d', TestComponent())
+        self.model.driver.workflow.add('comp_d')
+        self.assertEqual(names(), ['comp_c', 'comp_a', 'comp_b', 'comp_d'])
+        self.model.connect('comp_d.total_executions', 'comp_c.dummy_input')
+        self.assertEqual(names(), ['comp_d', 'comp_c', 'comp_a', 'comp_b'])
+
+        # Same order as a freshly built model.
+        self.model.driver.workflow.remove('comp_c')
+        self.assertEqual(names(), ['comp_a', 'comp_b', 'comp_d'])
+
+        try:
+            self.model.connect('comp_b.total_executions', 'comp_d.dummy_input')
+        except Exception, err:
+            self.assertTrue('circular dependency' in str(err))
+        else:
+            self.fail('Expected circular dependency error')
+
+    def test_expr_edges(self):
+        workflow = self.model.driver.workflow
+        names = lambda: [comp.name for comp in workflow]
+        edges = lambda: set(workflow._get_collapsed_graph().edges())
+
+        self.model.add('comp_e', ExprComp())
+        workflow.add('comp_e')
+        self.model.comp_e.expr_depends = [('comp_e', 'comp_a'),
+                                          ('comp_b', 'comp_c')]
+        workflow.config_changed()
+        self.assertEqual(names(), ['comp_e', 'comp_a', 'comp_b', 'comp_c'])
+
+        # The connection still needs comp_b -> comp_c.
+        self.model.comp_e.expr_depends = [('comp_e', 'comp_a')]
+        workflow.config_changed()
+        self.assertTrue(('comp_b', 'comp_c') in edges())
+
+        # And now the expression does.
+        self.model.comp_e.expr_depends = [('comp_e', 'comp_a'),
+                                          ('comp_b', 'comp_c')]
+        workflow.config_changed()
+        self.model.disconnect('comp_b.total_executions', 'comp_c.dummy_input')
+        self.assertTrue(('comp_b', 'comp_c') in edges())
+        self.assertEqual(names(), ['comp_e', 'comp_a', 'comp_b', 'comp_c'])
+
+        # Until nothing does. Order matches a fresh build.
+        self.model.comp_e.expr_depends = [('comp_e', 'comp_a')]
+        workflow.config_changed()
+        self.assertFalse(('comp_b', 'comp_c') in edges())
+        order = names()
+        workflow._reset()
+        self.assertEqual(names(), order)
+
+
+class SleepComponent(Component):
+    """ Sleeps, then records when it ran. """
+
+    x1 = Float(0., iotype='in')
+    x2 = Float(0., iotype='in')
+    x3 = Float(0., iotype='in')
+    delay = Float(0.2, iotype='in')
+    set_stop = Bool(False, iotype='in')
+    set_error = Bool(False, iotype='in')
+    y = Float(0., iotype='out')
+
+    def __init__(self, log):
+        super(SleepComponent, self).__init__()
+        self.log = log
+
+    def execute(self):
+        start = time.time()
+        time.sleep(self.delay)
+        if self.set_error:
+            raise RuntimeError('%s failed' % self.name)
+        if self.set_stop:
+            self.parent.driver.stop()
+        self.y = self.x1 + self.x2 + self.x3 + 1.
+        self.credentials = get_credentials()
+        self.log.append((self.name, self.get_itername(), start, time.time(),
+                         threading.current_thread().name))
+
+
+class FanModel(Assembly):
+    """ comp_a feeds three independent components which feed comp_c. """
+
+    def configure(self):
+        self.log = []
+        names = ['comp_a', 'comp_b1', 'comp_b2', 'comp_b3', 'comp_c']
+        for name in names:
+            self.add(name, SleepComponent(self.log))
+        self.driver.workflow.add(names)
+        for i in (1, 2, 3):
+            self.connect('comp_a.y', 'comp_b%d.x1' % i)
+            self.connect('comp_b%d.y' % i, 'comp_c.x%d' % i)
+
+
+class ConcurrentTestCase(unittest.TestCase):
+    """ Test running independent components concurrently. """
+
+    def setUp(self):
+        self.model = set_as_top(FanModel())
+        self.model.comp_a.delay = 0.
+        self.model.comp_c.delay = 0.
+        self.model.driver.workflow.max_concurrency = 3
+
+    def times(self):
+        return dict([(name, (start, end))
+                     for name, itername, start, end, thread in self.model.log])
+
+    def test_concurrent(self):
+        self.model.run()
+        self.assertEqual(self.model.comp_c.y, 7.)
+
+        # Iteration coordinates match a sequential run.
+        log = sorted(self.model.log, key=lambda entry: entry[1])
+        self.assertEqual([(name, itername) for name, itername, _, _, _ in log],
+                         [('comp_a', '1-1'), ('comp_b1', '1-2'),
+                          ('comp_b2', '1-3'), ('comp_b3', '1-4'),
+                          ('comp_c', '1-5')])
+
+        times = self.times()
+        starts = [times['comp_b%d' % i][0] for i in (1, 2, 3)]
+        ends = [times['comp_b%d' % i][1] for i in (1, 2, 3)]
+        self.assertTrue(max(starts) < min(ends))
+        self.assertTrue(times['comp_a'][1] <= min(starts))
+        self.assertTrue(times['comp_c'][0] >= max(ends))
+
+        # Nothing is invalid, so nothing reruns.
+        del self.model.log[:]
+        self.model.run()
+        self.assertEqual(self.model.log, [])
+
+        # Only comp_b2 and its downstream are invalidated.
+        self.model.comp_b2.x2 = 1.
+        self.model.run()
+        self.assertEqual([entry[0] for entry in self.model.log],
+                         ['comp_b2', 'comp_c'])
+        self.assertEqual(self.model.comp_c.y, 8.)
+
+    def test_exclusive(self):
+        self.model.comp_b2.thread_safe = False
+        self.model.comp_b3.directory = '.'
+        self.model.run()
+        times = self.times()
+        for exclusive in ('comp_b2', 'comp_b3'):
+            start, end = times[exclusive]
+            for name, (other_start, other_end) in times.items():
+                if name != exclusive:
+                    self.assertTrue(other_end <= start or other_start >= end)
+        threads = dict([(entry[0], entry[4]) for entry in self.model.log])
+        self.assertEqual(threads['comp_b2'], threading.current_thread().name)
+
+    def test_stop(self):
+        self.model.comp_b1.set_stop = True
+        try:
+            self.model.run()
+        except RunStopped, exc:
+            self.assertEqual(str(exc), 'Stop requested')
+        else:
+            self.fail('Expected RunStopped')
+        self.assertEqual(sorted(self.times().keys()),
+                         ['comp_a', 'comp_b1', 'comp_b2', 'comp_b3'])
+
+    def test_error(self):
+        self.model.comp_b2.set_error = True
+        try:
+            self.model.run()
+        except RuntimeError, exc:
+            self.assertEqual(str(exc), 'comp_b2 failed')
+        else:
+            self.fail('Expected RuntimeError')
+        self.assertFalse('comp_c' in self.times())
+
+    def test_credentials(self):
+        class RemoteCredentials(object):
+            user = 'somebody@elsewhere'
+            client_creds = None
+
+        credentials = RemoteCredentials()
+        thread = threading.current_thread()
+        saved = getattr(thread, 'credentials', None)
+        set_credentials(credentials)
+        try:
+            self.model.run()
+        finally:
+            if saved is None:
+                del thread.credentials
+            else:
+                set_credentials(saved)
+        for name, itername, start, end, thread_name in self.model.log:
+            comp = getattr(self.model, name)
+            self.assertTrue(comp.credentials is credentials)
+
+
 if __name__ == '__main__':
     import nose
     import sys
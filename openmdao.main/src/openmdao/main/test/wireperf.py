@@ -0,0 +1,111 @@
+"""
+Run latency & thruput tests of the mp_support wire formats.
+
+Messages are echoed by a child process over a :mod:`multiprocessing` pipe,
+so this measures only serialization, encryption, and transport overhead.
+The 'pickle' format is the original protocol.
+"""
+
+import sys
+import time
+
+from multiprocessing import Pipe, Process
+
+import numpy
+
+from openmdao.main.mp_util import recv_message, send_message
+
+SESSION_KEY = '0123456789abcdef'
+
+# (label, session_key, wire, compress)
+CONFIGS = (
+    ('En-pickle', SESSION_KEY, 'pickle', False),
+    ('En-frames', SESSION_KEY, 'frames', False),
+    ('Un-pickle', '', 'pickle', False),
+    ('Un-frames', '', 'frames', False),
+    ('Un-frames-z', '', 'frames', True),
+)
+
+
+def echo(conn, session_key, wire, compress):
+    """ Echo messages until None is received. """
+    while True:
+        msg = recv_message(conn, session_key, wire)
+        send_message(conn, msg, session_key, wire, compress)
+        if msg is None:
+            break
+
+
+def run_test(payloads, session_key, wire, compress):
+    """ Return list of ``(size, latency, thruput)`` for `payloads`. """
+    parent, child = Pipe()
+    proc = Process(target=echo, args=(child, session_key, wire, compress))
+    proc.start()
+    try:
+        for i in range(10):  # 'prime' the connection.
+            send_message(parent, payloads[0][1], session_key, wire, compress)
+            recv_message(parent, session_key, wire)
+
+        results = []
+        reps = 1000
+        for size, msg in payloads:
+            start = time.time()
+            for i in range(reps):
+                send_message(parent, msg, session_key, wire, compress)
+                recv_message(parent, session_key, wire)
+            et = time.time() - start
+
+            latency = et / reps
+            thruput = size / (et/reps)
+            print '%d msgs of %d bytes, latency %g, thruput %g' \
+                  % (reps, size, latency, thruput)
+            results.append((size, latency, thruput))
+
+            if et > 2 and reps >= 20:
+                reps /= int((et / 2) + 0.5)
+    finally:
+        send_message(parent, None, session_key, wire, compress)
+        recv_message(parent, session_key, wire)
+        proc.join()
+    return results
+
+
+def write_csv(filename, labels, results):
+    """ Write `results` in X, Y1, Y2, ... format. """
+    with open(filename, 'w') as out:
+        out.write('Bytes,%s\n' % ','.join(labels))
+        for size in sorted(results.keys()):
+            out.write('%d' % size)
+            for value in results[size]:
+                out.write(', %g' % value)
+            out.write('\n')
+
+
+def main():
+    """ Run latency & thruput tests on each configuration. """
+    kinds = sys.argv[1:] or ('string', 'array')
+    for kind in kinds:
+        if kind == 'string':
+            payloads = [(1 << i, ' ' * (1 << i)) for i in range(0, 23, 2)]
+        else:
+            payloads = [(8 << i, numpy.random.random(1 << i))
+                        for i in range(0, 21, 2)]
+
+        labels = []
+        latency_results = {}
+        thruput_results = {}
+        for label, session_key, wire, compress in CONFIGS:
+            print
+            print '%s %s' % (kind, label)
+            labels.append(label)
+            for size, latency, thruput in run_test(payloads, session_key,
+                                                   wire, compress):
+                latency_results.setdefault(size, []).append(latency)
+                thruput_results.setdefault(size, []).append(thruput)
+
+        write_csv('%s_latency.csv' % kind, labels, latency_results)
+        write_csv('%s_thruput.csv' % kind, labels, thruput_results)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ Note: This is a work in progress.
 
 import re
 import logging
+from bisect import bisect_right
 
 from pyparsing import CaselessLiteral, Combine, OneOrMore, Optional, \
                       TokenConverter, Word, nums, oneOf, printables, \
@@ -122,10 +123,9 @@ class ToInf(TokenConverter):
         return float('inf')
     
     
-def _parse_line(delimiters=' \t'):
-    """Parse a single data line that may contain string or numerical data.
-    Float and Int 'words' are converted to their appropriate type. 
-    Exponentiation is supported, as are NaN and Inf."""
+def _textchars(delimiters):
+    """Return the characters that can make up a string 'word' when fields are
+    separated by the given delimiters."""
     
     # Somewhat of a hack, but we can only use printables if the delimiter is
     # just whitespace. Otherwise, some seprators (like ',' or '=') potentially
@@ -145,7 +145,30 @@ def _parse_line(delimiters=' \t'):
             if symbol not in delimiters:
                 textchars = textchars + symbol
                 
-    string_text = Word(textchars)
+    return textchars
+
+_NAN_INF = ["Inf", "-Inf", "NaN", "nan", "NaN%", "NaNQ", "NaNS", "qNaN",
+            "sNaN", "1.#SNAN", "1.#QNAN", "-1.#IND"]
+
+# grammars from _parse_line, keyed on (delimiters, pyparsing whitespace)
+_grammars = {}
+
+def _parse_line(delimiters=' \t'):
+    """Parse a single data line that may contain string or numerical data.
+    Float and Int 'words' are converted to their appropriate type. 
+    Exponentiation is supported, as are NaN and Inf.
+    
+    Grammars are cached. Since the fields they find depend on the pyparsing
+    default whitespace characters in effect when they're created (see
+    ``FileParser.set_delimiters``), those are part of the cache key."""
+    
+    key = (delimiters, ParserElement.DEFAULT_WHITE_CHARS)
+    try:
+        return _grammars[key]
+    except KeyError:
+        pass
+    
+    string_text = Word(_textchars(delimiters))
         
     digits = Word(nums)
     dot = "."
@@ -172,9 +195,83 @@ def _parse_line(delimiters=' \t'):
     data = ( OneOrMore( (nan | num_float | mixed_exp | num_int |
                          string_text) ) )
     
+    _grammars[key] = data
     return data
 
 
+class _LineTokenizer(object):
+    """Splits a line into fields with a regular expression, giving the same
+    result as the grammar from ``_parse_line(delimiters)`` would for lines
+    made up of plain numbers and words, which is much faster than using
+    pyparsing. :meth:`tokenize` returns None for any line that it can't be
+    sure of, and those lines should be handed to the grammar instead."""
+    
+    # an int, a float, or a float written like "3e5"
+    _number = re.compile(r'(?:([+-]?\d+)|'
+                         r'([+-]?(?:\d+\.\d*|\.\d+)(?:[eEdD][+-]?\d+)?|'
+                         r'\d+[eEdD][+-]?\d+))$')
+    
+    def __init__(self, delimiters, whitespace):
+        textchars = _textchars(delimiters)
+        
+        # pyparsing skips its whitespace chars between fields, and stops
+        # at any character that is neither whitespace nor textchars
+        self._usable = bool(whitespace) and \
+                       not set(whitespace).intersection(textchars)
+        if self._usable:
+            self._split = re.compile('[%s]+' % re.escape(whitespace)).split
+            self._unknown = re.compile('[^%s%s]' % (re.escape(textchars),
+                                                    re.escape(whitespace))).search
+        
+    def tokenize(self, line):
+        """Return a list of the fields in the line, or None."""
+        
+        if not self._usable:
+            return None
+        
+        line = line.rstrip('\r\n')
+        if self._unknown(line):
+            return None
+        
+        fields = []
+        for token in self._split(line):
+            if not token:
+                continue
+            
+            if token[0] in '0123456789+-.':
+                match = self._number.match(token)
+                if match is None:
+                    return None
+                if match.group(1):
+                    fields.append(int(token))
+                else:
+                    fields.append(float(token.replace('D', 'E').replace('d', 'e')))
+            elif token.startswith(tuple(_NAN_INF)):
+                return None
+            else:
+                fields.append(token)
+        
+        return fields or None
+
+# tokenizers keyed the same way as _grammars
+_tokenizers = {}
+
+def _tokenize(line, delimiters=' \t'):
+    """Return the fields found in a line by the grammar from 
+    ``_parse_line(delimiters)``, taking a faster path when we can."""
+    
+    key = (delimiters, ParserElement.DEFAULT_WHITE_CHARS)
+    try:
+        tokenizer = _tokenizers[key]
+    except KeyError:
+        tokenizer = _tokenizers[key] = _LineTokenizer(*key)
+    
+    fields = tokenizer.tokenize(line)
+    if fields is None:
+        fields = _parse_line(delimiters).parseString(line)
+    return fields
+
+
 class InputFileGenerator(object):
     """Utility to generate an input file from a template.
     Substitution of values is supported. Data is located with
@@ -451,6 +548,66 @@ class FileParser(object):
         
         self.current_row = 0
         self.anchored = False
+        self._reset_index()
+        
+    def _reset_index(self):
+        """Discard our line index and any tokenized lines."""
+        self._starts = None   # offset of each line in _text
+        self._text = None     # the whole file as one string
+        self._anchors = {}    # rows containing each anchor searched for
+        self._fields = {}     # tokenized lines
+        
+    def _index(self):
+        """Build the index used to find the lines containing a string."""
+        starts = [0]
+        pos = 0
+        for line in self.data:
+            pos += len(line)
+            starts.append(pos)
+        self._starts = starts
+        self._text = ''.join(self.data)
+        
+    def _find_rows(self, text):
+        """Return a list of the rows that contain the given text."""
+        
+        try:
+            return self._anchors[text]
+        except KeyError:
+            pass
+        
+        if self._text is None:
+            self._index()
+        starts = self._starts
+        whole = self._text
+        
+        rows = []
+        if text:
+            pos = whole.find(text)
+            while pos > -1:
+                row = bisect_right(starts, pos) - 1
+                if pos + len(text) <= starts[row+1]: # not split across lines
+                    rows.append(row)
+                    pos = whole.find(text, starts[row+1])
+                else:
+                    pos = whole.find(text, pos+1)
+        else:
+            rows = range(len(self.data))
+            
+        self._anchors[text] = rows
+        return rows
+    
+    def _parse_row(self, j, delimiters):
+        """Return the fields in row j, tokenizing it only once."""
+        
+        line = self.data[j]
+        key = (j, delimiters, ParserElement.DEFAULT_WHITE_CHARS)
+        cached = self._fields.get(key)
+        if cached is not None and cached[0] is line:
+            return cached[1]
+        
+        fields = _tokenize(line, delimiters)
+        self._fields[key] = (line, fields)
+        return fields
         
     def set_file(self, filename):
         """Set the name of the file that will be generated.
@@ -469,6 +626,7 @@ class FileParser(object):
                 if line[0] == self.full_line_comment_char : continue
                 self.data.append( line.split( self.end_of_line_comment_char )[0] )
         inputfile.close()
+        self._reset_index()
 
     def set_delimiters(self, delimiter):
         """Lets you change the delimiter that is used to identify field
@@ -502,45 +660,33 @@ class FileParser(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
         
-        instance = 0
+        rows = self._find_rows(anchor)
         if occurrence > 0:
-            count = 0
-            for line in self.data[self.current_row:]:
-                
-                # If we are marking a new anchor from an existing anchor, and
-                # the anchor is mid-line, then we still search the line, but
-                # only after the anchor.
-                if count == 0 and self.anchored:
-                    line = line.split(anchor)[-1]
-
-                if line.find(anchor) > -1:
-                    
-                    instance += 1
-                    if instance == occurrence:
-                        self.current_row += count
-                        self.anchored = True
-                        return
             
-                count += 1
+            # If we are marking a new anchor from an existing anchor, the
+            # search starts after the anchor, so the rest of the anchor's
+            # line can't contain it.
+            start = self.current_row
+            if self.anchored:
+                start += 1
+            i = bisect_right(rows, start-1) + occurrence - 1
+            if i < len(rows):
+                self.current_row = rows[i]
+                self.anchored = True
+                return
                 
         elif occurrence < 0:
-            count = len(self.data)-1
-            for line in reversed(self.data):
-                
-                # If we are marking a new anchor from an existing anchor, and
-                # the anchor is mid-line, then we still search the line, but
-                # only before the anchor.
-                if count == len(self.data)-1 and self.anchored:
-                    line = line.split(anchor)[0]
-
-                if line.find(anchor) > -1:
-                    instance += -1
-                    if instance == occurrence:
-                        self.current_row = count
-                        self.anchored = True
-                        return
             
-                count -= 1
+            # Similarly, a reverse search from an existing anchor skips
+            # the last line.
+            end = len(rows)
+            if self.anchored and rows and rows[-1] == len(self.data)-1:
+                end -= 1
+            i = end + occurrence
+            if i >= 0:
+                self.current_row = rows[i]
+                self.anchored = True
+                return
         else:
             raise ValueError("0 is not valid for an anchor occurrence.")
             
@@ -601,7 +747,7 @@ class FileParser(object):
             
             # Let pyparsing figure out if this is a number, and return it
             # as a float or int as appropriate
-            data = _parse_line().parseString(line)
+            data = _tokenize(line)
             
             # data might have been split if it contains whitespace. If so,
             # just return the whole string
@@ -610,7 +756,7 @@ class FileParser(object):
             else:
                 return data[0]
         else:
-            data = _parse_line(self.delimiter).parseString(line)
+            data = self._parse_row(j, self.delimiter)
             return data[field-1]
 
     def transfer_keyvar(self, key, field, occurrence=1, rowoffset=0):
@@ -636,31 +782,27 @@ class FileParser(object):
             msg = "The value for occurrence must be a nonzero integer"
             raise ValueError(msg)
         
-        instance = 0
+        rows = self._find_rows(key)
+        first = bisect_right(rows, self.current_row-1)
+        nrows = len(self.data) - self.current_row
         if occurrence > 0:
-            row = 0
-            for line in self.data[self.current_row:]:
-                if line.find(key) > -1:
-                    instance += 1
-                    if instance == occurrence:
-                        break
-            
-                row += 1
+            i = first + occurrence - 1
+            if i < len(rows):
+                row = rows[i] - self.current_row
+            else:
+                row = nrows
                 
         elif occurrence < 0:
-            row = -1
-            for line in reversed(self.data[self.current_row:]):
-                if line.find(key) > -1:
-                    instance += -1
-                    if instance == occurrence:
-                        break
-            
-                row -= 1
+            i = len(rows) + occurrence
+            if i >= first:
+                row = rows[i] - len(self.data)
+            else:
+                row = -nrows - 1
         
         j = self.current_row + row + rowoffset
         line = self.data[j]
         
-        fields = _parse_line(self.delimiter).parseString(line.replace(key,"KeyField"))
+        fields = _tokenize(line.replace(key,"KeyField"), self.delimiter)
         
         return fields[field]
 
@@ -708,7 +850,7 @@ class FileParser(object):
                 
                 # Let pyparsing figure out if this is a number, and return it
                 # as a float or int as appropriate
-                parsed = _parse_line().parseString(line)
+                parsed = _tokenize(line)
                 
                 newdata = array(parsed[:])
                 # data might have been split if it contains whitespace. If the
@@ -719,7 +861,7 @@ class FileParser(object):
                 data = append(data, newdata)
                 
             else:
-                parsed = _parse_line(self.delimiter).parseString(line)
+                parsed = self._parse_row(j1+i, self.delimiter)
                 if i == j2-j1-1:
                     data = append(data, array(parsed[(fieldstart-1):fieldend]))
                 else:
@@ -769,7 +911,7 @@ class FileParser(object):
             else:
                 line = lines[0][(fieldstart-1):]
                 
-            parsed = _parse_line().parseString(line)
+            parsed = _tokenize(line)
             row = array(parsed[:])
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
@@ -780,11 +922,11 @@ class FileParser(object):
                 else:
                     line = line[(fieldstart-1):]
                 
-                parsed = _parse_line().parseString(line)
+                parsed = _tokenize(line)
                 data[i+1, :] = array(parsed[:])
                 
         else:
-            parsed = _parse_line(self.delimiter).parseString(lines[0])
+            parsed = self._parse_row(j1, self.delimiter)
             if fieldend:
                 row = array(parsed[(fieldstart-1):fieldend])
             else:
@@ -794,7 +936,7 @@ class FileParser(object):
             data[0, :] = row
     
             for i, line in enumerate(list(lines[1:])):
-                parsed = _parse_line(self.delimiter).parseString(line)
+                parsed = self._parse_row(j1+i+1, self.delimiter)
                 
                 if fieldend:
                     try:
@@ -230,6 +230,10 @@ class Logger(object):
         """ Log a message at a specified level. """
         self._logger.log(level, msg, *args, **kwargs)
 
+    def isEnabledFor(self, level):
+        """ Return True if messages of `level` would be logged. """
+        return self._logger.isEnabledFor(level)
+
 
 class NullLogger(object):
     """
@@ -265,3 +269,7 @@ class NullLogger(object):
         """ Log a message at a specified level. """
         pass
 
+    def isEnabledFor(self, level):
+        """ Return False, no messages are logged. """
+        return False
+
@@ -1,8 +1,9 @@
+import errno
 import os.path
 import signal
 import subprocess
 import sys
-import time
+import threading
 
 PIPE = subprocess.PIPE
 STDOUT = subprocess.STDOUT
@@ -52,6 +53,10 @@ class ShellProc(subprocess.Popen):
         self._stdout_arg = stdout
         self._stderr_arg = stderr
 
+        self._reaper = None  # Thread used by wait() when there's a timeout.
+        self._reaper_lock = threading.Lock()
+        self._exited = threading.Event()
+
         if isinstance(stdin, basestring):
             self._inp = open(stdin, 'r')
         else:
@@ -89,57 +94,81 @@ class ShellProc(subprocess.Popen):
     def terminate(self, timeout=None):
         """
         Stop child process. If `timeout` is specified then :meth:`wait` will
-        be called to wait for the process to terminate.
+        be called to wait for the process to terminate. A process which has
+        already been reaped isn't signalled, its PID may have been reused.
 
         timeout: float (seconds)
             Maximum time to wait for the process to stop.
             A value of zero implies an infinite maximum wait.
 
         """
-        super(ShellProc, self).terminate()
+        if self.returncode is None:
+            super(ShellProc, self).terminate()
         if timeout is not None:
             return self.wait(timeout=timeout)
 
     def wait(self, poll_delay=0., timeout=0.):
         """
-        Polls for command completion or timeout.
+        Waits for command completion or timeout.
+        Completion is noticed as soon as the process exits rather than
+        by polling.
         Closes any files implicitly opened.
         Returns ``(return_code, error_msg)``.
 
         poll_delay: float (seconds)
-            Time to delay between polling for command completion.
-            A value of zero uses an internal default.
+            Not used, retained for compatibility.
 
         timeout: float (seconds)
             Maximum time to wait for command completion.
             A value of zero implies an infinite maximum wait.
+            If exceeded, the process is terminated.
         """
         return_code = None
         try:
-            if poll_delay <= 0:
-                poll_delay = max(0.1, timeout/100.)
-                poll_delay = min(10., poll_delay)
-            npolls = int(timeout / poll_delay) + 1
-
-            time.sleep(poll_delay)
-            return_code = self.poll()
-            while return_code is None:
-                npolls -= 1
-                if (timeout > 0) and (npolls < 0):
-                    self.terminate()
-                    break
-                time.sleep(poll_delay)
-                return_code = self.poll()
+            if timeout > 0:
+                # A reaper thread does the (blocking) wait so we can time out.
+                with self._reaper_lock:
+                    if self._reaper is None:
+                        self._reaper = threading.Thread(target=self._reap)
+                        self._reaper.daemon = True
+                        self._reaper.start()
+                if self._exited.wait(timeout):
+                    return_code = self.returncode
+                elif self.returncode is not None:
+                    # Exited (and was reaped) just after the wait timed out.
+                    return_code = self.returncode
+                else:
+                    try:
+                        self.terminate()
+                    except OSError as exc:
+                        if exc.errno != errno.ESRCH:
+                            raise
+                        # Reaped between the check above and the signal.
+                        self._exited.wait()
+                        return_code = self.returncode
+            elif self._reaper is not None:
+                # An earlier timed wait left the reaper waiting on the
+                # process, waiting here too would just get ECHILD.
+                self._exited.wait()
+                return_code = self.returncode
+            else:
+                return_code = subprocess.Popen.wait(self)
         finally:
             self.close_files()
 
-        # self.returncode set by self.poll().
         if return_code is not None:
             self.errormsg = self.error_message(return_code)
         else:
             self.errormsg = 'Timed out'
         return (return_code, self.errormsg)
 
+    def _reap(self):
+        """ Wait for the process to exit and notify :meth:`wait`. """
+        try:
+            subprocess.Popen.wait(self)
+        finally:
+            self._exited.set()
+
     def error_message(self, return_code):
         """
         Return error message for `return_code`.
@@ -186,8 +215,7 @@ def call(args, stdin=None, stdout=None, stderr=None, env=None,
         Environment variables for the command.
 
     poll_delay: float (seconds)
-        Time to delay between polling for command completion.
-        A value of zero uses an internal default.
+        Not used, retained for compatibility.
 
     timeout: float (seconds)
         Maximum time to wait for command completion.
@@ -218,8 +246,7 @@ def check_call(args, stdin=None, stdout=None, stderr=None, env=None,
         Environment variables for the command.
 
     poll_delay: float (seconds)
-        Time to delay between polling for command completion.
-        A value of zero uses an internal default.
+        Not used, retained for compatibility.
 
     timeout: float (seconds)
         Maximum time to wait for command completion.
@@ -235,6 +235,43 @@ class Stream(object):
 
         return data.reshape(shape, order=order) if reshape else data
 
+    def map_floats(self, shape, order='C'):
+        """
+        Returns floats as a :class:`numpy.memmap` of `shape` located at the
+        current file position, and positions the file after them.
+        Data is only read as it is accessed. The array's dtype has the
+        stream's byte order, so any byte swapping is also done on access.
+        The map is copy-on-write: modifications are not written to the file.
+        The file must not be truncated or overwritten while the map is in use.
+        Only meaningful if `binary`.
+
+        shape: tuple(int)
+            Dimensions of returned array.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+        """
+        if not self.binary:
+            raise ValueError('map_floats requires binary data')
+
+        dtype = numpy.dtype(numpy.float32 if self.single_precision
+                                          else numpy.float64)
+        dtype = dtype.newbyteorder('>' if self.big_endian else '<')
+        count = 1
+        try:
+            for size in shape:
+                count *= size
+        except TypeError:
+            count = shape
+            shape = (shape,)
+
+        offset = self.file.tell()
+        data = numpy.memmap(self.file, dtype=dtype, mode='c', offset=offset,
+                            shape=shape, order='F' if order == 'Fortran' else order)
+        self.file.seek(offset + count * dtype.itemsize)
+        return data
+
     def read_recordmark(self):
         """ Returns value of next recordmark. """
         fmt = '>' if self.big_endian else '<'
@@ -404,6 +441,8 @@ class Stream(object):
                     arr = numpy.array(data, dtype=numpy.float32)
             elif data.itemsize != _SZ_DOUBLE:
                 arr = numpy.array(data, dtype=numpy.float64)
+            if not arr.dtype.isnative:  # From map_floats() for example.
+                arr = arr.astype(arr.dtype.newbyteorder('='))
 
             if self.need_byteswap:
                 arr.byteswap(True)
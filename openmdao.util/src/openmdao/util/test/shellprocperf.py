@@ -0,0 +1,35 @@
+"""
+Time running many short external commands via ShellProc.
+"""
+
+import sys
+import time
+
+from openmdao.util.shellproc import call
+
+
+def run_test(ncmds, timeout=0.):
+    """
+    Run `ncmds` trivial commands one after another, waiting for each with
+    the given `timeout`. Returns the average time per command.
+    """
+    cmd = 'rem' if sys.platform == 'win32' else 'true'
+    start = time.time()
+    for i in range(ncmds):
+        return_code, error_msg = call(cmd, timeout=timeout)
+        if return_code:
+            raise RuntimeError('%r failed: %s' % (cmd, error_msg))
+    return (time.time() - start) / ncmds
+
+
+def main():
+    """ Time 1000 short commands, with and without a timeout. """
+    ncmds = 1000
+    for timeout in (0., 60.):
+        avg = run_test(ncmds, timeout)
+        print '%d commands, timeout %g: %.2f msec per command' \
+              % (ncmds, timeout, avg * 1000)
+
+
+if __name__ == '__main__':
+    main()
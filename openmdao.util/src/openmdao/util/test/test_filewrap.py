@@ -6,7 +6,8 @@ import unittest, os
 
 from numpy import array, isnan, isinf
 
-from openmdao.util.filewrap import InputFileGenerator, FileParser
+from openmdao.util.filewrap import InputFileGenerator, FileParser, \
+                                   _parse_line, _tokenize
 
 
 class TestCase(unittest.TestCase):
@@ -585,6 +586,59 @@ class TestCase(unittest.TestCase):
         val = op.transfer_var(4, 4)
         self.assertEqual(val, '#$%')
         
+    def test_tokenize(self):
+        
+        # the fast tokenizer must match the pyparsing grammar, and fall
+        # back to it for anything unusual
+        lines = ["1 -2 +3 4.5 .5 6. 7e3 8.1D-2 9d2 abc\n",
+                 "  Key1\t3.2  ibg 0.0003   \n",
+                 "1.2.3 3e -- e5 1-2\n",
+                 "NaN -Inf 1.#QNAN -1.#IND Infinity\n",
+                 "a=1,b=2.5\n"]
+        
+        for delims in [' \t', ' \t=,']:
+            for line in lines:
+                expected = list(_parse_line(delims).parseString(line))
+                fields = list(_tokenize(line, delims))
+                self.assertEqual(len(fields), len(expected))
+                for field, exp in zip(fields, expected):
+                    if isinstance(exp, float) and isnan(exp):
+                        self.assertTrue(isnan(field))
+                    else:
+                        self.assertEqual(field, exp)
+                        self.assertEqual(type(field), type(exp))
+                        
+        self.assertTrue(_parse_line(' \t') is _parse_line(' \t'))
+
+    def test_output_parse_new_file(self):
+        
+        outfile = open(self.filename, 'w')
+        outfile.write("Anchor 1 2\nAnchor 3 4\n")
+        outfile.close()
+        
+        gen = FileParser()
+        gen.set_file(self.filename)
+        gen.mark_anchor('Anchor', 2)
+        self.assertEqual(gen.transfer_var(0, 3), 4)
+        self.assertEqual(gen.transfer_keyvar('Anchor', 1), 3)
+        
+        # anchors and parsed lines from the old file must not be reused
+        outfile = open(self.filename, 'w')
+        outfile.write("x\nx\nAnchor 5 6\n")
+        outfile.close()
+        
+        gen.set_file(self.filename)
+        gen.mark_anchor('Anchor')
+        self.assertEqual(gen.current_row, 2)
+        self.assertEqual(gen.transfer_var(0, 2), 5)
+        try:
+            gen.mark_anchor('Anchor', 2)
+        except RuntimeError, err:
+            msg = "Could not find pattern Anchor in output file filename.dat"
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail('RuntimeError expected')
+        
 
             
 if __name__ == '__main__':
@@ -2,12 +2,17 @@
 Test ShellProc functions.
 """
 
+import errno
 import logging
 import os.path
 import signal
 import sys
+import threading
+import time
 import unittest
 
+import nose
+
 from openmdao.util.shellproc import call, check_call, CalledProcessError, \
                                     ShellProc
 
@@ -60,6 +65,59 @@ class TestCase(unittest.TestCase):
             if os.path.exists('stderr'):
                 os.remove('stderr')
 
+    def test_wait(self):
+        logging.debug('')
+        logging.debug('test_wait')
+
+        if sys.platform == 'win32':
+            raise nose.SkipTest('Uses /bin/sh commands')
+
+        # Completion is noticed promptly, with and without a timeout.
+        for timeout in (0, 10):
+            start = time.time()
+            return_code, error_msg = call('exit 3', timeout=timeout)
+            self.assertTrue(time.time() - start < 0.5)
+            self.assertEqual(return_code, 3)
+            self.assertEqual(error_msg, ': %s' % os.strerror(3))
+
+        # Timeout terminates the process.
+        start = time.time()
+        proc = ShellProc('sleep 10')
+        return_code, error_msg = proc.wait(timeout=0.2)
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(return_code, None)
+        self.assertEqual(error_msg, 'Timed out')
+        return_code, error_msg = proc.wait(timeout=5)
+        self.assertEqual(return_code, -signal.SIGTERM)
+
+        # Untimed wait after a timed out one (reaper still waiting).
+        proc = ShellProc("trap '' TERM; sleep 1; exit 3")
+        return_code, error_msg = proc.wait(timeout=0.2)
+        self.assertEqual(return_code, None)
+        return_code, error_msg = proc.wait()
+        self.assertEqual(return_code, 3)
+
+        # Process reaped just as the wait times out isn't reported as
+        # timed out, and isn't signalled again.
+        proc = ShellProc('sleep 0.5; exit 3')
+        def reaped(timeout=None):
+            proc._exited.wait()
+            raise OSError(errno.ESRCH, os.strerror(errno.ESRCH))
+        proc.terminate = reaped
+        return_code, error_msg = proc.wait(timeout=0.1)
+        self.assertEqual(return_code, 3)
+        del proc.terminate
+        proc.terminate()  # No OSError for a reaped process.
+
+        # Terminate from another thread ends the wait.
+        proc = ShellProc('sleep 10')
+        threading.Timer(0.2, proc.terminate).start()
+        start = time.time()
+        return_code, error_msg = proc.wait()
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(return_code, -signal.SIGTERM)
+        self.assertEqual(error_msg, ': SIGTERM')
+
     def test_errormsg(self):
         logging.debug('')
         logging.debug('test_errormsg')
@@ -82,7 +140,6 @@ class TestCase(unittest.TestCase):
 
 
 if __name__ == '__main__':
-    import nose
     sys.argv.append('--cover-package=openmdao.util')
     sys.argv.append('--cover-erase')
     nose.runmodule()
@@ -59,10 +59,12 @@ class TestCase(unittest.TestCase):
 
     def setUp(self):
         self.filename = 'test_stream.dat'
+        self.filename2 = 'test_stream2.dat'
 
     def tearDown(self):
-        if os.path.exists(self.filename):
-            os.remove(self.filename)
+        for path in (self.filename, self.filename2):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_int32(self):
         logging.debug('')
@@ -560,6 +562,56 @@ class TestCase(unittest.TestCase):
             new_data = stream.read_floats((5, 2), order='Fortran')
         numpy.testing.assert_array_equal(new_data, arr2d)
 
+    def test_map_floats(self):
+        logging.debug('')
+        logging.debug('test_map_floats')
+
+        # Unformatted, mapped array between recordmarks.
+        data = numpy.arange(1, 9, dtype=numpy.float32)
+        with open(self.filename, 'wb') as out:
+            out.write(UNF_R4A)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, single_precision=True,
+                            unformatted=True)
+            self.assertEqual(stream.read_recordmark(), 32)
+            new_data = stream.map_floats((2, 4), order='Fortran')
+            self.assertEqual(stream.read_recordmark(), 32)
+        numpy.testing.assert_array_equal(new_data,
+                                         data.reshape((2, 4), order='F'))
+
+        # Copy-on-write.
+        new_data[0, 0] = 42.
+        with open(self.filename, 'rb') as inp:
+            self.assertEqual(inp.read(), UNF_R4A)
+        del new_data
+
+        # Byteswapped, then rewritten in native order.
+        swap_endian = sys.byteorder == 'little'
+        data = numpy.arange(0, 10, dtype=numpy.float64)
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, big_endian=swap_endian)
+            stream.write_floats(data)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=swap_endian)
+            new_data = stream.map_floats(data.size)
+        numpy.testing.assert_array_equal(new_data, data)
+        # Mapped file must not be overwritten while the map is in use.
+        with open(self.filename2, 'wb') as out:
+            stream = Stream(out, binary=True, big_endian=not swap_endian)
+            stream.write_floats(new_data)
+        del new_data
+        with open(self.filename2, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=not swap_endian)
+            new_data = stream.read_floats(data.size)
+        numpy.testing.assert_array_equal(new_data, data)
+
+        # Text.
+        with open(self.filename, 'r') as inp:
+            stream = Stream(inp)
+            assert_raises(self, 'stream.map_floats(10)',
+                          globals(), locals(), ValueError,
+                          'map_floats requires binary data')
+
     def test_misc(self):
         logging.debug('')
         logging.debug('test_misc')